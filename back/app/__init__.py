@@ -4,11 +4,34 @@ import os
 
 app = Flask(__name__)
 
+# Uploads gravados direto na pasta da fila do ETL, com hash calculado no recebimento
+from app.upload import RequisicaoComUpload
+app.request_class = RequisicaoComUpload
+
 CORS(app)
 
 basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 app.config['DATABASE_PATH'] = os.path.join(basedir, 'database', 'despesas_brasil.db')
-app.config['TABLE_NAME'] = 'despesas' 
+# Modelo de armazenamento das despesas, o mesmo usado pelo ETL: 'plano' (tabela despesas)
+# ou 'estrela' (fato_despesas com ids de dim_orgao e dim_categoria)
+app.config['MODELO_ARMAZENAMENTO'] = os.getenv('MODELO_ARMAZENAMENTO', 'plano')
+app.config['TABLE_NAME'] = 'fato_despesas' if app.config['MODELO_ARMAZENAMENTO'] == 'estrela' else 'despesas'
+
+# Backend das consultas agregadas: 'sqlite' ou 'parquet' (partições por estado e ano
+# exportadas pelo ETL com o mesmo BACKEND_CONSULTAS, agregadas pelo pyarrow; ver app/colunar.py)
+app.config['BACKEND_CONSULTAS'] = os.getenv('BACKEND_CONSULTAS', 'sqlite')
+app.config['PARQUET_PATH'] = os.path.join(basedir, 'database', 'parquet')
+if app.config['BACKEND_CONSULTAS'] == 'parquet':
+    from app.colunar import DISPONIVEL
+    if not DISPONIVEL:
+        print("⚠️ pyarrow não instalado: consultas feitas no SQLite")
+        app.config['BACKEND_CONSULTAS'] = 'sqlite'
+app.config['CSVS_PATH'] = os.path.join(basedir, 'csvs')
+
+# Fila de jobs do ETL usada pelo /upload (tabela de jobs em um banco separado)
+app.config['FILA_ETL_PATH'] = os.path.join(basedir, 'database', 'fila_etl.db')
+app.config['ETL_WORKERS'] = int(os.getenv('ETL_WORKERS', 2))
+app.config['ETL_CHUNKSIZE'] = int(os.getenv('ETL_CHUNKSIZE', 100000))
 
 from app import routes
 
@@ -0,0 +1,86 @@
+"""
+Backend colunar das consultas agregadas da API.
+Lê as partições Parquet (estado, ano) exportadas pelo ETL (etl/core/particoes.py)
+só com as colunas e partições que a consulta usa, e agrega com o pyarrow.compute.
+Os valores são somados em centavos inteiros, como no SQLite, então as respostas são
+as mesmas das consultas SQL.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+DISPONIVEL = pa is not None
+
+
+def _dataset(pasta):
+    """
+    Abre as partições da pasta no layout do Hive (estado=XX/ano=AAAA/).
+    """
+    return ds.dataset(pasta, format='parquet', partitioning='hive')
+
+
+def _filtro(estados=None, ano=None, categorias=None, excluir_categorias=None, exigir_categoria=False):
+    """
+    Monta a expressão de filtro; estado e ano podam partições inteiras.
+    Como no SQL, 'categoria != x' não inclui as linhas sem categoria.
+    """
+    condicoes = []
+    if estados:
+        condicoes.append(ds.field('estado').isin(list(estados)))
+    if ano:
+        condicoes.append(ds.field('ano') == int(ano))
+    if categorias:
+        condicoes.append(ds.field('categoria_padronizada').isin(list(categorias)))
+    if excluir_categorias:
+        condicoes.append(~ds.field('categoria_padronizada').isin(list(excluir_categorias)))
+    if excluir_categorias or exigir_categoria:
+        condicoes.append(ds.field('categoria_padronizada').is_valid())
+    
+    filtro = None
+    for condicao in condicoes:
+        filtro = condicao if filtro is None else filtro & condicao
+    return filtro
+
+
+def agregar(pasta, chaves, soma, quantidade=None, media=None, **filtros):
+    """
+    Equivalente a 'SELECT chaves, SUM(valor_centavos) AS soma [, COUNT(*) AS quantidade]
+    [, AVG(valor_centavos) AS media] ... GROUP BY chaves ORDER BY soma DESC'.
+    Os filtros aceitos são os de _filtro. Sem chaves, retorna uma única linha.
+    """
+    colunas = list(chaves) + [soma] + [nome for nome in (quantidade, media) if nome]
+    if not os.path.isdir(pasta):
+        return pd.DataFrame(columns=colunas)
+    
+    tabela = _dataset(pasta).to_table(columns=list(chaves) + ['valor_centavos'], filter=_filtro(**filtros))
+    
+    if not chaves:
+        total = pc.sum(tabela['valor_centavos']).as_py()
+        df = pd.DataFrame({soma: [total], 'quantidade': [tabela.num_rows]})
+    else:
+        # Cada partição tem o seu dicionário; o agrupamento exige um só por coluna
+        agrupado = tabela.unify_dictionaries().group_by(chaves).aggregate([
+            ('valor_centavos', 'sum'),
+            ('valor_centavos', 'count', pc.CountOptions(mode='all')),
+        ])
+        # Os nomes só são decodificados do dicionário depois de agrupados
+        for chave in chaves:
+            if pa.types.is_dictionary(agrupado.schema.field(chave).type):
+                indice = agrupado.schema.get_field_index(chave)
+                agrupado = agrupado.set_column(indice, chave, agrupado[chave].cast(pa.string()))
+        df = agrupado.to_pandas().rename(columns={'valor_centavos_sum': soma, 'valor_centavos_count': 'quantidade'})
+        df = df.sort_values(soma, ascending=False, kind='stable').reset_index(drop=True)
+    
+    if media:
+        df[media] = df[soma] / df['quantidade']
+    if quantidade:
+        df[quantidade] = df['quantidade']
+    return df[colunas]
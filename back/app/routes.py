@@ -1,8 +1,11 @@
 from app import app
+from app import colunar
+from app.upload import ArquivoRecebido
 from flask import jsonify, request 
 import sqlite3
 import pandas as pd
 import os
+import sys
 from dotenv import load_dotenv
 from openai import OpenAI
 
@@ -14,53 +17,133 @@ client = OpenAI(
     api_key=os.getenv('OPENAI_API_KEY')
 )
 
+# Bancos em que a coluna gerada 'ano' (migração do ETL) já existe
+_BANCOS_COM_COLUNA_ANO = set()
+
+def banco_tem_coluna_ano(db_path):
+    if db_path not in _BANCOS_COM_COLUNA_ANO:
+        conn = sqlite3.connect(db_path)
+        colunas = [coluna[1] for coluna in conn.execute("PRAGMA table_xinfo(despesas)")]
+        conn.close()
+        if 'ano' in colunas:
+            _BANCOS_COM_COLUNA_ANO.add(db_path)
+    return db_path in _BANCOS_COM_COLUNA_ANO
+
+def filtro_ano(ano):
+    """
+    Condição de filtro por ano que o SQLite consegue resolver por índice.
+    Usa a coluna 'ano' (coberta pelos índices compostos) quando o banco já foi
+    migrado; senão, um intervalo de datas em vez de strftime em cada linha.
+    """
+    ano = int(ano)
+    if modelo_estrela() or banco_tem_coluna_ano(app.config['DATABASE_PATH']):
+        return "ano = ?", [ano]
+    return "data >= ? AND data < ?", [f"{ano}-01-01", f"{ano + 1}-01-01"]
+
 def construir_clausula_where(filtros):
     where_conditions = []
     params = []
 
 
     mapa_filtros = {
-        'uf': 'estado',
-        'categoria': 'categoria_padronizada'
+        'uf': 'estado = ?',
+        'categoria': condicao_categoria('=')
     }
 
     for chave, valor in filtros.items():
         if chave != 'ano' and valor:
-            nome_coluna = mapa_filtros.get(chave)
-            if nome_coluna:
-                where_conditions.append(f"{nome_coluna} = ?")
+            condicao = mapa_filtros.get(chave)
+            if condicao:
+                where_conditions.append(condicao)
                 params.append(valor.upper() if chave == 'uf' else valor)
 
     ano_filter = filtros.get('ano')
     if ano_filter:
-        where_conditions.append("strftime('%Y', data) = ?")
-        params.append(str(ano_filter))
+        condicao_ano, params_ano = filtro_ano(ano_filter)
+        where_conditions.append(condicao_ano)
+        params.extend(params_ano)
         
     if not where_conditions:
         return "", []
 
     return " WHERE " + " AND ".join(where_conditions), params
 
+def modelo_estrela():
+    return app.config['MODELO_ARMAZENAMENTO'] == 'estrela'
+
+def condicao_categoria(operador):
+    """
+    Comparação da categoria com um nome ('=' ou '!='). No modelo estrela compara o
+    id, resolvido uma única vez em dim_categoria, em vez do texto de cada linha.
+    """
+    if not modelo_estrela():
+        return f"categoria_padronizada {operador} ?"
+    negacao = "NOT " if operador == '!=' else ""
+    return f"categoria_id {negacao}IN (SELECT id FROM dim_categoria WHERE nome = ?)"
+
+def juntar_dimensao(consulta, chave, dimensao, nome, colunas, ordem):
+    """
+    No modelo estrela as agregações são feitas pelos ids; o nome da dimensão só é
+    buscado para as linhas finais da consulta, já ordenadas e limitadas.
+    """
+    selecionadas = ', '.join(f"t.{coluna}" for coluna in colunas)
+    return (f"SELECT d.nome AS {nome}, {selecionadas} FROM ({consulta}) t "
+            f"LEFT JOIN {dimensao} d ON d.id = t.{chave} ORDER BY {ordem}")
+
+def centavos_para_reais(df, *colunas):
+    """
+    Os valores são gravados e somados como centavos inteiros (somas exatas);
+    a conversão para reais só acontece ao montar a resposta.
+    """
+    for coluna in colunas:
+        df[coluna] = df[coluna] / 100
+    return df
+
+def backend_parquet():
+    return app.config['BACKEND_CONSULTAS'] == 'parquet'
+
+def agregar_parquet(chaves, soma, uf=None, ano=None, categoria=None, **opcoes):
+    """
+    Consulta agregada no backend colunar (app/colunar.py) com os mesmos filtros de
+    construir_clausula_where; 'opcoes' repassa os demais argumentos de colunar.agregar.
+    """
+    filtros = {
+        'estados': [uf.upper()] if uf else None,
+        'ano': ano,
+        'categorias': [categoria] if categoria else None
+    }
+    filtros.update(opcoes)
+    return colunar.agregar(app.config['PARQUET_PATH'], chaves, soma, **filtros)
+
 
 
 @app.route('/api/analise', methods=['GET'])
 def get_analysis():
     try:
         filtros = {'uf': request.args.get('uf'), 'ano': request.args.get('ano')}
+        if backend_parquet():
+            df = agregar_parquet(['categoria_padronizada'], 'total_gasto', excluir_categorias=['Outros'], **filtros).head(2)
+            return jsonify(centavos_para_reais(df, 'total_gasto').to_dict(orient='records'))
         string_where, params = construir_clausula_where(filtros)
         
         final_params = ["Outros"] + params
-        final_where = " WHERE categoria_padronizada != ?"
+        final_where = " WHERE " + condicao_categoria('!=')
         if string_where:
             final_where += " AND " + string_where.replace("WHERE", "").strip()
 
-        query = f"SELECT categoria_padronizada, SUM(valor) as total_gasto FROM despesas{final_where} GROUP BY categoria_padronizada ORDER BY total_gasto DESC LIMIT 2"
+        if modelo_estrela():
+            query = juntar_dimensao(
+                f"SELECT categoria_id, SUM(valor_centavos) as total_gasto FROM fato_despesas{final_where} GROUP BY categoria_id ORDER BY total_gasto DESC LIMIT 2",
+                'categoria_id', 'dim_categoria', 'categoria_padronizada', ['total_gasto'], 't.total_gasto DESC'
+            )
+        else:
+            query = f"SELECT categoria_padronizada, SUM(valor_centavos) as total_gasto FROM despesas{final_where} GROUP BY categoria_padronizada ORDER BY total_gasto DESC LIMIT 2"
         
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
         df = pd.read_sql_query(query, conn, params=tuple(final_params))
         conn.close()
-        return jsonify(df.to_dict(orient='records'))
+        return jsonify(centavos_para_reais(df, 'total_gasto').to_dict(orient='records'))
     except Exception as e:
         print(f"Ocorreu um erro na rota /api/analise: {e}")
         return jsonify({"error": str(e)}), 500
@@ -69,15 +152,18 @@ def get_analysis():
 def get_total_investimento():
     try:
         filtros = {'uf': request.args.get('uf'), 'ano': request.args.get('ano')}
-        string_where, params = construir_clausula_where(filtros)
-        
-        query = f"SELECT SUM(valor) as valor_total FROM despesas{string_where}"
-        db_path = app.config['DATABASE_PATH']
-        conn = sqlite3.connect(db_path)
-        df = pd.read_sql_query(query, conn, params=tuple(params))
-        conn.close()
+        if backend_parquet():
+            df = agregar_parquet([], 'valor_total', **filtros)
+        else:
+            string_where, params = construir_clausula_where(filtros)
+            
+            query = f"SELECT SUM(valor_centavos) as valor_total FROM {app.config['TABLE_NAME']}{string_where}"
+            db_path = app.config['DATABASE_PATH']
+            conn = sqlite3.connect(db_path)
+            df = pd.read_sql_query(query, conn, params=tuple(params))
+            conn.close()
         total_value = df['valor_total'].iloc[0]
-        return jsonify({"valor_total": float(total_value or 0)})
+        return jsonify({"valor_total": float(total_value or 0) / 100})
     except Exception as e:
         print(f"Ocorreu um erro na rota /api/estatisticas/total: {e}")
         return jsonify({"error": str(e)}), 500
@@ -88,14 +174,21 @@ def get_ranking_data():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         filtros = {'uf': request.args.get('uf'), 'ano': request.args.get('ano')}
+        if backend_parquet():
+            df = agregar_parquet(['categoria_padronizada'], 'total_gasto', excluir_categorias=['Outros'], **filtros)
+            pagina = centavos_para_reais(df.iloc[(page - 1) * per_page:page * per_page], 'total_gasto')
+            return jsonify({'total_registros': len(df), 'pagina_atual': page, 'dados': pagina.to_dict(orient='records')})
         string_where, params = construir_clausula_where(filtros)
 
         final_params = ["Outros"] + params
-        final_where = " WHERE categoria_padronizada != ?"
+        final_where = " WHERE " + condicao_categoria('!=')
         if string_where:
             final_where += " AND " + string_where.replace("WHERE", "").strip()
         
-        base_query = f"SELECT categoria_padronizada, SUM(valor) as total_gasto FROM despesas{final_where} GROUP BY categoria_padronizada"
+        if modelo_estrela():
+            base_query = f"SELECT categoria_id, SUM(valor_centavos) as total_gasto FROM fato_despesas{final_where} GROUP BY categoria_id"
+        else:
+            base_query = f"SELECT categoria_padronizada, SUM(valor_centavos) as total_gasto FROM despesas{final_where} GROUP BY categoria_padronizada"
         
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
@@ -104,7 +197,11 @@ def get_ranking_data():
         total_items = pd.read_sql_query(count_query, conn, params=tuple(final_params)).iloc[0,0]
 
         paginated_query = base_query + f" ORDER BY total_gasto DESC LIMIT {per_page} OFFSET {(page - 1) * per_page}"
-        df = pd.read_sql_query(paginated_query, conn, params=tuple(final_params))
+        if modelo_estrela():
+            paginated_query = juntar_dimensao(
+                paginated_query, 'categoria_id', 'dim_categoria', 'categoria_padronizada', ['total_gasto'], 't.total_gasto DESC'
+            )
+        df = centavos_para_reais(pd.read_sql_query(paginated_query, conn, params=tuple(final_params)), 'total_gasto')
         conn.close()
         
         return jsonify({'total_registros': int(total_items), 'pagina_atual': page, 'dados': df.to_dict(orient='records')})
@@ -116,15 +213,18 @@ def get_ranking_data():
 def get_comparativo_geral():
     try:
         filtros = {'categoria': request.args.get('categoria'), 'ano': request.args.get('ano')}
+        if backend_parquet():
+            df = agregar_parquet(['estado'], 'total_investido', **filtros)
+            return jsonify(centavos_para_reais(df, 'total_investido').to_dict(orient='records'))
         string_where, params = construir_clausula_where(filtros)
 
-        query = f"SELECT estado, SUM(valor) AS total_investido FROM despesas{string_where} GROUP BY estado ORDER BY total_investido DESC"
+        query = f"SELECT estado, SUM(valor_centavos) AS total_investido FROM {app.config['TABLE_NAME']}{string_where} GROUP BY estado ORDER BY total_investido DESC"
         
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
         df = pd.read_sql_query(query, conn, params=params)
         conn.close()
-        return jsonify(df.to_dict(orient='records'))
+        return jsonify(centavos_para_reais(df, 'total_investido').to_dict(orient='records'))
     except Exception as e:
         print(f"Ocorreu um erro na rota /api/comparativo-geral: {e}")
         return jsonify({"error": str(e)})
@@ -133,10 +233,13 @@ def get_comparativo_geral():
 def get_ranking_nacional():
     try:
         filtros = {'ano': request.args.get('ano')}
+        if backend_parquet():
+            df = agregar_parquet(['estado'], 'total_investido', **filtros).head(5)
+            return jsonify(centavos_para_reais(df, 'total_investido').to_dict(orient='records'))
         string_where, params = construir_clausula_where(filtros)
 
     
-        query = f"SELECT estado, SUM(valor) AS total_investido FROM despesas{string_where} GROUP BY estado ORDER BY total_investido DESC LIMIT 5"
+        query = f"SELECT estado, SUM(valor_centavos) AS total_investido FROM {app.config['TABLE_NAME']}{string_where} GROUP BY estado ORDER BY total_investido DESC LIMIT 5"
         
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
@@ -144,7 +247,7 @@ def get_ranking_nacional():
         conn.close()
         
     
-        return jsonify(df.to_dict(orient='records'))
+        return jsonify(centavos_para_reais(df, 'total_investido').to_dict(orient='records'))
 
     except Exception as e:
         print(f"Ocorreu um erro na rota /api/ranking-nacional: {e}")
@@ -174,6 +277,9 @@ def get_detalhes_categoria():
             'ano': ano_filter,
             'categoria': categoria_filter
         }
+        if backend_parquet():
+            df = agregar_parquet(['orgao'], 'total_por_orgao', **filtros)
+            return jsonify(centavos_para_reais(df, 'total_por_orgao').to_dict(orient='records'))
         string_where, params = construir_clausula_where(filtros)
 
         # ===================================================================
@@ -182,7 +288,7 @@ def get_detalhes_categoria():
         query = f"""
             SELECT
                 orgao,
-                SUM(valor) AS total_por_orgao
+                SUM(valor_centavos) AS total_por_orgao
             FROM
                 despesas
             {string_where}
@@ -191,6 +297,11 @@ def get_detalhes_categoria():
             ORDER BY
                 total_por_orgao DESC
         """
+        if modelo_estrela():
+            query = juntar_dimensao(
+                f"SELECT orgao_id, SUM(valor_centavos) AS total_por_orgao FROM fato_despesas{string_where} GROUP BY orgao_id",
+                'orgao_id', 'dim_orgao', 'orgao', ['total_por_orgao'], 't.total_por_orgao DESC'
+            )
         
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
@@ -198,7 +309,7 @@ def get_detalhes_categoria():
         conn.close()
         
         # A API agora envia uma lista já sumarizada e sem duplicatas
-        return jsonify(df.to_dict(orient='records'))
+        return jsonify(centavos_para_reais(df, 'total_por_orgao').to_dict(orient='records'))
 
     except Exception as e:
         print(f"Ocorreu um erro na rota /api/detalhes-categoria: {e}")
@@ -212,7 +323,7 @@ def get_dados_paginados():
         filtros = {'uf': request.args.get('uf'),'ano': request.args.get('ano')}
         string_where, params = construir_clausula_where(filtros)
 
-        base_query = f"SELECT * FROM despesas{string_where}"
+        base_query = f"SELECT * FROM {app.config['TABLE_NAME']}{string_where}"
         
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
@@ -220,9 +331,20 @@ def get_dados_paginados():
         count_query = base_query.replace("SELECT *", "SELECT COUNT(*)")
         total_rows = pd.read_sql_query(count_query, conn, params=tuple(params)).iloc[0,0]
         
-        final_query = base_query + f" ORDER BY valor DESC LIMIT {per_page} OFFSET {(page - 1) * per_page}"
+        final_query = base_query + f" ORDER BY valor_centavos DESC LIMIT {per_page} OFFSET {(page - 1) * per_page}"
+        if modelo_estrela():
+            # Nomes de órgão e categoria só para as linhas da página
+            final_query = f"""
+                SELECT t.id, t.estado, printf('%04d-01-01', t.ano) AS data, o.nome AS orgao,
+                       c.nome AS categoria_padronizada, t.valor_centavos, t.ano
+                FROM ({final_query}) t
+                LEFT JOIN dim_orgao o ON o.id = t.orgao_id
+                LEFT JOIN dim_categoria c ON c.id = t.categoria_id
+                ORDER BY t.valor_centavos DESC
+            """
         df = pd.read_sql_query(final_query, conn, params=tuple(params))
         conn.close()
+        df = centavos_para_reais(df.rename(columns={'valor_centavos': 'valor'}), 'valor')
         
         return jsonify({
             'total_registros': int(total_rows), 'pagina_atual': page, 'dados': df.to_dict(orient='records')
@@ -258,70 +380,85 @@ def upload_file():
         except ValueError:
             return jsonify({'erro': 'Ano deve ser um número válido.'}), 400
 
-        # Definir o caminho da pasta csvs
-        basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        upload_folder = os.path.join(basedir, 'csvs')
-        
-        # Criar a pasta se não existir
-        os.makedirs(upload_folder, exist_ok=True)
+        # Guardar o arquivo e enfileirar o processamento ETL (a resposta não espera a carga)
+        fila = importar_fila_etl()
+        estado = estado.upper()
+        # O arquivo já foi gravado e teve o hash calculado durante o recebimento (app/upload.py)
+        recebido = arquivo.stream if isinstance(arquivo.stream, ArquivoRecebido) else arquivo
+        job, deduplicado = fila.enfileirar_upload(
+            app.config['FILA_ETL_PATH'], app.config['CSVS_PATH'], estado, ano_int, recebido, config_fila_etl()
+        )
 
-        # Criar o nome do arquivo no formato SIGLAESTADO_ANO.csv
-        nome_arquivo = f"{estado.upper()}_{ano}.csv"
-        caminho_arquivo = os.path.join(upload_folder, nome_arquivo)
+        return jsonify({
+            'mensagem': 'Arquivo recebido! O processamento ETL foi enfileirado.',
+            'arquivo': f"{estado}_{ano_int}.csv",
+            'job_id': job['id'],
+            'status': job['status'],
+            'deduplicado': deduplicado,
+            'status_url': f"/api/jobs/{job['id']}",
+            'progresso_url': f"/api/jobs/{job['id']}/progresso"
+        }), 202
 
-        # Salvar o arquivo
-        arquivo.save(caminho_arquivo)
+    except Exception as e:
+        return jsonify({'erro': f'Erro interno do servidor: {str(e)}'}), 500
 
-        # Processar o arquivo automaticamente com ETL
-        try:
-            import sys
-            etl_path = os.path.join(basedir, 'etl')
-            if etl_path not in sys.path:
-                sys.path.append(etl_path)
-            
-            from etl.run_etl import processar_novo_arquivo
-            
-            print(f"🚀 Iniciando processamento ETL para {estado.upper()}_{ano}.csv")
-            sucesso_etl = processar_novo_arquivo(estado.upper(), ano_int)
-            
-            if sucesso_etl:
-                # Deletar o arquivo CSV após processamento bem-sucedido
-                try:
-                    os.remove(caminho_arquivo)
-                    print(f"🗑️ Arquivo {nome_arquivo} deletado após processamento bem-sucedido")
-                    arquivo_deletado = True
-                except Exception as delete_error:
-                    print(f"⚠️ Erro ao deletar arquivo {nome_arquivo}: {delete_error}")
-                    arquivo_deletado = False
-                
-                return jsonify({
-                    'mensagem': 'Arquivo enviado, processado com sucesso e removido!',
-                    'arquivo': nome_arquivo,
-                    'etl_processado': True,
-                    'arquivo_deletado': arquivo_deletado
-                }), 200
-            else:
-                return jsonify({
-                    'mensagem': 'Arquivo enviado, mas houve erro no processamento ETL.',
-                    'arquivo': nome_arquivo,
-                    'caminho': caminho_arquivo,
-                    'etl_processado': False,
-                    'aviso': 'Os dados podem não estar disponíveis no dashboard. Arquivo mantido para depuração.'
-                }), 200
-                
-        except Exception as etl_error:
-            print(f"❌ Erro no processamento ETL: {etl_error}")
-            return jsonify({
-                'mensagem': 'Arquivo enviado, mas houve erro no processamento ETL.',
-                'arquivo': nome_arquivo,
-                'caminho': caminho_arquivo,
-                'etl_processado': False,
-                'erro_etl': str(etl_error),
-                'aviso': 'Os dados podem não estar disponíveis no dashboard.'
-            }), 200
+def importar_fila_etl():
+    """
+    Importa a fila de jobs do ETL; o ETL importa seus módulos a partir de back/etl.
+    """
+    etl_path = os.path.join(os.path.dirname(app.config['CSVS_PATH']), 'etl')
+    if etl_path not in sys.path:
+        sys.path.append(etl_path)
+
+    from core import fila
+    return fila
+
+def config_fila_etl():
+    """
+    Configuração repassada à fila: banco da API, processos do pool e tamanho dos lotes.
+    """
+    return {
+        'nome_banco': app.config['DATABASE_PATH'],
+        'workers': app.config['ETL_WORKERS'],
+        'chunksize': app.config['ETL_CHUNKSIZE']
+    }
+
+def buscar_job_etl(job_id):
+    """
+    Busca um job da fila (retomando a fila no primeiro acesso após um reinício).
+    """
+    fila = importar_fila_etl()
+    fila.iniciar_fila(app.config['FILA_ETL_PATH'], app.config['CSVS_PATH'], config_fila_etl())
+    return fila.consultar_job(app.config['FILA_ETL_PATH'], job_id)
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_etl(job_id):
+    try:
+        job = buscar_job_etl(job_id)
+        if job is None:
+            return jsonify({'erro': 'Job não encontrado.'}), 404
+        return jsonify(job)
     except Exception as e:
-        return jsonify({'erro': f'Erro interno do servidor: {str(e)}'}), 500
+        print(f"Ocorreu um erro na rota /api/jobs: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/progresso', methods=['GET'])
+def get_progresso_job_etl(job_id):
+    try:
+        job = buscar_job_etl(job_id)
+        if job is None:
+            return jsonify({'erro': 'Job não encontrado.'}), 404
+        return jsonify({
+            'id': job['id'],
+            'status': job['status'],
+            'registros': job['registros'],
+            'registros_por_segundo': job['registros_por_segundo'],
+            'erro': job['erro'],
+            'atualizado_em': job['atualizado_em']
+        })
+    except Exception as e:
+        print(f"Ocorreu um erro na rota /api/jobs/progresso: {e}")
+        return jsonify({"error": str(e)}), 500
 
 @app.route('/api/insight-comparacao', methods=['GET'])
 def get_insight_comparacao():
@@ -341,30 +478,57 @@ def get_insight_comparacao():
         categoria_filter = ""
         if categorias and categorias[0]:  # Verifica se há categorias e não está vazio
             categoria_placeholders = ','.join(['?' for _ in categorias])
-            categoria_filter = f" AND categoria_padronizada IN ({categoria_placeholders})"
+            if modelo_estrela():
+                categoria_filter = f" AND categoria_id IN (SELECT id FROM dim_categoria WHERE nome IN ({categoria_placeholders}))"
+            else:
+                categoria_filter = f" AND categoria_padronizada IN ({categoria_placeholders})"
+        
+        condicao_ano, params_ano = filtro_ano(ano)
         
         # Query para buscar dados dos dois estados
         query = f"""
         SELECT 
             estado,
             categoria_padronizada,
-            SUM(valor) as total_gasto,
+            SUM(valor_centavos) as total_gasto,
             COUNT(*) as num_despesas,
-            AVG(valor) as gasto_medio
+            AVG(valor_centavos) as gasto_medio
         FROM despesas 
         WHERE estado IN (?, ?) 
-        AND strftime('%Y', data) = ?
+        AND {condicao_ano}
         AND categoria_padronizada != 'Outros'
         {categoria_filter}
         GROUP BY estado, categoria_padronizada
         ORDER BY estado, total_gasto DESC
         """
+        if modelo_estrela():
+            query = juntar_dimensao(
+                f"""
+                SELECT estado, categoria_id, SUM(valor_centavos) as total_gasto, COUNT(*) as num_despesas, AVG(valor_centavos) as gasto_medio
+                FROM fato_despesas
+                WHERE estado IN (?, ?)
+                AND {condicao_ano}
+                AND categoria_id NOT IN (SELECT id FROM dim_categoria WHERE nome = 'Outros')
+                {categoria_filter}
+                GROUP BY estado, categoria_id
+                """,
+                'categoria_id', 'dim_categoria', 'categoria_padronizada',
+                ['estado', 'total_gasto', 'num_despesas', 'gasto_medio'], 't.estado, t.total_gasto DESC'
+            )
         
-        params = [uf_a.upper(), uf_b.upper(), str(ano)]
+        params = [uf_a.upper(), uf_b.upper()] + params_ano
         if categorias and categorias[0]:
             params.extend(categorias)
             
-        df = pd.read_sql_query(query, conn, params=params)
+        if backend_parquet():
+            df = agregar_parquet(
+                ['estado', 'categoria_padronizada'], 'total_gasto', quantidade='num_despesas', media='gasto_medio',
+                ano=ano, estados=[uf_a.upper(), uf_b.upper()], excluir_categorias=['Outros'],
+                categorias=categorias if categorias and categorias[0] else None
+            ).sort_values(['estado', 'total_gasto'], ascending=[True, False], kind='stable').reset_index(drop=True)
+        else:
+            df = pd.read_sql_query(query, conn, params=params)
+        df = centavos_para_reais(df, 'total_gasto', 'gasto_medio')
         conn.close()
         
         if df.empty:
@@ -544,12 +708,19 @@ def get_categorias():
     Retorna todas as categorias únicas disponíveis no banco de dados.
     """
     try:
+        if backend_parquet():
+            df = agregar_parquet(['categoria_padronizada'], 'total', exigir_categoria=True)
+            return jsonify(sorted(df['categoria_padronizada']))
+        
         # Conectar ao banco usando o mesmo padrão das outras rotas
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
         
         # Buscar todas as categorias únicas
         query = "SELECT DISTINCT categoria_padronizada FROM despesas WHERE categoria_padronizada IS NOT NULL ORDER BY categoria_padronizada"
+        if modelo_estrela():
+            # A dimensão pode guardar categorias que não têm mais despesas
+            query = "SELECT nome FROM dim_categoria d WHERE EXISTS (SELECT 1 FROM fato_despesas f WHERE f.categoria_id = d.id) ORDER BY nome"
         
         cursor = conn.cursor()
         cursor.execute(query)
@@ -577,24 +748,42 @@ def get_despesas_estado_ano(estado, ano):
         db_path = app.config['DATABASE_PATH']
         conn = sqlite3.connect(db_path)
         
+        condicao_ano, params_ano = filtro_ano(ano)
+        
         # Query para buscar despesas por categoria de um estado e ano específicos
-        query = """
+        query = f"""
             SELECT 
                 categoria_padronizada as categoria,
-                SUM(valor) as valor
+                SUM(valor_centavos) as valor
             FROM despesas 
             WHERE estado = ? 
-            AND strftime('%Y', data) = ?
+            AND {condicao_ano}
             AND categoria_padronizada IS NOT NULL
             GROUP BY categoria_padronizada
             ORDER BY valor DESC
         """
+        if modelo_estrela():
+            query = juntar_dimensao(
+                f"""
+                SELECT categoria_id, SUM(valor_centavos) as valor
+                FROM fato_despesas
+                WHERE estado = ?
+                AND {condicao_ano}
+                AND categoria_id IS NOT NULL
+                GROUP BY categoria_id
+                """,
+                'categoria_id', 'dim_categoria', 'categoria', ['valor'], 't.valor DESC'
+            )
         
-        df = pd.read_sql_query(query, conn, params=(estado.upper(), str(ano)))
+        if backend_parquet():
+            df = agregar_parquet(['categoria_padronizada'], 'valor', uf=estado, ano=ano, exigir_categoria=True)
+            df = df.rename(columns={'categoria_padronizada': 'categoria'})
+        else:
+            df = pd.read_sql_query(query, conn, params=[estado.upper()] + params_ano)
         conn.close()
         
         # Converter para formato JSON
-        resultado = df.to_dict(orient='records')
+        resultado = centavos_para_reais(df, 'valor').to_dict(orient='records')
         
         return jsonify(resultado)
         
@@ -0,0 +1,104 @@
+"""
+Recebimento dos arquivos enviados ao /upload.
+O corpo multipart é gravado direto na pasta da fila de jobs enquanto chega, passando
+por um "tee" que calcula o SHA-256 e valida o UTF-8 na mesma passada. O arquivo é
+escrito uma única vez e o ETL não precisa relê-lo para obter o hash ou o encoding.
+"""
+
+import codecs
+import contextlib
+import hashlib
+import os
+import uuid
+
+from flask import Request, current_app
+
+
+class ArquivoRecebido:
+    """
+    Destino dos bytes de um arquivo enviado: grava no disco, calcula o SHA-256 e
+    verifica se o conteúdo é UTF-8 válido a cada bloco recebido.
+    Se a requisição terminar sem que o arquivo seja entregue à fila (upload
+    rejeitado ou erro), o arquivo parcial é removido.
+    """
+    
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.tamanho = 0
+        self._arquivo = open(caminho, 'w+b')
+        self._sha256 = hashlib.sha256()
+        self._decodificador = codecs.getincrementaldecoder('utf-8')()
+        self._utf8_valido = True
+        self._finalizado = False
+        self._entregue = False
+    
+    def write(self, dados):
+        self._arquivo.write(dados)
+        self._sha256.update(dados)
+        self.tamanho += len(dados)
+        if self._utf8_valido:
+            try:
+                self._decodificador.decode(dados)
+            except UnicodeDecodeError:
+                self._utf8_valido = False
+        return len(dados)
+    
+    def seek(self, *args):
+        return self._arquivo.seek(*args)
+    
+    def read(self, *args):
+        return self._arquivo.read(*args)
+    
+    def readline(self, *args):
+        return self._arquivo.readline(*args)
+    
+    def _finalizar(self):
+        if self._finalizado:
+            return
+        self._finalizado = True
+        if self._utf8_valido:
+            try:
+                self._decodificador.decode(b'', final=True)
+            except UnicodeDecodeError:
+                self._utf8_valido = False
+        self._arquivo.close()
+    
+    @property
+    def sha256(self):
+        self._finalizar()
+        return self._sha256.hexdigest()
+    
+    @property
+    def encoding(self):
+        """
+        Encoding que o ETL deve usar, ou None para manter o detectado pela amostra:
+        só é definido quando o arquivo inteiro não é UTF-8 válido.
+        """
+        self._finalizar()
+        return None if self._utf8_valido else 'latin-1'
+    
+    def save(self, destino):
+        """
+        Move o arquivo recebido para o destino (sem copiar os bytes).
+        """
+        self._finalizar()
+        os.replace(self.caminho, destino)
+        self._entregue = True
+    
+    def close(self):
+        self._finalizar()
+        if not self._entregue:
+            with contextlib.suppress(OSError):
+                os.remove(self.caminho)
+
+
+class RequisicaoComUpload(Request):
+    """
+    Requisição que grava os arquivos enviados com ArquivoRecebido na pasta da fila,
+    em vez do arquivo temporário padrão que depois seria copiado para lá.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        pasta_fila = os.path.join(current_app.config['CSVS_PATH'], 'fila')
+        os.makedirs(pasta_fila, exist_ok=True)
+        return ArquivoRecebido(os.path.join(pasta_fila, f"recebendo_{uuid.uuid4().hex}.csv"))
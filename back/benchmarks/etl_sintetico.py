@@ -0,0 +1,291 @@
+"""
+Benchmark do ETL com CSVs sintéticos no layout de cada estado.
+
+Gera, para cada estado de MAPEAMENTO_COLUNAS, um CSV com as colunas e a
+especificação de formato do estado (separador, linhas de preâmbulo e de rodapé,
+coluna de ano com vários anos, prefixo de código no órgão, colunas obrigatórias),
+processa-o com processar_estado de ponta a ponta e usa as medições de etl_runs
+(core/perfil.py) para calcular linhas/s e MB/s de cada etapa. Cada estado roda em
+um processo novo, então o pico de RSS informado é o do estado isolado; --comparar
+mostra a variação de linhas/s e do pico de memória em relação a um resultado anterior.
+
+Os resultados são gravados em JSON para comparar execuções:
+    python benchmarks/etl_sintetico.py --linhas 1000000 --estados MS RJ DF MA GO
+    python benchmarks/etl_sintetico.py --linhas 1000000 --comparar benchmarks/resultados/etl_anterior.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o ETL ao path para reaproveitar o mapeamento e o processamento dos estados
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'etl'))
+
+import run_etl
+from config.mapeamento_estados import MAPEAMENTO_COLUNAS
+from core import cache_registros
+from core.perfil import ETAPAS, iniciar_execucao
+from processadores.motor import LEITORES_CSV, definir_leitor_csv, obter_especificacao
+
+
+ANO = 2024
+
+PASTA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+
+# Linhas geradas e gravadas por vez (memória constante mesmo com 10 milhões de linhas)
+LINHAS_POR_BLOCO = 200000
+
+# Estados com arquivos reais em Latin-1
+ENCODING_ESTADO = {'RJ': 'latin-1'}
+
+ORGAOS = [
+    'Secretaria de Estado da Saúde', 'Secretaria de Estado da Educação', 'Polícia Militar',
+    'Departamento de Estradas de Rodagem', 'Secretaria da Fazenda', 'Fundo Estadual de Assistência Social',
+    'Secretaria de Ciência, Tecnologia e Inovação', 'Tribunal de Justiça', 'Assembleia Legislativa',
+    'Secretaria de Cultura', 'Casa Civil', 'Corpo de Bombeiros Militar', 'Universidade Estadual',
+    'Secretaria do Meio Ambiente', 'Defensoria Pública', 'Secretaria de Agricultura',
+]
+
+# Variantes numeradas dos órgãos, para o categorizador ver muitos nomes distintos
+VARIANTES_ORGAO = 20
+
+
+def _valores_brasileiros(rng, quantidade):
+    """
+    Valores monetários no formato brasileiro ('1.234,56'), alguns vazios ou zerados.
+    """
+    centavos = (rng.gamma(1.5, 2000000.0, quantidade)).astype('int64')
+    reais = pd.Series(centavos // 100).map('{:,}'.format).str.replace(',', '.', regex=False)
+    texto = reais + ',' + pd.Series(centavos % 100).astype(str).str.zfill(2)
+    sorteio = rng.random(quantidade)
+    texto[sorteio < 0.03] = ''
+    texto[(sorteio >= 0.03) & (sorteio < 0.05)] = '0,00'
+    return texto
+
+
+def _colunas_do_estado(config, especificacao):
+    """
+    Cabeçalho do CSV sintético: órgão, ano (se houver), colunas obrigatórias e as
+    colunas de valor, na ordem em que o estado costuma trazê-las.
+    """
+    colunas = config['colunas']
+    cabecalho = [colunas['orgao']]
+    if colunas['ano']:
+        cabecalho.insert(0, colunas['ano'])
+    for coluna in especificacao['colunas_obrigatorias']:
+        if coluna not in cabecalho:
+            cabecalho.insert(len(cabecalho) - 1, coluna)
+    
+    valores = especificacao['prioridade_valores'] or [colunas['valor_empenhado'], colunas['valor_pago']]
+    cabecalho += [coluna for coluna in valores if coluna and coluna not in cabecalho]
+    return cabecalho
+
+
+def _bloco_sintetico(rng, config, especificacao, cabecalho, linhas):
+    """
+    Gera um bloco de linhas do estado como DataFrame de textos.
+    """
+    colunas = config['colunas']
+    nomes = np.array([f"{orgao} {variante}" if variante else orgao
+                      for orgao in ORGAOS for variante in range(VARIANTES_ORGAO)], dtype=object)
+    orgaos = pd.Series(nomes[rng.integers(0, len(nomes), linhas)])
+    if especificacao['remover_prefixo_codigo']:
+        orgaos = pd.Series(rng.integers(1, 29, linhas)).astype(str).str.zfill(2) + ' - ' + orgaos
+    if especificacao['descartar_sem_orgao']:
+        orgaos[rng.random(linhas) < 0.01] = ''
+    
+    bloco = {}
+    for coluna in cabecalho:
+        if coluna == colunas['orgao']:
+            bloco[coluna] = orgaos
+        elif coluna == colunas['ano']:
+            # Extratos com vários anos: parte das linhas é de outro ano
+            anos = np.where(rng.random(linhas) < 0.8, ANO, ANO - 1) if especificacao['filtrar_ano'] else ANO
+            bloco[coluna] = pd.Series(anos, index=range(linhas)).astype(str)
+        elif coluna in especificacao['colunas_obrigatorias']:
+            bloco[coluna] = pd.Series(rng.integers(1, 99, linhas)).astype(str).str.zfill(2)
+        else:
+            bloco[coluna] = _valores_brasileiros(rng, linhas)
+    return pd.DataFrame(bloco, columns=cabecalho)
+
+
+def gerar_csv(sigla_estado, pasta, linhas, semente=42):
+    """
+    Grava {pasta}/{sigla}_{ANO}.csv com 'linhas' linhas de dados no layout do estado,
+    incluindo preâmbulo e rodapé. Retorna o caminho do arquivo.
+    """
+    config = MAPEAMENTO_COLUNAS[sigla_estado]
+    especificacao = obter_especificacao(config)
+    separador = especificacao['separador'] or ';'
+    cabecalho = _colunas_do_estado(config, especificacao)
+    rng = np.random.default_rng(semente)
+    
+    caminho = os.path.join(pasta, f"{sigla_estado}_{ANO}.csv")
+    with open(caminho, 'w', encoding=ENCODING_ESTADO.get(sigla_estado, 'utf-8'), newline='') as f:
+        for numero in range(especificacao['linhas_preambulo'] or 0):
+            f.write(f"Relatório de execução orçamentária {ANO} - {sigla_estado} (linha {numero + 1})\n")
+        
+        escritor = csv.writer(f, delimiter=separador, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        escritor.writerow(cabecalho)
+        for inicio in range(0, linhas, LINHAS_POR_BLOCO):
+            bloco = _bloco_sintetico(rng, config, especificacao, cabecalho, min(LINHAS_POR_BLOCO, linhas - inicio))
+            bloco.to_csv(f, sep=separador, header=False, index=False, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        
+        for numero in range(especificacao['linhas_rodape']):
+            escritor.writerow(['Total' if numero == 0 else f"Fonte: portal da transparência ({numero})"]
+                              + [''] * (len(cabecalho) - 1))
+    return caminho
+
+
+def _etapas_da_execucao(nome_banco, execucao):
+    """
+    Soma as medições de etl_runs por etapa para a execução informada.
+    """
+    conn = sqlite3.connect(nome_banco)
+    try:
+        linhas = conn.execute(
+            "SELECT etapa, SUM(tempo_s), SUM(cpu_s), SUM(linhas_entrada), MAX(pico_rss_mb) "
+            "FROM etl_runs WHERE execucao = ? GROUP BY etapa", (execucao,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return {etapa: {'tempo_s': tempo, 'cpu_s': cpu, 'linhas': linhas_entrada or 0, 'pico_rss_mb': pico}
+            for etapa, tempo, cpu, linhas_entrada, pico in linhas}
+
+
+def medir_estado(sigla_estado, pasta, linhas, chunksize=None, leitor='pandas'):
+    """
+    Gera o CSV do estado, processa-o com processar_estado em um banco novo e
+    retorna o resultado com as taxas totais e de cada etapa.
+    """
+    run_etl.PASTA_CSVS = pasta
+    definir_leitor_csv(leitor)
+    caminho = gerar_csv(sigla_estado, pasta, linhas)
+    tamanho_mb = os.path.getsize(caminho) / 1024 / 1024
+    
+    # Banco e cache de registros novos: mede a carga completa, sem nada reaproveitado
+    run_etl.NOME_BANCO = os.path.join(pasta, 'database', f"benchmark_{sigla_estado}.db")
+    cache_registros.PASTA_CACHE_REGISTROS = os.path.join(pasta, 'cache_registros')
+    shutil.rmtree(cache_registros.PASTA_CACHE_REGISTROS, ignore_errors=True)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_etl.verificar_banco(run_etl.NOME_BANCO, run_etl.NOME_TABELA)
+        execucao = iniciar_execucao(run_etl.NOME_BANCO)
+        inicio = time.perf_counter()
+        registros = run_etl.processar_estado(sigla_estado, ANO, chunksize, forcar=True)
+        tempo = time.perf_counter() - inicio
+    
+    etapas = _etapas_da_execucao(run_etl.NOME_BANCO, execucao)
+    for etapa, medidas in etapas.items():
+        duracao = medidas['tempo_s'] or 0
+        # A detecção não processa linhas: só o MB/s faz sentido para ela
+        medidas['linhas_por_s'] = medidas['linhas'] / duracao if duracao > 0 and medidas['linhas'] else None
+        medidas['mb_por_s'] = tamanho_mb / duracao if duracao > 0 else None
+    os.remove(caminho)
+    
+    return {
+        'estado': sigla_estado,
+        'linhas': linhas,
+        'tamanho_mb': round(tamanho_mb, 2),
+        'registros': registros,
+        'tempo_s': tempo,
+        'linhas_por_s': linhas / tempo,
+        'mb_por_s': tamanho_mb / tempo,
+        'pico_rss_mb': etapas.get('total', {}).get('pico_rss_mb'),
+        'etapas': {etapa: etapas[etapa] for etapa in ETAPAS if etapa in etapas},
+    }
+
+
+def _ambiente():
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def comparar(resultados, anterior):
+    """
+    Mostra, por estado, a variação de linhas/s em relação a um resultado anterior.
+    """
+    anteriores = {item['estado']: item for item in anterior['resultados']}
+    print(f"\n📈 Comparação com {anterior['gerado_em']} ({anterior['parametros']['linhas']} linhas)")
+    for item in resultados:
+        base = anteriores.get(item['estado'])
+        if base is None:
+            continue
+        variacao = item['linhas_por_s'] / base['linhas_por_s']
+        memoria = ''
+        if item['pico_rss_mb'] and base['pico_rss_mb']:
+            reducao = 1 - item['pico_rss_mb'] / base['pico_rss_mb']
+            memoria = f" | pico RSS {base['pico_rss_mb']:,.0f} -> {item['pico_rss_mb']:,.0f} MB ({reducao:.0%} menor)"
+        print(f"   {item['estado']}: {base['linhas_por_s']:>12,.0f} -> {item['linhas_por_s']:>12,.0f} linhas/s ({variacao:.2f}x){memoria}")
+
+
+def executar_benchmark(estados, linhas, chunksize=None, leitor='pandas'):
+    resultados = []
+    # Um processo novo por estado: o pico de RSS de um não contamina o do seguinte
+    contexto = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as pasta:
+        for sigla_estado in estados:
+            print(f"🏗️  {sigla_estado}: gerando {linhas} linhas e processando...")
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                item = executor.submit(medir_estado, sigla_estado, pasta, linhas, chunksize, leitor).result()
+            resultados.append(item)
+            
+            print(f"   {item['tamanho_mb']:.1f} MB, {item['registros']} registros em {item['tempo_s']:.2f}s "
+                  f"({item['linhas_por_s']:,.0f} linhas/s, {item['mb_por_s']:.1f} MB/s, pico RSS {item['pico_rss_mb'] or 0:.0f} MB)")
+            for etapa, medidas in item['etapas'].items():
+                if medidas['mb_por_s'] is None:
+                    continue
+                linhas_por_s = f"{medidas['linhas_por_s']:>14,.0f}" if medidas['linhas_por_s'] else f"{'-':>14}"
+                print(f"     {etapa:<14} {medidas['tempo_s']:8.2f}s  {linhas_por_s} linhas/s  {medidas['mb_por_s']:8.1f} MB/s")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark do ETL com CSVs sintéticos no layout de cada estado')
+    parser.add_argument('--linhas', type=int, default=100000, help='Linhas de dados por estado (até 10 milhões)')
+    parser.add_argument('--estados', nargs='+', help='Estados a medir (padrão: todos com mapeamento de colunas)')
+    parser.add_argument('--chunksize', type=int, help='Processar em lotes de N linhas, como run_etl.py --chunksize')
+    parser.add_argument('--leitor', choices=LEITORES_CSV, default=run_etl.LEITOR_CSV, help='Leitor dos CSVs, como run_etl.py --leitor')
+    parser.add_argument('--saida', type=str, help='Arquivo JSON dos resultados (padrão: benchmarks/resultados/etl_<data>.json)')
+    parser.add_argument('--comparar', type=str, help='Resultado JSON anterior para comparar')
+    
+    args = parser.parse_args()
+    
+    estados = args.estados or [sigla for sigla, config in MAPEAMENTO_COLUNAS.items() if config['colunas']['orgao']]
+    resultados = executar_benchmark(estados, args.linhas, args.chunksize, args.leitor)
+    
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"etl_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump({
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+            'parametros': {'linhas': args.linhas, 'chunksize': args.chunksize, 'leitor': args.leitor,
+                           'modelo': run_etl.MODELO_ARMAZENAMENTO},
+            'ambiente': _ambiente(),
+            'resultados': resultados,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados gravados em {saida}")
+    
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultados, json.load(f))
@@ -0,0 +1,146 @@
+"""
+Benchmark do plano de consultas da API: compara o filtro de ano antigo
+(strftime em cada linha) com o filtro indexável (coluna 'ano' / intervalo de datas).
+
+Gera um banco sintético com o esquema do ETL (migrações e índices incluídos),
+mostra o EXPLAIN QUERY PLAN de cada consulta e o tempo mediano de execução.
+
+Uso:
+    python benchmarks/plano_consultas.py --linhas 1000000
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o ETL ao path para reaproveitar o esquema e o carregador do banco
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'etl'))
+
+from config.mapeamento_estados import MAPEAMENTO_COLUNAS
+from core.categorizador import CATEGORIAS_CONFIG
+from core.database import verificar_banco, salvar_dados, atualizar_estatisticas
+
+
+ANOS = [2020, 2021, 2022, 2023, 2024, 2025]
+
+# (nome, SQL com {filtro_ano}, parâmetros que vêm antes do ano)
+CONSULTAS = [
+    ("analise (uf + ano)",
+     "SELECT categoria_padronizada, SUM(valor_centavos) FROM despesas WHERE categoria_padronizada != 'Outros' "
+     "AND estado = ? AND {filtro_ano} GROUP BY categoria_padronizada ORDER BY 2 DESC LIMIT 2",
+     ['SP']),
+    ("estatisticas/total (uf + ano)",
+     "SELECT SUM(valor_centavos) FROM despesas WHERE estado = ? AND {filtro_ano}",
+     ['SP']),
+    ("comparativo-geral (categoria + ano)",
+     "SELECT estado, SUM(valor_centavos) FROM despesas WHERE categoria_padronizada = ? AND {filtro_ano} "
+     "GROUP BY estado ORDER BY 2 DESC",
+     ['Saúde']),
+    ("despesas-estado (uf + ano)",
+     "SELECT categoria_padronizada, SUM(valor_centavos) FROM despesas WHERE estado = ? AND {filtro_ano} "
+     "AND categoria_padronizada IS NOT NULL GROUP BY categoria_padronizada ORDER BY 2 DESC",
+     ['RJ']),
+    ("insight-comparacao (2 ufs + ano)",
+     "SELECT estado, categoria_padronizada, SUM(valor_centavos), COUNT(*), AVG(valor_centavos) FROM despesas "
+     "WHERE estado IN (?, ?) AND {filtro_ano} AND categoria_padronizada != 'Outros' "
+     "GROUP BY estado, categoria_padronizada",
+     ['SP', 'MG']),
+]
+
+FILTROS_ANO = {
+    'strftime': ("strftime('%Y', data) = ?", lambda ano: [str(ano)]),
+    'intervalo de datas': ("data >= ? AND data < ?", lambda ano: [f"{ano}-01-01", f"{ano + 1}-01-01"]),
+    'coluna ano': ("ano = ?", lambda ano: [ano]),
+}
+
+
+def gerar_banco(caminho_banco, total_linhas):
+    """
+    Cria o banco com o esquema do ETL e insere despesas sintéticas.
+    """
+    verificar_banco(caminho_banco, 'despesas')
+    
+    rng = np.random.default_rng(42)
+    estados = np.array(list(MAPEAMENTO_COLUNAS.keys()), dtype=object)
+    categorias = np.array(list(CATEGORIAS_CONFIG.keys()) + ['Outros'], dtype=object)
+    
+    for ano in ANOS:
+        linhas = total_linhas // len(ANOS)
+        df = pd.DataFrame({
+            'estado': estados[rng.integers(0, len(estados), linhas)],
+            'data': date(ano, 1, 1),
+            'orgao': 'Órgão ' + pd.Series(rng.integers(0, 500, linhas)).astype(str),
+            'categoria_padronizada': categorias[rng.integers(0, len(categorias), linhas)],
+            'valor_centavos': (rng.gamma(2.0, 50000.0, linhas) * 100).round().astype('int64'),
+        })
+        salvar_dados(df, caminho_banco, 'despesas')
+    
+    atualizar_estatisticas(caminho_banco)
+
+
+def medir(conn, sql, params, repeticoes):
+    """
+    Retorna o tempo mediano (ms) da consulta.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tempos))
+
+
+def _normalizar(linhas):
+    """
+    Ordena as linhas e arredonda as somas: a ordem de soma muda com o plano.
+    """
+    return sorted(tuple(round(v, 2) if isinstance(v, float) else v for v in linha) for linha in linhas)
+
+
+def executar_benchmark(caminho_banco, ano, repeticoes):
+    conn = sqlite3.connect(caminho_banco)
+    
+    for nome, sql_base, params_base in CONSULTAS:
+        print(f"\n📊 {nome}")
+        resultados = {}
+        
+        for nome_filtro, (filtro, params_ano) in FILTROS_ANO.items():
+            sql = sql_base.format(filtro_ano=filtro)
+            params = params_base + params_ano(ano)
+            
+            plano = [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            tempo = medir(conn, sql, params, repeticoes)
+            resultados[nome_filtro] = _normalizar(conn.execute(sql, params).fetchall())
+            
+            print(f"   {nome_filtro:<20} {tempo:9.2f} ms  |  {' / '.join(plano)}")
+        
+        iguais = all(r == resultados['strftime'] for r in resultados.values())
+        print(f"   Resultados idênticos: {'✅' if iguais else '❌'}")
+    
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark do plano de consultas da API')
+    parser.add_argument('--linhas', type=int, default=600000, help='Total de linhas sintéticas')
+    parser.add_argument('--ano', type=int, default=2024, help='Ano usado nos filtros')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Execuções por consulta')
+    parser.add_argument('--banco', type=str, help='Banco existente a usar (não gera dados sintéticos)')
+    
+    args = parser.parse_args()
+    
+    if args.banco:
+        executar_benchmark(args.banco, args.ano, args.repeticoes)
+    else:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_banco = os.path.join(pasta, 'database', 'benchmark.db')
+            print(f"🏗️  Gerando banco sintético com {args.linhas} linhas...")
+            gerar_banco(caminho_banco, args.linhas)
+            executar_benchmark(caminho_banco, args.ano, args.repeticoes)
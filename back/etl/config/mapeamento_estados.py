@@ -1,7 +1,35 @@
 """
 Configuração de mapeamento de colunas para cada estado.
+
+Além das colunas, cada estado pode ter uma chave 'formato' com a especificação do
+layout do arquivo, lida pelo motor de ingestão (processadores/motor.py). As chaves
+omitidas usam os valores de FORMATO_PADRAO:
+
+- separador / linhas_preambulo: None para detectar pelo início do arquivo
+- linhas_rodape: linhas de total ou notas a descartar no fim do arquivo
+- prioridade_valores: colunas de valor em ordem de prioridade; vale o primeiro
+  valor positivo (padrão: valor_empenhado e depois valor_pago)
+- filtrar_ano: manter só as linhas cuja coluna 'ano' é o ano do arquivo
+- descartar_sem_orgao: descartar linhas sem órgão em vez de usar 'Não informado'
+- colunas_obrigatorias: colunas que precisam estar preenchidas na linha
+- remover_prefixo_codigo: "10 - Saúde" vira "Saúde"
+- detectar_colunas: procurar automaticamente colunas que não forem encontradas
+
+Um estado novo precisa apenas de uma entrada aqui.
 """
 
+FORMATO_PADRAO = {
+    'separador': None,
+    'linhas_preambulo': None,
+    'linhas_rodape': 0,
+    'prioridade_valores': None,
+    'filtrar_ano': False,
+    'descartar_sem_orgao': False,
+    'colunas_obrigatorias': [],
+    'remover_prefixo_codigo': False,
+    'detectar_colunas': True,
+}
+
 MAPEAMENTO_COLUNAS = {
     'AC': {  
         'arquivo': '../csvs/*AC*.csv',
@@ -67,10 +95,16 @@ MAPEAMENTO_COLUNAS = {
         'arquivo': '../csvs/*DF*.csv',
         'colunas': {
             'orgao': 'Unidade Gestora',
-            'valor_pago': 'Valor Final',
-            'valor_empenhado': None,  
+            'valor_pago': 'Total Pago',
+            'valor_empenhado': 'Empenhado',
             'ano': None,
             'estado': 'DF'
+        },
+        'formato': {  # Título na primeira linha
+            'separador': ';',
+            'linhas_preambulo': 1,
+            'prioridade_valores': ['Empenhado', 'Liquidado', 'Total Pago'],
+            'detectar_colunas': False
         }
     },
     'ES': {  
@@ -91,6 +125,12 @@ MAPEAMENTO_COLUNAS = {
             'valor_empenhado': 'View Execucao Orcamentaria Visao Geral[Valor Empenho]',
             'ano': 'View Execucao Orcamentaria Visao Geral[Numero Ano]',
             'estado': 'GO'
+        },
+        'formato': {  # Extração com vários anos
+            'separador': ',',
+            'linhas_preambulo': 0,
+            'filtrar_ano': True,
+            'detectar_colunas': False
         }
     },
     'MA': {  
@@ -101,6 +141,16 @@ MAPEAMENTO_COLUNAS = {
             'valor_empenhado': 'Empenhado',
             'ano': 'Ano',
             'estado': 'MA'
+        },
+        'formato': {  # Linhas de total e notas no fim do arquivo
+            'separador': ',',
+            'linhas_preambulo': 0,
+            'linhas_rodape': 3,
+            'prioridade_valores': ['Empenhado', 'Liquidado', 'Pago'],
+            'filtrar_ano': True,
+            'descartar_sem_orgao': True,
+            'colunas_obrigatorias': ['Código'],
+            'detectar_colunas': False
         }
     },
     'MT': {  
@@ -121,6 +171,12 @@ MAPEAMENTO_COLUNAS = {
             'valor_empenhado': 'Empenhado',  
             'ano': None,
             'estado': 'MS'
+        },
+        'formato': {  # 4 linhas de texto antes do cabeçalho
+            'separador': ';',
+            'linhas_preambulo': 4,
+            'prioridade_valores': ['Pago', 'Liquidado', 'Empenhado'],
+            'detectar_colunas': False
         }
     },
     'MG': {  
@@ -186,11 +242,18 @@ MAPEAMENTO_COLUNAS = {
     'RJ': {  
         'arquivo': '../csvs/*RJ*.csv',
         'colunas': {
-            'orgao': 'Fun��o',  
+            'orgao': 'Função',  # Função tratada como órgão
             'valor_pago': None,  
             'valor_empenhado': 'Valor Empenhado',
             'ano': None,
             'estado': 'RJ'
+        },
+        'formato': {  # 15 linhas de texto antes do cabeçalho
+            'separador': ';',
+            'linhas_preambulo': 15,
+            'descartar_sem_orgao': True,
+            'remover_prefixo_codigo': True,
+            'detectar_colunas': False
         }
     },
     'RN': {  
@@ -211,6 +274,12 @@ MAPEAMENTO_COLUNAS = {
             'valor_empenhado': None,
             'ano': 'Ano',
             'estado': 'RS'
+        },
+        'formato': {  # Extração com vários anos
+            'separador': ',',
+            'linhas_preambulo': 0,
+            'filtrar_ano': True,
+            'detectar_colunas': False
         }
     },
     'RO': {  
@@ -221,6 +290,11 @@ MAPEAMENTO_COLUNAS = {
             'valor_empenhado': 'DespesaEmpenhada',
             'ano': None,
             'estado': 'RO'
+        },
+        'formato': {
+            'separador': ',',
+            'linhas_preambulo': 0,
+            'detectar_colunas': False
         }
     },
     'RR': {  
@@ -251,6 +325,13 @@ MAPEAMENTO_COLUNAS = {
             'valor_empenhado': 'Empenhado',
             'ano': None,
             'estado': 'SP'
+        },
+        'formato': {  # Última linha com o total
+            'separador': ',',
+            'linhas_preambulo': 0,
+            'linhas_rodape': 1,
+            'descartar_sem_orgao': True,
+            'detectar_colunas': False
         }
     },
     'SE': {  
@@ -266,11 +347,19 @@ MAPEAMENTO_COLUNAS = {
     'TO': {  
         'arquivo': '../csvs/*TO*.csv',
         'colunas': {
-            'orgao': 'FUN��O',  # Coluna com função (que será tratada como órgão)
+            'orgao': 'FUNÇÃO',  # Coluna com função (que será tratada como órgão)
             'valor_pago': 'PAGO',
             'valor_empenhado': 'EMPENHADO',
             'ano': None,  # Não há coluna de ano específica no CSV
             'estado': 'TO'
+        },
+        'formato': {  # 2 linhas antes do cabeçalho e linha de total no fim
+            'separador': ';',
+            'linhas_preambulo': 2,
+            'linhas_rodape': 1,
+            'descartar_sem_orgao': True,
+            'remover_prefixo_codigo': True,
+            'detectar_colunas': False
         }
     }
 }
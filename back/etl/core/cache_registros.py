@@ -0,0 +1,114 @@
+"""
+Cache dos registros extraídos de cada arquivo de origem, antes da categorização.
+Guarda (estado, ano, orgao, valor_centavos) em Parquet, indexado pelo SHA-256 do
+arquivo, pelos anos lidos e pela especificação do estado: recarregar um arquivo
+depois de mudar só as palavras-chave do categorizador não relê nem reinterpreta o CSV.
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+PASTA_CACHE_REGISTROS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'cache_registros'))
+
+# Incrementar quando a extração do motor mudar de forma que invalide os caches existentes
+VERSAO_CACHE = 1
+
+ESQUEMA_CACHE = pa.schema([
+    ('estado', pa.string()),
+    ('ano', pa.int32()),
+    ('orgao', pa.string()),
+    ('valor_centavos', pa.int64()),
+]) if pa is not None else None
+
+
+def chave_cache(sha256, sigla_estado, anos, colunas, especificacao, formato):
+    """
+    Nome da entrada do cache para um arquivo lido com esta configuração.
+    O encoding fica de fora: o conteúdo decodificado do mesmo arquivo é o mesmo.
+    """
+    configuracao = {
+        'versao': VERSAO_CACHE,
+        'colunas': colunas,
+        'especificacao': especificacao,
+        'separador': formato['separador'],
+        'linhas_preambulo': formato['linhas_preambulo'],
+    }
+    assinatura = hashlib.sha256(json.dumps(configuracao, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return f"{sigla_estado}_{'-'.join(str(ano) for ano in sorted(anos))}_{sha256[:16]}_{assinatura}"
+
+
+def _caminho(chave):
+    return os.path.join(PASTA_CACHE_REGISTROS, f"{chave}.parquet")
+
+
+def ler_registros_em_cache(chave, chunksize=None):
+    """
+    Retorna um iterador de DataFrames (estado, ano, orgao, valor_centavos) com os
+    registros em cache, em lotes de até 'chunksize' linhas, ou None se não houver cache.
+    """
+    if pq is None or not os.path.exists(_caminho(chave)):
+        return None
+    
+    # Estado e órgão chegam como dicionário (coluna 'category' no pandas)
+    arquivo = pq.ParquetFile(_caminho(chave), read_dictionary=['estado', 'orgao'])
+    if chunksize:
+        return (pa.Table.from_batches([lote]).to_pandas() for lote in arquivo.iter_batches(batch_size=chunksize))
+    return iter([arquivo.read().to_pandas()])
+
+
+def _tabela_extraida(registros):
+    """
+    Converte registros do motor para o esquema do cache, com o ano no lugar da data.
+    """
+    codigos, datas = pd.factorize(registros['data'])
+    anos = np.array([data.year for data in datas] + [0], dtype='int32')[codigos]
+    return pa.table({
+        'estado': pa.array(registros['estado'].tolist(), pa.string()),
+        'ano': pa.array(anos, pa.int32()),
+        'orgao': pa.array(registros['orgao'].tolist(), pa.string()),
+        'valor_centavos': pa.array(registros['valor_centavos'].to_numpy(dtype='int64'), pa.int64()),
+    }, schema=ESQUEMA_CACHE)
+
+
+def gravar_registros_em_cache(lotes, chave):
+    """
+    Repassa os lotes de registros gravando a parte extraída de cada um no cache.
+    A entrada só é publicada depois do último lote: uma leitura interrompida (erro de
+    encoding, falha na gravação do banco) não deixa cache parcial. Entradas antigas do
+    mesmo estado e anos (conteúdo ou especificação anteriores) são removidas.
+    """
+    if pq is None:
+        yield from lotes
+        return
+    
+    os.makedirs(PASTA_CACHE_REGISTROS, exist_ok=True)
+    temporario = os.path.join(PASTA_CACHE_REGISTROS, f".{chave}.tmp")
+    escritor = pq.ParquetWriter(temporario, ESQUEMA_CACHE, compression='zstd')
+    concluido = False
+    try:
+        for lote in lotes:
+            escritor.write_table(_tabela_extraida(lote))
+            yield lote
+        concluido = True
+    finally:
+        escritor.close()
+        if concluido:
+            prefixo = chave.rsplit('_', 2)[0]
+            for antigo in glob.glob(os.path.join(PASTA_CACHE_REGISTROS, f"{prefixo}_*.parquet")):
+                os.remove(antigo)
+            os.replace(temporario, _caminho(chave))
+        else:
+            os.remove(temporario)
@@ -4,6 +4,113 @@ Gerenciador do banco de dados SQLite.
 
 import sqlite3
 import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.particoes import exportar_fatias
+from core.perfil import medir_etapa
+from core.quarentena import gravar_rejeitados
+
+
+# Colunas gravadas pelo ETL na tabela de despesas
+COLUNAS_DESPESAS = ['estado', 'data', 'orgao', 'categoria_padronizada', 'valor_centavos']
+
+# Colunas de texto com poucos valores distintos, mantidas como 'category' nos DataFrames
+COLUNAS_CATEGORICAS = ['estado', 'orgao', 'categoria_padronizada']
+
+# Tabela fato do modelo estrela: órgão e categoria viram ids de dim_orgao e dim_categoria
+# e a data vira o ano (ver _inserir_fatos)
+TABELA_FATO = 'fato_despesas'
+
+# Tamanho máximo da lista de nomes em cada consulta de ids das dimensões
+LOTE_DIMENSAO = 500
+
+# Ajustes do SQLite para a carga em massa: WAL evita bloquear leitores da API,
+# synchronous=NORMAL reduz fsyncs e o cache de 64 MB fica em memória
+PRAGMAS_CARGA = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+]
+
+# Segundos que uma carga espera pelo lock de escrita de outra (ex.: jobs da fila da API)
+TEMPO_ESPERA_LOCK = 300
+
+# Função chamada a cada inserção com o número de registros gravados (ver definir_acompanhamento)
+_ACOMPANHAMENTO = None
+
+# Pasta das partições Parquet mantidas junto com o banco (ver definir_pasta_parquet)
+_PASTA_PARQUET = None
+
+# Migrações versionadas do esquema (PRAGMA user_version guarda a última aplicada).
+# Cada item: (versão, descrição, comandos SQL); {tabela} é a tabela de despesas.
+MIGRACOES = [
+    (1, "coluna 'ano' gerada a partir da data", [
+        "ALTER TABLE {tabela} ADD COLUMN ano INTEGER "
+        "GENERATED ALWAYS AS (CAST(substr(data, 1, 4) AS INTEGER)) VIRTUAL",
+    ]),
+    (2, "índices compostos para os filtros da API", [
+        "CREATE INDEX IF NOT EXISTS idx_{tabela}_estado_ano_categoria "
+        "ON {tabela} (estado, ano, categoria_padronizada, valor)",
+        "CREATE INDEX IF NOT EXISTS idx_{tabela}_categoria_ano_estado "
+        "ON {tabela} (categoria_padronizada, ano, estado)",
+    ]),
+    (3, "manifesto de ingestão por (estado, ano)", [
+        "CREATE TABLE IF NOT EXISTS manifesto_ingestao ("
+        "estado TEXT NOT NULL, ano INTEGER NOT NULL, caminho TEXT NOT NULL, "
+        "tamanho INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL, "
+        "registros INTEGER NOT NULL, carregado_em TEXT DEFAULT CURRENT_TIMESTAMP, "
+        "PRIMARY KEY (estado, ano))",
+    ]),
+    (4, "anos cobertos pelo arquivo de origem no manifesto", [
+        "ALTER TABLE manifesto_ingestao ADD COLUMN anos_cobertos TEXT",
+    ]),
+    (5, "modelo estrela: dimensões de órgão e categoria e tabela fato", [
+        "CREATE TABLE IF NOT EXISTS dim_orgao (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS dim_categoria (id INTEGER PRIMARY KEY, nome TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS fato_despesas ("
+        "id INTEGER PRIMARY KEY, estado TEXT NOT NULL, ano INTEGER NOT NULL, "
+        "orgao_id INTEGER REFERENCES dim_orgao (id), "
+        "categoria_id INTEGER REFERENCES dim_categoria (id), valor REAL)",
+        "CREATE INDEX IF NOT EXISTS idx_fato_despesas_estado_ano_categoria "
+        "ON fato_despesas (estado, ano, categoria_id, valor)",
+        "CREATE INDEX IF NOT EXISTS idx_fato_despesas_categoria_ano_estado "
+        "ON fato_despesas (categoria_id, ano, estado, valor)",
+    ]),
+    (6, "valores em centavos inteiros (somas exatas)", [
+        "ALTER TABLE {tabela} ADD COLUMN valor_centavos INTEGER",
+        "UPDATE {tabela} SET valor_centavos = CAST(ROUND(valor * 100) AS INTEGER)",
+        "DROP INDEX IF EXISTS idx_{tabela}_estado_ano_categoria",
+        "CREATE INDEX IF NOT EXISTS idx_{tabela}_estado_ano_categoria "
+        "ON {tabela} (estado, ano, categoria_padronizada, valor_centavos)",
+        "ALTER TABLE {tabela} DROP COLUMN valor",
+        "ALTER TABLE fato_despesas ADD COLUMN valor_centavos INTEGER",
+        "UPDATE fato_despesas SET valor_centavos = CAST(ROUND(valor * 100) AS INTEGER)",
+        "DROP INDEX IF EXISTS idx_fato_despesas_estado_ano_categoria",
+        "DROP INDEX IF EXISTS idx_fato_despesas_categoria_ano_estado",
+        "CREATE INDEX IF NOT EXISTS idx_fato_despesas_estado_ano_categoria "
+        "ON fato_despesas (estado, ano, categoria_id, valor_centavos)",
+        "CREATE INDEX IF NOT EXISTS idx_fato_despesas_categoria_ano_estado "
+        "ON fato_despesas (categoria_id, ano, estado, valor_centavos)",
+        "ALTER TABLE fato_despesas DROP COLUMN valor",
+    ]),
+    (7, "medições das etapas de cada execução do ETL", [
+        "CREATE TABLE IF NOT EXISTS etl_runs ("
+        "id INTEGER PRIMARY KEY, execucao TEXT NOT NULL, estado TEXT, ano INTEGER, arquivo TEXT, "
+        "etapa TEXT NOT NULL, tempo_s REAL, cpu_s REAL, linhas_entrada INTEGER, linhas_saida INTEGER, "
+        "pico_rss_mb REAL, registrado_em TEXT DEFAULT CURRENT_TIMESTAMP)",
+        "CREATE INDEX IF NOT EXISTS idx_etl_runs_execucao ON etl_runs (execucao)",
+    ]),
+    (8, "quarentena das linhas rejeitadas na ingestão", [
+        "CREATE TABLE IF NOT EXISTS etl_rejeitados ("
+        "id INTEGER PRIMARY KEY, arquivo TEXT, estado TEXT, ano INTEGER, linha INTEGER, "
+        "motivo TEXT NOT NULL, conteudo TEXT, registrado_em TEXT DEFAULT CURRENT_TIMESTAMP)",
+        "CREATE INDEX IF NOT EXISTS idx_etl_rejeitados_arquivo ON etl_rejeitados (arquivo)",
+    ]),
+]
 
 
 def verificar_banco(nome_banco, nome_tabela):
@@ -20,10 +127,14 @@ def verificar_banco(nome_banco, nome_tabela):
         conn = sqlite3.connect(nome_banco)
         cursor = conn.cursor()
         
+        # No modelo estrela a tabela fato é criada pelas migrações; a tabela
+        # de despesas continua sendo a base do esquema
+        tabela_base = 'despesas' if nome_tabela == TABELA_FATO else nome_tabela
+        
         # Verificar se a tabela existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (nome_tabela,))
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (tabela_base,))
         if not cursor.fetchone():
-            print(f"⚠️  Tabela '{nome_tabela}' não existe. Criando automaticamente...")
+            print(f"⚠️  Tabela '{tabela_base}' não existe. Criando automaticamente...")
             
             # Criar tabela
             sql_criar_tabela = """
@@ -38,8 +149,11 @@ def verificar_banco(nome_banco, nome_tabela):
             """
             cursor.execute(sql_criar_tabela)
             conn.commit()
-            print(f"✅ Tabela '{nome_tabela}' criada com sucesso!")
-            
+            print(f"✅ Tabela '{tabela_base}' criada com sucesso!")
+        
+        # Aplicar migrações pendentes (coluna 'ano', índices e modelo estrela)
+        aplicar_migracoes(conn, tabela_base)
+        
         # Mostrar estatísticas do banco
         cursor.execute(f"SELECT COUNT(*) FROM {nome_tabela}")
         total_registros = cursor.fetchone()[0]
@@ -47,29 +161,542 @@ def verificar_banco(nome_banco, nome_tabela):
         
         conn.close()
         return True
-        
+    
     except sqlite3.Error as e:
         print(f"❌ Erro ao verificar/criar o banco: {e}")
         return False
 
 
-def salvar_dados(dados_processados, nome_banco, nome_tabela):
+def aplicar_migracoes(conn, nome_tabela):
     """
-    Salva os dados processados no banco SQLite.
+    Aplica, em ordem, as migrações de MIGRACOES ainda não registradas no banco.
+    Cada migração roda em sua própria transação junto com a atualização da versão.
     """
-    if not dados_processados:
-        return 0
+    versao_atual = conn.execute("PRAGMA user_version").fetchone()[0]
     
-    try:
-        import pandas as pd
-        df_final = pd.DataFrame(dados_processados)
+    for versao, descricao, comandos in MIGRACOES:
+        if versao <= versao_atual:
+            continue
         
+        print(f"🔧 Aplicando migração {versao}: {descricao}...")
+        with conn:
+            for comando in comandos:
+                comando = comando.format(tabela=nome_tabela)
+                # A coluna pode já existir (ou já ter sido removida) em bancos criados manualmente
+                if _alteracao_ja_aplicada(conn, comando):
+                    continue
+                conn.execute(comando)
+            conn.execute(f"PRAGMA user_version = {versao}")
+    
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _alteracao_ja_aplicada(conn, comando):
+    """
+    Verifica se um 'ALTER TABLE ... ADD/DROP COLUMN' não tem mais efeito no banco.
+    """
+    partes = comando.split()
+    if partes[:2] != ['ALTER', 'TABLE']:
+        return False
+    existe = _coluna_existe(conn, partes[2], partes[5])
+    return existe if partes[3] == 'ADD' else not existe
+
+
+def _coluna_existe(conn, nome_tabela, nome_coluna):
+    """
+    Verifica se a coluna existe na tabela (incluindo colunas geradas).
+    """
+    colunas = conn.execute(f"PRAGMA table_xinfo({nome_tabela})").fetchall()
+    return any(coluna[1] == nome_coluna for coluna in colunas)
+
+
+def atualizar_estatisticas(nome_banco):
+    """
+    Executa ANALYZE após as cargas para que o planejador do SQLite escolha os índices.
+    O analysis_limit mantém o custo baixo mesmo com milhões de linhas.
+    """
+    try:
         conn = sqlite3.connect(nome_banco)
-        df_final.to_sql(nome_tabela, conn, if_exists='append', index=False)
+        try:
+            conn.execute("PRAGMA analysis_limit=1000")
+            conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+        print("📈 Estatísticas do banco atualizadas (ANALYZE)")
+    except sqlite3.Error as e:
+        print(f"⚠️  Não foi possível atualizar as estatísticas: {e}")
+
+
+def definir_acompanhamento(funcao):
+    """
+    Registra uma função chamada a cada inserção com o número de registros gravados.
+    Usada pela fila de jobs da API para reportar o progresso de uma carga; None desativa.
+    """
+    global _ACOMPANHAMENTO
+    _ACOMPANHAMENTO = funcao
+
+
+def definir_pasta_parquet(pasta):
+    """
+    Ativa a exportação de cada fatia (estado, ano) gravada para uma partição Parquet
+    na pasta informada, lida pelo backend colunar da API; None desativa.
+    """
+    global _PASTA_PARQUET
+    _PASTA_PARQUET = pasta
+
+
+def _fatias_dos_registros(registros):
+    """
+    Retorna o conjunto de (estado, ano) presentes em um DataFrame de despesas.
+    """
+    fatias = pd.DataFrame({'estado': registros['estado'], 'ano': _anos_das_datas(registros['data'])})
+    return set(fatias.drop_duplicates().itertuples(index=False, name=None))
+
+
+def _atualizar_particoes(nome_banco, nome_tabela, fatias):
+    """
+    Regrava as partições Parquet das fatias alteradas por uma carga já confirmada.
+    Uma falha aqui não desfaz a carga: basta exportar de novo (run_etl.py --exportar-parquet).
+    """
+    if _PASTA_PARQUET is None or not fatias:
+        return
+    try:
+        exportar_fatias(nome_banco, nome_tabela, _PASTA_PARQUET, fatias)
+    except Exception as e:
+        print(f"⚠️  Não foi possível atualizar as partições Parquet: {e}")
+
+
+def conectar_para_carga(nome_banco):
+    """
+    Abre uma conexão com os pragmas de carga em massa aplicados.
+    Cargas simultâneas esperam a vez pelo lock de escrita em vez de falhar.
+    """
+    conn = sqlite3.connect(nome_banco, timeout=TEMPO_ESPERA_LOCK)
+    for pragma in PRAGMAS_CARGA:
+        conn.execute(pragma)
+    return conn
+
+
+def _inserir_registros(conn, registros, nome_tabela):
+    """
+    Insere um DataFrame com as colunas de despesas via executemany.
+    As colunas são convertidas para listas do Python de uma vez, sem o custo
+    por linha e por tipo do DataFrame.to_sql.
+    """
+    if nome_tabela == TABELA_FATO:
+        with medir_etapa('gravacao', len(registros)):
+            return _inserir_fatos(conn, registros)
+    
+    sql_insert = (
+        f"INSERT INTO {nome_tabela} ({', '.join(COLUNAS_DESPESAS)}) "
+        f"VALUES ({', '.join('?' for _ in COLUNAS_DESPESAS)})"
+    )
+    with medir_etapa('gravacao', len(registros)):
+        colunas = [_data_como_texto(registros[coluna]) if coluna == 'data' else registros[coluna].tolist()
+                   for coluna in COLUNAS_DESPESAS]
+        conn.executemany(sql_insert, zip(*colunas))
+    if _ACOMPANHAMENTO is not None:
+        _ACOMPANHAMENTO(len(registros))
+    return len(registros)
+
+
+def _confirmar(conn):
+    """
+    Confirma a transação da carga; o commit (fsync do WAL) conta como gravação.
+    As linhas em quarentena do arquivo entram na mesma transação.
+    """
+    with medir_etapa('gravacao', linhas_entrada=0):
+        gravar_rejeitados(conn)
         conn.commit()
+
+
+def salvar_rejeitados(nome_banco):
+    """
+    Grava as linhas em quarentena pendentes em uma transação própria, para arquivos
+    sem nenhum registro válido a gravar.
+    """
+    conn = conectar_para_carga(nome_banco)
+    try:
+        with conn:
+            gravar_rejeitados(conn)
+    finally:
+        conn.close()
+
+
+def _inserir_fatos(conn, registros):
+    """
+    Insere um DataFrame com as colunas de despesas no modelo estrela: órgão e
+    categoria são trocados pelos ids das dimensões (dicionário) e a data pelo ano.
+    """
+    orgao_ids = _codificar_dimensao(conn, 'dim_orgao', registros['orgao'])
+    categoria_ids = _codificar_dimensao(conn, 'dim_categoria', registros['categoria_padronizada'])
+    anos = _anos_das_datas(registros['data']).tolist()
+    
+    conn.executemany(
+        f"INSERT INTO {TABELA_FATO} (estado, ano, orgao_id, categoria_id, valor_centavos) VALUES (?, ?, ?, ?, ?)",
+        zip(registros['estado'].tolist(), anos, orgao_ids, categoria_ids, registros['valor_centavos'].tolist())
+    )
+    if _ACOMPANHAMENTO is not None:
+        _ACOMPANHAMENTO(len(registros))
+    return len(registros)
+
+
+def _codificar_dimensao(conn, tabela_dimensao, valores):
+    """
+    Retorna o id de cada valor na tabela de dimensão, cadastrando os nomes novos.
+    Só os valores distintos vão ao banco; nulos ficam sem id (None).
+    """
+    codigos, distintos = pd.factorize(valores)
+    distintos = [str(valor) for valor in distintos]
+    
+    conn.executemany(f"INSERT OR IGNORE INTO {tabela_dimensao} (nome) VALUES (?)", ((nome,) for nome in distintos))
+    
+    ids = {}
+    for inicio in range(0, len(distintos), LOTE_DIMENSAO):
+        nomes = distintos[inicio:inicio + LOTE_DIMENSAO]
+        marcadores = ', '.join('?' for _ in nomes)
+        ids.update(conn.execute(f"SELECT nome, id FROM {tabela_dimensao} WHERE nome IN ({marcadores})", nomes))
+    
+    ids_distintos = np.array([ids[nome] for nome in distintos] + [None], dtype=object)
+    return ids_distintos[codigos].tolist()
+
+
+def _data_como_texto(datas):
+    """
+    Converte a coluna de datas para texto 'AAAA-MM-DD' formatando só os valores
+    distintos (normalmente um por arquivo) em vez de cada linha.
+    """
+    codigos, distintas = pd.factorize(datas)
+    textos = np.array([str(data) for data in distintas] + [None], dtype=object)
+    return textos[codigos].tolist()
+
+
+def _informar_taxa(total_registros, inicio):
+    """
+    Mostra quantos registros foram gravados e a taxa em registros/s.
+    """
+    duracao = time.perf_counter() - inicio
+    taxa = total_registros / duracao if duracao > 0 else 0
+    print(f"  💾 {total_registros} registros gravados em {duracao:.2f}s ({taxa:,.0f} registros/s)")
+
+
+def ler_manifesto(nome_banco, estado, ano):
+    """
+    Retorna o registro do manifesto de ingestão para (estado, ano) ou None.
+    """
+    conn = sqlite3.connect(nome_banco)
+    try:
+        conn.row_factory = sqlite3.Row
+        linha = conn.execute(
+            "SELECT * FROM manifesto_ingestao WHERE estado = ? AND ano = ?", (estado, ano)
+        ).fetchone()
+    finally:
         conn.close()
+    
+    return dict(linha) if linha else None
+
+
+def registrar_manifesto(conn, manifesto):
+    """
+    Grava (ou substitui) o registro do manifesto de um arquivo carregado.
+    Deve ser chamada dentro da mesma transação que gravou os dados.
+    """
+    conn.execute(
+        "INSERT OR REPLACE INTO manifesto_ingestao "
+        "(estado, ano, caminho, tamanho, mtime_ns, sha256, registros, anos_cobertos) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (manifesto['estado'], manifesto['ano'], manifesto['caminho'], manifesto['tamanho'],
+         manifesto['mtime_ns'], manifesto['sha256'], manifesto['registros'],
+         manifesto.get('anos_cobertos') or str(manifesto['ano']))
+    )
+
+
+def atualizar_manifesto(nome_banco, manifesto):
+    """
+    Atualiza só o manifesto, para arquivos cujo conteúdo não mudou.
+    """
+    conn = sqlite3.connect(nome_banco)
+    try:
+        with conn:
+            registrar_manifesto(conn, manifesto)
+    finally:
+        conn.close()
+
+
+def _remover_fatia(conn, nome_tabela, estado, ano):
+    """
+    Remove os registros de (estado, ano) antes da nova carga do mesmo arquivo.
+    Retorna quantos registros foram removidos.
+    """
+    return conn.execute(f"DELETE FROM {nome_tabela} WHERE estado = ? AND ano = ?", (estado, ano)).rowcount
+
+
+def _informar_substituicao(removidos, manifesto):
+    """
+    Mostra quantos registros de uma carga anterior foram substituídos.
+    """
+    if removidos:
+        print(f"  ♻️  {removidos} registros anteriores de {manifesto['estado']} ({manifesto['ano']}) substituídos")
+
+
+def salvar_dados(dados_processados, nome_banco, nome_tabela, manifesto=None):
+    """
+    Salva os dados processados no banco SQLite em uma única transação.
+    Aceita um DataFrame já pronto ou uma lista de registros (dicts).
+    Com 'manifesto', a fatia (estado, ano) do arquivo é substituída e o manifesto
+    atualizado na mesma transação: recarregar um arquivo nunca duplica dados.
+    """
+    if dados_processados is None or len(dados_processados) == 0:
+        salvar_rejeitados(nome_banco)
+        return 0
+    
+    try:
+        if isinstance(dados_processados, pd.DataFrame):
+            df_final = dados_processados
+        else:
+            df_final = pd.DataFrame(dados_processados)
+            df_final = df_final.astype({coluna: 'category' for coluna in COLUNAS_CATEGORICAS if coluna in df_final.columns})
+        
+        inicio = time.perf_counter()
+        removidos = 0
+        conn = conectar_para_carga(nome_banco)
+        try:
+            with conn:
+                if manifesto is not None:
+                    removidos = _remover_fatia(conn, nome_tabela, manifesto['estado'], manifesto['ano'])
+                total_registros = _inserir_registros(conn, df_final, nome_tabela)
+                if manifesto is not None:
+                    registrar_manifesto(conn, dict(manifesto, registros=total_registros))
+                _confirmar(conn)
+        finally:
+            conn.close()
         
-        return len(df_final)
+        _informar_taxa(total_registros, inicio)
+        _informar_substituicao(removidos, manifesto)
     except Exception as e:
         print(f"❌ Erro ao salvar dados: {e}")
         return 0
+    
+    if _PASTA_PARQUET is not None:
+        _atualizar_particoes(nome_banco, nome_tabela, _fatias_dos_registros(df_final))
+    return total_registros
+
+
+def salvar_lotes(lotes, nome_banco, nome_tabela, manifesto=None):
+    """
+    Grava um iterador de DataFrames no banco dentro de uma única transação.
+    Cada lote é inserido e descartado antes de o próximo ser gerado, mantendo o uso
+    de memória constante. Em caso de erro a transação é desfeita e o erro repassado.
+    O 'manifesto' tem o mesmo papel que em salvar_dados; sem nenhum registro válido
+    a transação é desfeita e a fatia anterior é mantida.
+    """
+    total_registros = 0
+    removidos = 0
+    fatias = set()
+    inicio = time.perf_counter()
+    
+    conn = conectar_para_carga(nome_banco)
+    try:
+        with conn:
+            if manifesto is not None:
+                removidos = _remover_fatia(conn, nome_tabela, manifesto['estado'], manifesto['ano'])
+            for lote in lotes:
+                if lote.empty:
+                    continue
+                total_registros += _inserir_registros(conn, lote, nome_tabela)
+                if _PASTA_PARQUET is not None:
+                    fatias |= _fatias_dos_registros(lote)
+            
+            if total_registros == 0:
+                conn.rollback()
+                gravar_rejeitados(conn)
+                conn.commit()
+            else:
+                if manifesto is not None:
+                    registrar_manifesto(conn, dict(manifesto, registros=total_registros))
+                _confirmar(conn)
+    finally:
+        conn.close()
+    
+    if total_registros:
+        _informar_taxa(total_registros, inicio)
+        _informar_substituicao(removidos, manifesto)
+        if manifesto is not None:
+            fatias.add((manifesto['estado'], manifesto['ano']))
+        _atualizar_particoes(nome_banco, nome_tabela, fatias)
+    return total_registros
+
+
+def _anos_das_datas(datas):
+    """
+    Retorna o ano de cada data (objeto date ou texto 'AAAA-MM-DD') calculando-o
+    só para os valores distintos.
+    """
+    codigos, distintas = pd.factorize(datas)
+    anos = np.array([int(str(data)[:4]) for data in distintas] + [0])
+    return anos[codigos]
+
+
+def salvar_particoes(lotes, nome_banco, nome_tabela, manifestos):
+    """
+    Grava registros de vários anos lidos de um mesmo arquivo, em uma única transação.
+    'manifestos' associa cada ano que o arquivo pode gravar ao seu registro de manifesto;
+    linhas de outros anos são ignoradas. A fatia (estado, ano) é substituída na primeira
+    vez que o ano aparece, e só os anos encontrados têm o manifesto atualizado, com
+    'anos_cobertos' listando todos os anos gravados a partir do arquivo.
+    Retorna um dict {ano: registros gravados}.
+    """
+    registros_por_ano = {}
+    removidos = {}
+    inicio = time.perf_counter()
+    
+    conn = conectar_para_carga(nome_banco)
+    try:
+        with conn:
+            for lote in lotes:
+                if lote.empty:
+                    continue
+                anos = _anos_das_datas(lote['data'])
+                for ano in np.unique(anos).tolist():
+                    if ano not in manifestos:
+                        continue
+                    if ano not in registros_por_ano:
+                        manifesto = manifestos[ano]
+                        removidos[ano] = _remover_fatia(conn, nome_tabela, manifesto['estado'], ano)
+                        registros_por_ano[ano] = 0
+                    registros_por_ano[ano] += _inserir_registros(conn, lote[anos == ano], nome_tabela)
+            
+            anos_cobertos = ','.join(str(ano) for ano in sorted(registros_por_ano))
+            for ano, total in registros_por_ano.items():
+                registrar_manifesto(conn, dict(manifestos[ano], registros=total, anos_cobertos=anos_cobertos))
+            _confirmar(conn)
+    finally:
+        conn.close()
+    
+    if registros_por_ano:
+        _informar_taxa(sum(registros_por_ano.values()), inicio)
+        for ano, total in removidos.items():
+            _informar_substituicao(total, manifestos[ano])
+        _atualizar_particoes(nome_banco, nome_tabela, {(manifestos[ano]['estado'], ano) for ano in registros_por_ano})
+    return registros_por_ano
+
+
+def listar_orgaos(nome_banco, nome_tabela):
+    """
+    Retorna uma Series com os órgãos distintos gravados (no modelo estrela, os de dim_orgao).
+    """
+    conn = sqlite3.connect(nome_banco)
+    try:
+        if nome_tabela == TABELA_FATO:
+            linhas = conn.execute("SELECT nome FROM dim_orgao").fetchall()
+        else:
+            linhas = conn.execute(f"SELECT DISTINCT orgao FROM {nome_tabela} WHERE orgao IS NOT NULL").fetchall()
+    finally:
+        conn.close()
+    
+    return pd.Series([linha[0] for linha in linhas], dtype=object)
+
+
+def atualizar_categorias(nome_banco, nome_tabela, orgaos, categorias):
+    """
+    Aplica um novo mapeamento órgão -> categoria aos registros já gravados, com um
+    único UPDATE por junção (uma linha por órgão distinto) em vez de recarregar os
+    arquivos. Só as linhas cuja categoria muda são reescritas.
+    Retorna o número de registros alterados.
+    """
+    inicio = time.perf_counter()
+    conn = conectar_para_carga(nome_banco)
+    try:
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS temp.mapa_categorias")
+            if nome_tabela == TABELA_FATO:
+                conn.execute("CREATE TEMP TABLE mapa_categorias (orgao_id INTEGER PRIMARY KEY, categoria_id INTEGER)")
+                conn.executemany(
+                    "INSERT INTO mapa_categorias VALUES (?, ?)",
+                    zip(_codificar_dimensao(conn, 'dim_orgao', orgaos),
+                        _codificar_dimensao(conn, 'dim_categoria', categorias))
+                )
+                juncao = "m.orgao_id = d.orgao_id AND d.categoria_id IS NOT m.categoria_id"
+                atribuicao = "categoria_id = m.categoria_id"
+            else:
+                conn.execute("CREATE TEMP TABLE mapa_categorias (orgao TEXT PRIMARY KEY, categoria TEXT)")
+                conn.executemany("INSERT INTO mapa_categorias VALUES (?, ?)", zip(orgaos.tolist(), categorias.tolist()))
+                juncao = "m.orgao = d.orgao AND d.categoria_padronizada IS NOT m.categoria"
+                atribuicao = "categoria_padronizada = m.categoria"
+            
+            fatias = set()
+            if _PASTA_PARQUET is not None:
+                fatias = set(conn.execute(
+                    f"SELECT DISTINCT d.estado, d.ano FROM {nome_tabela} d JOIN mapa_categorias m ON {juncao}"
+                ).fetchall())
+            
+            alterados = conn.execute(
+                f"UPDATE {nome_tabela} AS d SET {atribuicao} FROM mapa_categorias m WHERE {juncao}"
+            ).rowcount
+            conn.execute("DROP TABLE temp.mapa_categorias")
+    finally:
+        conn.close()
+    
+    duracao = time.perf_counter() - inicio
+    print(f"  🏷️  {len(orgaos)} órgãos reclassificados, {alterados} registros com nova categoria em {duracao:.2f}s")
+    _atualizar_particoes(nome_banco, nome_tabela, fatias)
+    return alterados
+
+
+def _garantir_tabela_formatos(conn):
+    """
+    Cria a tabela de cache de formatos de CSV, se ainda não existir.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS formatos_csv (
+            hash_arquivo TEXT PRIMARY KEY,
+            encoding TEXT NOT NULL,
+            separador TEXT NOT NULL,
+            linhas_preambulo INTEGER NOT NULL,
+            detectado_em TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def ler_formato_em_cache(nome_banco, hash_arquivo):
+    """
+    Busca o formato já detectado para um arquivo com este hash.
+    Retorna um dict (encoding, separador, linhas_preambulo) ou None.
+    """
+    try:
+        conn = sqlite3.connect(nome_banco)
+        try:
+            _garantir_tabela_formatos(conn)
+            linha = conn.execute(
+                "SELECT encoding, separador, linhas_preambulo FROM formatos_csv WHERE hash_arquivo = ?",
+                (hash_arquivo,)
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  Cache de formatos indisponível: {e}")
+        return None
+    
+    if linha is None:
+        return None
+    return {'encoding': linha[0], 'separador': linha[1], 'linhas_preambulo': linha[2]}
+
+
+def salvar_formato_em_cache(nome_banco, hash_arquivo, formato):
+    """
+    Registra o formato detectado de um arquivo para as próximas execuções.
+    """
+    try:
+        conn = sqlite3.connect(nome_banco)
+        try:
+            with conn:
+                _garantir_tabela_formatos(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO formatos_csv (hash_arquivo, encoding, separador, linhas_preambulo) "
+                    "VALUES (?, ?, ?, ?)",
+                    (hash_arquivo, formato['encoding'], formato['separador'], formato['linhas_preambulo'])
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  Não foi possível gravar o formato em cache: {e}")
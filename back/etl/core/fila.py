@@ -0,0 +1,371 @@
+"""
+Fila de jobs do ETL para os arquivos enviados pela API.
+Os jobs ficam em uma tabela SQLite própria (sobrevivem a reinícios do servidor) e são
+executados por um pool de processos mantidos aquecidos, com pandas e o ETL já
+importados, de modo que o upload responde na hora com o id do job.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+
+# Adicionar path para imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+STATUS_PENDENTE = 'pendente'
+STATUS_PROCESSANDO = 'processando'
+STATUS_CONCLUIDO = 'concluido'
+STATUS_ERRO = 'erro'
+
+# Intervalo mínimo (s) entre gravações de progresso de um job
+INTERVALO_PROGRESSO = 0.5
+
+# Quantos caracteres finais do log de cada job são guardados
+LIMITE_LOG = 20000
+
+# Estado da fila no processo do servidor
+_INICIADA = False
+_POOL = None
+_TRAVA = threading.Lock()
+# (estado, ano) -> Future do último job enviado, para executar envios do mesmo par em sequência
+_ULTIMO_JOB = {}
+
+
+def _conectar(banco_fila):
+    """
+    Abre uma conexão com o banco da fila, com linhas acessíveis por nome.
+    """
+    conn = sqlite3.connect(banco_fila, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _agora():
+    """
+    Data e hora atuais no formato ISO, usadas nos campos de data dos jobs.
+    """
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def verificar_fila(banco_fila):
+    """
+    Cria o banco e a tabela de jobs da fila, se ainda não existirem.
+    """
+    os.makedirs(os.path.dirname(banco_fila), exist_ok=True)
+    conn = _conectar(banco_fila)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS etl_jobs (
+                    id TEXT PRIMARY KEY,
+                    estado TEXT NOT NULL,
+                    ano INTEGER NOT NULL,
+                    caminho TEXT NOT NULL,
+                    sha256 TEXT,
+                    encoding TEXT,
+                    status TEXT NOT NULL,
+                    envios INTEGER NOT NULL DEFAULT 1,
+                    registros INTEGER NOT NULL DEFAULT 0,
+                    registros_por_segundo REAL,
+                    erro TEXT,
+                    log TEXT,
+                    criado_em TEXT NOT NULL,
+                    iniciado_em TEXT,
+                    concluido_em TEXT,
+                    atualizado_em TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_etl_jobs_estado_ano ON etl_jobs (estado, ano, status)")
+            # Tabelas criadas antes do recebimento com hash não têm estas colunas
+            existentes = {coluna[1] for coluna in conn.execute("PRAGMA table_info(etl_jobs)")}
+            for coluna in ('sha256', 'encoding'):
+                if coluna not in existentes:
+                    conn.execute(f"ALTER TABLE etl_jobs ADD COLUMN {coluna} TEXT")
+    finally:
+        conn.close()
+
+
+def consultar_job(banco_fila, job_id):
+    """
+    Retorna o job como dict (sem o log completo) ou None se não existir.
+    """
+    conn = _conectar(banco_fila)
+    try:
+        linha = conn.execute("SELECT * FROM etl_jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    
+    if linha is None:
+        return None
+    job = dict(linha)
+    job.pop('caminho')
+    return job
+
+
+def _aquecer_processo(nome_banco):
+    """
+    Inicializador dos processos do pool: importa o ETL uma única vez por processo
+    e aponta-o para o banco da API.
+    """
+    import run_etl
+    run_etl.NOME_BANCO = nome_banco
+
+
+def _obter_pool(workers, nome_banco):
+    """
+    Cria o pool de processos do ETL no primeiro uso e o reaproveita depois.
+    """
+    global _POOL
+    if _POOL is None:
+        # 'spawn' porque o servidor Flask tem várias threads (fork não é seguro nesse caso)
+        _POOL = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_aquecer_processo,
+            initargs=(nome_banco,),
+        )
+    return _POOL
+
+
+def _submeter(job_id, estado, ano, banco_fila, pasta_csvs, config):
+    """
+    Envia o job ao pool. Com outro job do mesmo (estado, ano) ainda em andamento,
+    o envio só acontece quando ele terminar: duas cargas da mesma fatia nunca rodam juntas.
+    Deve ser chamada com _TRAVA adquirida.
+    """
+    pool = _obter_pool(config['workers'], config['nome_banco'])
+    argumentos = (job_id, banco_fila, pasta_csvs, config['chunksize'])
+    anterior = _ULTIMO_JOB.get((estado, ano))
+    
+    if anterior is None or anterior.done():
+        _ULTIMO_JOB[(estado, ano)] = pool.submit(executar_job, *argumentos)
+        return
+    
+    encadeado = Future()
+    
+    def enviar(_):
+        futuro = pool.submit(executar_job, *argumentos)
+        futuro.add_done_callback(lambda _: encadeado.set_result(None))
+    
+    anterior.add_done_callback(enviar)
+    _ULTIMO_JOB[(estado, ano)] = encadeado
+
+
+def iniciar_fila(banco_fila, pasta_csvs, config):
+    """
+    Prepara a fila no primeiro acesso do servidor: cria a tabela de jobs e reenvia
+    ao pool os jobs pendentes e os interrompidos por um reinício do servidor.
+    """
+    global _INICIADA
+    with _TRAVA:
+        if _INICIADA:
+            return
+        verificar_fila(banco_fila)
+        _retomar_jobs(banco_fila, pasta_csvs, config)
+        _INICIADA = True
+
+
+def _retomar_jobs(banco_fila, pasta_csvs, config):
+    """
+    Devolve à fila os jobs que estavam em processamento e envia todos os pendentes.
+    """
+    conn = _conectar(banco_fila)
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE etl_jobs SET status = ?, atualizado_em = ? WHERE status = ?",
+                (STATUS_PENDENTE, _agora(), STATUS_PROCESSANDO)
+            )
+        jobs = conn.execute(
+            "SELECT id, estado, ano FROM etl_jobs WHERE status = ? ORDER BY criado_em", (STATUS_PENDENTE,)
+        ).fetchall()
+    finally:
+        conn.close()
+    
+    for job in jobs:
+        _submeter(job['id'], job['estado'], job['ano'], banco_fila, pasta_csvs, config)
+    if jobs:
+        print(f"🔁 {len(jobs)} job(s) do ETL retomados")
+
+
+def enfileirar_upload(banco_fila, pasta_csvs, estado, ano, arquivo, config):
+    """
+    Guarda o arquivo enviado e cria o job que vai processá-lo.
+    'arquivo' precisa de um método save(caminho) (ex.: FileStorage do Flask); se também
+    tiver 'sha256' e 'encoding' (app.upload.ArquivoRecebido), eles seguem com o job.
+    'config' traz nome_banco, workers e chunksize.
+    Um novo envio para um (estado, ano) que já tem job pendente não cria outro job:
+    o arquivo do job pendente é trocado pelo mais recente e o mesmo id é devolvido.
+    Retorna (job, deduplicado).
+    """
+    pasta_fila = os.path.join(pasta_csvs, 'fila')
+    os.makedirs(pasta_fila, exist_ok=True)
+    
+    job_id = uuid.uuid4().hex
+    caminho = os.path.join(pasta_fila, f"{estado}_{ano}_{job_id}.csv")
+    arquivo.save(caminho)
+    sha256 = getattr(arquivo, 'sha256', None)
+    encoding = getattr(arquivo, 'encoding', None)
+    
+    iniciar_fila(banco_fila, pasta_csvs, config)
+    with _TRAVA:
+        conn = _conectar(banco_fila)
+        try:
+            with conn:
+                pendente = conn.execute(
+                    "SELECT id, caminho FROM etl_jobs WHERE estado = ? AND ano = ? AND status = ? "
+                    "ORDER BY criado_em DESC LIMIT 1",
+                    (estado, ano, STATUS_PENDENTE)
+                ).fetchone()
+                
+                # O UPDATE só vale se o job ainda não começou (o processo do pool pode tê-lo iniciado)
+                deduplicado = pendente is not None and conn.execute(
+                    "UPDATE etl_jobs SET caminho = ?, sha256 = ?, encoding = ?, envios = envios + 1, atualizado_em = ? "
+                    "WHERE id = ? AND status = ?",
+                    (caminho, sha256, encoding, _agora(), pendente['id'], STATUS_PENDENTE)
+                ).rowcount == 1
+                
+                if not deduplicado:
+                    conn.execute(
+                        "INSERT INTO etl_jobs (id, estado, ano, caminho, sha256, encoding, status, criado_em, atualizado_em) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, estado, ano, caminho, sha256, encoding, STATUS_PENDENTE, _agora(), _agora())
+                    )
+        finally:
+            conn.close()
+        
+        if deduplicado:
+            job_id = pendente['id']
+            with contextlib.suppress(OSError):
+                os.remove(pendente['caminho'])
+            print(f"♻️  Envio de {estado}_{ano}.csv agrupado ao job pendente {job_id}")
+        else:
+            _submeter(job_id, estado, ano, banco_fila, pasta_csvs, config)
+            print(f"📥 Job {job_id} enfileirado para {estado}_{ano}.csv")
+    
+    return consultar_job(banco_fila, job_id), deduplicado
+
+
+def _acompanhar_progresso(banco_fila, job_id):
+    """
+    Cria a função de acompanhamento que soma os registros gravados e atualiza o job
+    (registros e registros/s) no máximo a cada INTERVALO_PROGRESSO segundos.
+    """
+    progresso = {'registros': 0, 'inicio': time.perf_counter(), 'gravado_em': 0.0}
+    
+    def registrar(registros, forcar=False):
+        progresso['registros'] += registros
+        agora = time.perf_counter()
+        if not forcar and agora - progresso['gravado_em'] < INTERVALO_PROGRESSO:
+            return
+        progresso['gravado_em'] = agora
+        duracao = agora - progresso['inicio']
+        taxa = progresso['registros'] / duracao if duracao > 0 else None
+        conn = _conectar(banco_fila)
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE etl_jobs SET registros = ?, registros_por_segundo = ?, atualizado_em = ? WHERE id = ?",
+                    (progresso['registros'], taxa, _agora(), job_id)
+                )
+        finally:
+            conn.close()
+    
+    return registrar, progresso
+
+
+def _resumir_erros(log):
+    """
+    Extrai as linhas de erro (❌) do log do ETL.
+    """
+    erros = [linha.strip() for linha in log.splitlines() if '❌' in linha]
+    return '\n'.join(erros) or None
+
+
+def executar_job(job_id, banco_fila, pasta_csvs, chunksize=None):
+    """
+    Executada nos processos do pool: processa o arquivo do job com o ETL, gravando o
+    progresso na tabela de jobs. Como no upload síncrono, o CSV vai para
+    csvs/SIGLA_ANO.csv e é removido após uma carga bem-sucedida.
+    """
+    import run_etl
+    from core.database import definir_acompanhamento
+    from core.utils import registrar_arquivo_recebido
+    
+    conn = _conectar(banco_fila)
+    try:
+        with conn:
+            iniciado = conn.execute(
+                "UPDATE etl_jobs SET status = ?, iniciado_em = ?, atualizado_em = ? WHERE id = ? AND status = ?",
+                (STATUS_PROCESSANDO, _agora(), _agora(), job_id, STATUS_PENDENTE)
+            ).rowcount == 1
+        job = conn.execute("SELECT estado, ano, caminho, sha256, encoding FROM etl_jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    
+    if not iniciado:
+        return
+    
+    estado, ano = job['estado'], job['ano']
+    destino = os.path.join(pasta_csvs, f"{estado}_{ano}.csv")
+    registrar, progresso = _acompanhar_progresso(banco_fila, job_id)
+    saida = io.StringIO()
+    
+    try:
+        if job['caminho'] != destino:
+            os.replace(job['caminho'], destino)
+            conn = _conectar(banco_fila)
+            try:
+                with conn:
+                    conn.execute("UPDATE etl_jobs SET caminho = ? WHERE id = ?", (destino, job_id))
+            finally:
+                conn.close()
+        
+        # Hash e encoding já conhecidos no recebimento: o ETL lê o arquivo uma única vez
+        if job['sha256']:
+            registrar_arquivo_recebido(destino, job['sha256'], run_etl.NOME_BANCO, job['encoding'])
+        
+        definir_acompanhamento(registrar)
+        with contextlib.redirect_stdout(saida):
+            sucesso = run_etl.processar_novo_arquivo(estado, ano, chunksize)
+        erro = None if sucesso else (_resumir_erros(saida.getvalue()) or 'Nenhum registro válido foi processado.')
+    except Exception as e:
+        sucesso, erro = False, f"{type(e).__name__}: {e}"
+    finally:
+        definir_acompanhamento(None)
+    
+    log = saida.getvalue()
+    print(log, end='')
+    registrar(0, forcar=True)
+    
+    if sucesso:
+        try:
+            os.remove(destino)
+            print(f"🗑️ Arquivo {estado}_{ano}.csv deletado após processamento bem-sucedido")
+        except OSError as delete_error:
+            print(f"⚠️ Erro ao deletar arquivo {estado}_{ano}.csv: {delete_error}")
+    
+    conn = _conectar(banco_fila)
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE etl_jobs SET status = ?, registros = ?, erro = ?, log = ?, concluido_em = ?, atualizado_em = ? "
+                "WHERE id = ?",
+                # Uma carga com falha é desfeita por inteiro: nenhum registro fica gravado
+                (STATUS_CONCLUIDO if sucesso else STATUS_ERRO, progresso['registros'] if sucesso else 0,
+                 erro, log[-LIMITE_LOG:], _agora(), _agora(), job_id)
+            )
+    finally:
+        conn.close()
+    
+    print(f"{'✅' if sucesso else '❌'} Job {job_id} ({estado}_{ano}.csv): {progresso['registros']} registros")
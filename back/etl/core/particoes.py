@@ -0,0 +1,113 @@
+"""
+Partições Parquet por (estado, ano) para o backend colunar da API.
+Cada fatia carregada no SQLite é exportada para {pasta}/estado=XX/ano=AAAA/dados.parquet,
+com órgão e categoria codificados como dicionário e o valor em centavos inteiros.
+"""
+
+import os
+import sqlite3
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+# Nome do arquivo de cada partição (estado, ano)
+ARQUIVO_PARTICAO = 'dados.parquet'
+
+
+def caminho_particao(pasta, estado, ano):
+    """
+    Caminho do arquivo Parquet da fatia (estado, ano), no layout do Hive.
+    """
+    return os.path.join(pasta, f"estado={estado}", f"ano={int(ano)}", ARQUIVO_PARTICAO)
+
+
+def _consulta_fatia(nome_tabela):
+    """
+    SQL que lê uma fatia (estado, ano) com o órgão e a categoria por extenso,
+    tanto da tabela de despesas quanto da tabela fato do modelo estrela.
+    """
+    if nome_tabela == 'fato_despesas':
+        return (
+            "SELECT o.nome AS orgao, c.nome AS categoria_padronizada, f.valor_centavos "
+            "FROM fato_despesas f "
+            "LEFT JOIN dim_orgao o ON o.id = f.orgao_id "
+            "LEFT JOIN dim_categoria c ON c.id = f.categoria_id "
+            "WHERE f.estado = ? AND f.ano = ?"
+        )
+    return f"SELECT orgao, categoria_padronizada, valor_centavos FROM {nome_tabela} WHERE estado = ? AND ano = ?"
+
+
+def exportar_fatia(conn, nome_tabela, pasta, estado, ano):
+    """
+    Regrava a partição (estado, ano) a partir do banco. Uma fatia sem registros
+    tem a partição removida. O arquivo é escrito ao lado e trocado de uma vez,
+    então a API nunca lê uma partição pela metade.
+    Retorna o número de registros exportados.
+    """
+    destino = caminho_particao(pasta, estado, ano)
+    linhas = conn.execute(_consulta_fatia(nome_tabela), (estado, int(ano))).fetchall()
+    
+    if not linhas:
+        if os.path.exists(destino):
+            os.remove(destino)
+        return 0
+    
+    orgaos, categorias, valores = zip(*linhas)
+    tabela = pa.table({
+        'orgao': pa.array(orgaos, pa.string()).dictionary_encode(),
+        'categoria_padronizada': pa.array(categorias, pa.string()).dictionary_encode(),
+        'valor_centavos': pa.array(valores, pa.int64()),
+    })
+    
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    # O ponto no início faz a leitura do dataset ignorar o arquivo ainda incompleto
+    temporario = os.path.join(os.path.dirname(destino), f".{ARQUIVO_PARTICAO}.tmp")
+    pq.write_table(tabela, temporario, use_dictionary=True, compression='zstd')
+    os.replace(temporario, destino)
+    return len(linhas)
+
+
+def exportar_fatias(nome_banco, nome_tabela, pasta, fatias):
+    """
+    Exporta as fatias (estado, ano) informadas, normalmente as que acabaram de ser
+    gravadas no banco. Sem o pyarrow instalado, apenas avisa.
+    """
+    if pa is None:
+        print("⚠️  pyarrow não instalado: partições Parquet não atualizadas")
+        return 0
+    
+    total = 0
+    conn = sqlite3.connect(nome_banco)
+    try:
+        for estado, ano in sorted(fatias):
+            total += exportar_fatia(conn, nome_tabela, pasta, estado, ano)
+    finally:
+        conn.close()
+    
+    print(f"  🧱 {len(fatias)} partição(ões) Parquet atualizada(s) ({total} registros)")
+    return total
+
+
+def exportar_banco(nome_banco, nome_tabela, pasta):
+    """
+    Exporta todas as fatias (estado, ano) do banco, removendo as partições que
+    não existem mais nele (ex.: após remover_registros.py).
+    """
+    conn = sqlite3.connect(nome_banco)
+    try:
+        fatias = set(conn.execute(f"SELECT DISTINCT estado, ano FROM {nome_tabela}").fetchall())
+    finally:
+        conn.close()
+    
+    if os.path.isdir(pasta):
+        for pasta_estado in os.listdir(pasta):
+            for pasta_ano in os.listdir(os.path.join(pasta, pasta_estado)):
+                estado, ano = pasta_estado.split('=', 1)[-1], pasta_ano.split('=', 1)[-1]
+                fatias.add((estado, int(ano)))
+    
+    return exportar_fatias(nome_banco, nome_tabela, pasta, fatias)
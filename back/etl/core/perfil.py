@@ -0,0 +1,215 @@
+"""
+Medição das etapas do ETL por arquivo: detecção do formato, leitura do CSV,
+conversão dos valores, categorização e gravação no banco.
+Cada etapa acumula tempo de relógio, tempo de CPU, linhas de entrada e de saída e
+o pico de memória (RSS) do processo. Ao fim de cada arquivo as medições vão para a
+tabela etl_runs e, opcionalmente, para um arquivo JSON Lines. Com o perfil ativado,
+cada arquivo também gera um relatório do cProfile e das alocações do tracemalloc.
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windows: o pico de RSS fica sem medição
+    resource = None
+
+
+# Etapas medidas, na ordem em que acontecem
+ETAPAS = ['deteccao', 'leitura', 'valores', 'categorizacao', 'gravacao']
+
+# Linhas do resumo de alocações do tracemalloc gravado com o perfil
+LINHAS_RESUMO_MEMORIA = 25
+
+# Execução atual (ver iniciar_execucao); sem id, as medições não são registradas
+_EXECUCAO = {'id': None, 'nome_banco': None, 'saida_jsonl': None, 'pasta_perfil': None}
+
+# Totais de cada etapa do arquivo em processamento
+_ETAPAS_ARQUIVO = {}
+
+
+def pico_rss_mb():
+    """
+    Pico de memória residente do processo até agora, em MB (None se indisponível).
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # O Linux informa em KB e o macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def iniciar_execucao(nome_banco, saida_jsonl=None, pasta_perfil=None):
+    """
+    Ativa o registro das medições de cada arquivo na tabela etl_runs do banco.
+    Com 'saida_jsonl', cada medição também é acrescentada ao arquivo como uma linha JSON;
+    com 'pasta_perfil', cada arquivo é processado sob o cProfile e o tracemalloc.
+    Retorna o identificador da execução.
+    """
+    execucao = f"{datetime.now():%Y%m%d%H%M%S}_{uuid.uuid4().hex[:6]}"
+    _EXECUCAO.update(id=execucao, nome_banco=nome_banco, saida_jsonl=saida_jsonl, pasta_perfil=pasta_perfil)
+    if pasta_perfil:
+        os.makedirs(pasta_perfil, exist_ok=True)
+    return execucao
+
+
+@contextlib.contextmanager
+def medir_etapa(etapa, linhas_entrada=0):
+    """
+    Mede um trecho como parte da etapa informada, somando ao total do arquivo.
+    Entrega um dict em que o trecho pode ajustar 'linhas_entrada' e 'linhas_saida'
+    (por padrão, a saída é igual à entrada).
+    """
+    medicao = {'linhas_entrada': linhas_entrada, 'linhas_saida': None}
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield medicao
+    finally:
+        totais = _ETAPAS_ARQUIVO.setdefault(etapa, {
+            'tempo_s': 0.0, 'cpu_s': 0.0, 'linhas_entrada': 0, 'linhas_saida': 0, 'pico_rss_mb': None,
+        })
+        totais['tempo_s'] += time.perf_counter() - inicio
+        totais['cpu_s'] += time.process_time() - inicio_cpu
+        totais['linhas_entrada'] += medicao['linhas_entrada']
+        totais['linhas_saida'] += medicao['linhas_entrada'] if medicao['linhas_saida'] is None else medicao['linhas_saida']
+        totais['pico_rss_mb'] = pico_rss_mb()
+
+
+def medir_lotes(etapa, lotes):
+    """
+    Repassa os DataFrames de um iterador medindo a produção de cada um como a etapa.
+    """
+    lotes = iter(lotes)
+    while True:
+        with medir_etapa(etapa) as medicao:
+            lote = next(lotes, None)
+            if lote is not None:
+                medicao['linhas_entrada'] = len(lote)
+        if lote is None:
+            return
+        yield lote
+
+
+def coletar_etapas():
+    """
+    Retorna e zera os totais das etapas medidas desde a última coleta.
+    Usada pelos processos do pool para devolver as medições ao processo principal.
+    """
+    etapas = {etapa: dict(totais) for etapa, totais in _ETAPAS_ARQUIVO.items()}
+    _ETAPAS_ARQUIVO.clear()
+    return etapas
+
+
+def acumular_etapas(etapas):
+    """
+    Soma aos totais do arquivo atual as etapas medidas em outro processo.
+    """
+    for etapa, medido in etapas.items():
+        totais = _ETAPAS_ARQUIVO.setdefault(etapa, dict(medido, tempo_s=0.0, cpu_s=0.0, linhas_entrada=0, linhas_saida=0))
+        for campo in ('tempo_s', 'cpu_s', 'linhas_entrada', 'linhas_saida'):
+            totais[campo] += medido[campo]
+        picos = [pico for pico in (totais['pico_rss_mb'], medido['pico_rss_mb']) if pico is not None]
+        totais['pico_rss_mb'] = max(picos) if picos else None
+
+
+@contextlib.contextmanager
+def medir_arquivo(estado, ano, arquivo, etapas=()):
+    """
+    Delimita o processamento de um arquivo: zera os totais das etapas, soma as já
+    medidas em outros processos ('etapas') e, no fim, registra cada etapa e o total
+    do arquivo. Sem execução iniciada, apenas zera os totais.
+    """
+    coletar_etapas()
+    for medidas in etapas:
+        acumular_etapas(medidas)
+    
+    perfilador = None
+    if _EXECUCAO['id'] and _EXECUCAO['pasta_perfil']:
+        tracemalloc.start()
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+    
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        total = {'tempo_s': time.perf_counter() - inicio, 'cpu_s': time.process_time() - inicio_cpu}
+        if perfilador is not None:
+            perfilador.disable()
+            _salvar_perfil(perfilador, estado, ano)
+        
+        etapas_medidas = coletar_etapas()
+        if _EXECUCAO['id'] and etapas_medidas:
+            _registrar(estado, ano, arquivo, etapas_medidas, total)
+
+
+def _salvar_perfil(perfilador, estado, ano):
+    """
+    Grava o relatório do cProfile (.prof, para pstats/snakeviz) e o resumo das
+    linhas que mais alocaram memória segundo o tracemalloc.
+    """
+    base = os.path.join(_EXECUCAO['pasta_perfil'], f"{_EXECUCAO['id']}_{estado}_{ano or 'multiano'}")
+    perfilador.dump_stats(f"{base}.prof")
+    
+    # As alocações do próprio cProfile ficam fora do resumo
+    instantaneo = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    with open(f"{base}_memoria.txt", 'w', encoding='utf-8') as f:
+        f.write(f"Memória alocada pelo Python: atual {atual / 1024 / 1024:.1f} MB, pico {pico / 1024 / 1024:.1f} MB\n\n")
+        for estatistica in instantaneo.statistics('lineno')[:LINHAS_RESUMO_MEMORIA]:
+            f.write(f"{estatistica}\n")
+    print(f"  🔬 Perfil gravado em {base}.prof e {base}_memoria.txt")
+
+
+def _registrar(estado, ano, arquivo, etapas, total):
+    """
+    Mostra o resumo das etapas do arquivo e grava uma linha por etapa (mais o total)
+    na tabela etl_runs e no arquivo JSON Lines, se houver.
+    """
+    ordem = [etapa for etapa in ETAPAS if etapa in etapas] + [etapa for etapa in etapas if etapa not in ETAPAS]
+    resumo = ' | '.join(f"{etapa} {etapas[etapa]['tempo_s']:.2f}s" for etapa in ordem)
+    picos = [medidas['pico_rss_mb'] for medidas in etapas.values() if medidas['pico_rss_mb'] is not None]
+    pico = max(picos) if picos else None
+    print(f"  ⏱️  {resumo} | total {total['tempo_s']:.2f}s" + (f" | pico RSS {pico:.0f} MB" if pico else ''))
+    
+    linhas = [dict(etapas[etapa], etapa=etapa) for etapa in ordem]
+    linhas.append(dict(total, etapa='total', linhas_entrada=etapas.get('leitura', {}).get('linhas_entrada'),
+                       linhas_saida=etapas.get('gravacao', {}).get('linhas_saida'), pico_rss_mb=pico))
+    for linha in linhas:
+        linha.update(execucao=_EXECUCAO['id'], estado=estado, ano=ano, arquivo=arquivo)
+    
+    try:
+        conn = sqlite3.connect(_EXECUCAO['nome_banco'], timeout=30)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO etl_runs (execucao, estado, ano, arquivo, etapa, tempo_s, cpu_s, "
+                    "linhas_entrada, linhas_saida, pico_rss_mb) VALUES (:execucao, :estado, :ano, :arquivo, "
+                    ":etapa, :tempo_s, :cpu_s, :linhas_entrada, :linhas_saida, :pico_rss_mb)",
+                    linhas
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  Não foi possível registrar as medições em etl_runs: {e}")
+    
+    if _EXECUCAO['saida_jsonl']:
+        registrado_em = datetime.now().isoformat(timespec='seconds')
+        with open(_EXECUCAO['saida_jsonl'], 'a', encoding='utf-8') as f:
+            for linha in linhas:
+                f.write(json.dumps(dict(linha, registrado_em=registrado_em), ensure_ascii=False) + '\n')
@@ -0,0 +1,186 @@
+"""
+Quarentena das linhas rejeitadas pelo motor de ingestão.
+Em vez de um aviso no console por linha, cada linha rejeitada fica pendente com o
+arquivo de origem, o número da linha, o código do motivo e o conteúdo original, e é
+gravada em lote na tabela etl_rejeitados dentro da mesma transação dos registros
+válidos (ver gravar_rejeitados). O console mostra só os primeiros exemplos de cada
+arquivo e, no fim, a contagem por motivo.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+
+# Códigos dos motivos de rejeição
+MOTIVOS_REJEICAO = {
+    'campos_inconsistentes': 'quantidade de campos diferente da do cabeçalho',
+    'campo_obrigatorio_vazio': 'coluna obrigatória vazia',
+    'sem_orgao': 'linha sem órgão',
+    'valor_invalido': 'valor que não pôde ser convertido e nenhum outro valor válido',
+}
+
+# Linhas rejeitadas exibidas no console por arquivo; as demais só entram na contagem
+LIMITE_LOG_REJEITADOS = 5
+
+# Caracteres do conteúdo exibidos em cada exemplo
+TAMANHO_EXEMPLO = 120
+
+# Aviso do parser do pandas para as linhas com campos a mais (on_bad_lines='warn')
+_PADRAO_LINHA_MALFORMADA = re.compile(r'Skipping line (\d+): (.*)')
+
+# Arquivo em leitura: origem das linhas rejeitadas e contadores do arquivo
+_ARQUIVO = {'caminho': None, 'estado': None, 'ano': None, 'linhas_antes': 0, 'exibidas': 0, 'contagem': Counter()}
+
+# Linhas malformadas do arquivo em leitura (para corrigir a numeração das demais)
+_LINHAS_MALFORMADAS = []
+
+# Linhas a gravar: (arquivo, estado, ano, linha, motivo, conteudo)
+_PENDENTES = []
+
+# Arquivos cuja quarentena anterior é substituída na próxima gravação
+_ARQUIVOS_A_LIMPAR = set()
+
+# Linhas rejeitadas na execução, por motivo
+_TOTAIS = Counter()
+
+
+def iniciar_quarentena(arquivo=None, estado=None, ano=None, linhas_antes=0):
+    """
+    Começa a leitura de um arquivo: descarta as pendências de uma tentativa anterior
+    e zera os contadores. Com 'arquivo', as linhas já em quarentena desse arquivo são
+    substituídas pelas da nova leitura quando ela for gravada.
+    'linhas_antes' é o total de linhas antes do primeiro dado (preâmbulo e cabeçalho).
+    """
+    # Pendências não gravadas (leitura abandonada) saem dos totais da execução
+    _TOTAIS.subtract(pendente[4] for pendente in _PENDENTES)
+    _PENDENTES.clear()
+    _ARQUIVOS_A_LIMPAR.clear()
+    _LINHAS_MALFORMADAS.clear()
+    _ARQUIVO.update(caminho=arquivo, estado=estado, ano=ano, linhas_antes=linhas_antes, exibidas=0, contagem=Counter())
+    if arquivo is not None:
+        _ARQUIVOS_A_LIMPAR.add(arquivo)
+
+
+def _registrar(linhas, motivo, anos, conteudos):
+    """
+    Acrescenta as linhas às pendências, atualiza os contadores e exibe os primeiros
+    exemplos do arquivo.
+    """
+    _PENDENTES.extend(
+        (_ARQUIVO['caminho'], _ARQUIVO['estado'], ano, linha, motivo, conteudo)
+        for linha, ano, conteudo in zip(linhas, anos, conteudos)
+    )
+    _ARQUIVO['contagem'][motivo] += len(linhas)
+    _TOTAIS[motivo] += len(linhas)
+    
+    for linha, conteudo in zip(linhas, conteudos):
+        if _ARQUIVO['exibidas'] >= LIMITE_LOG_REJEITADOS:
+            break
+        _ARQUIVO['exibidas'] += 1
+        print(f"  ⚠️  Linha {linha} em quarentena ({motivo}): {str(conteudo)[:TAMANHO_EXEMPLO]}")
+        if _ARQUIVO['exibidas'] == LIMITE_LOG_REJEITADOS:
+            print("  ⚠️  Demais linhas rejeitadas apenas contadas (ver etl_rejeitados)")
+
+
+def rejeitar_linhas_malformadas(avisos):
+    """
+    Registra as linhas descartadas pelo parser, a partir dos avisos do pandas.
+    O conteúdo guardado é a descrição do problema (o parser não devolve a linha).
+    Linhas já registradas (leitura repetida com outro encoding) são ignoradas.
+    """
+    encontradas = [_PADRAO_LINHA_MALFORMADA.match(linha) for aviso in avisos for linha in str(aviso).splitlines()]
+    conhecidas = set(_LINHAS_MALFORMADAS)
+    malformadas = {int(m.group(1)): m.group(2) for m in encontradas if m and int(m.group(1)) not in conhecidas}
+    if not malformadas:
+        return
+    
+    _LINHAS_MALFORMADAS.extend(malformadas)
+    _LINHAS_MALFORMADAS.sort()
+    linhas, detalhes = zip(*sorted(malformadas.items()))
+    _registrar(list(linhas), 'campos_inconsistentes', [_ARQUIVO['ano']] * len(linhas), list(detalhes))
+
+
+def _linhas_no_arquivo(indices):
+    """
+    Converte a posição de cada registro entre os dados na linha do arquivo, pulando
+    as linhas malformadas já descartadas. Linhas em branco e campos com quebra de
+    linha não são considerados.
+    """
+    linhas = np.asarray(indices, dtype='int64') + _ARQUIVO['linhas_antes'] + 1
+    if _LINHAS_MALFORMADAS:
+        malformadas = np.array(_LINHAS_MALFORMADAS, dtype='int64')
+        # Linha que cada malformada ocuparia se as malformadas anteriores não existissem
+        validas_antes = malformadas - np.arange(len(malformadas))
+        linhas = linhas + np.searchsorted(validas_antes, linhas, side='right')
+    return linhas.tolist()
+
+
+def rejeitar(df, motivo, anos=None):
+    """
+    Registra as linhas de um bloco lido do CSV (índice = posição entre os dados) com
+    o motivo informado. 'anos' é o ano de cada linha em arquivos com vários anos.
+    """
+    if df.empty:
+        return
+    
+    linhas = _linhas_no_arquivo(df.index)
+    anos = [_ARQUIVO['ano']] * len(df) if anos is None else anos.tolist()
+    conteudos = df.to_json(orient='records', lines=True, force_ascii=False).splitlines()
+    _registrar(linhas, motivo, anos, conteudos)
+
+
+def resumir_quarentena():
+    """
+    Mostra a contagem de linhas rejeitadas do arquivo, por motivo.
+    """
+    contagem = _ARQUIVO['contagem']
+    if contagem:
+        detalhes = ', '.join(f"{motivo}: {quantidade}" for motivo, quantidade in contagem.most_common())
+        print(f"  🚫 {sum(contagem.values())} linhas em quarentena ({detalhes})")
+
+
+def coletar_rejeitados():
+    """
+    Retorna e descarta as pendências do processo atual. Usada pelos processos do pool
+    para entregar as linhas rejeitadas ao processo principal, que grava o banco.
+    """
+    coletados = (set(_ARQUIVOS_A_LIMPAR), list(_PENDENTES))
+    _ARQUIVOS_A_LIMPAR.clear()
+    _PENDENTES.clear()
+    return coletados
+
+
+def acumular_rejeitados(coletados):
+    """
+    Acrescenta às pendências as linhas rejeitadas em outro processo.
+    """
+    arquivos, pendentes = coletados
+    _ARQUIVOS_A_LIMPAR.update(arquivos)
+    _PENDENTES.extend(pendentes)
+    _TOTAIS.update(pendente[4] for pendente in pendentes)
+
+
+def gravar_rejeitados(conn):
+    """
+    Grava as linhas pendentes em etl_rejeitados, substituindo a quarentena anterior
+    dos arquivos relidos. Deve ser chamada dentro da transação que grava os registros.
+    """
+    for arquivo in _ARQUIVOS_A_LIMPAR:
+        conn.execute("DELETE FROM etl_rejeitados WHERE arquivo = ?", (arquivo,))
+    _ARQUIVOS_A_LIMPAR.clear()
+    
+    if _PENDENTES:
+        conn.executemany(
+            "INSERT INTO etl_rejeitados (arquivo, estado, ano, linha, motivo, conteudo) VALUES (?, ?, ?, ?, ?, ?)",
+            _PENDENTES
+        )
+        _PENDENTES.clear()
+
+
+def estatisticas_quarentena():
+    """
+    Retorna o total de linhas rejeitadas na execução, por motivo.
+    """
+    return {motivo: total for motivo, total in _TOTAIS.items() if total > 0}
@@ -2,8 +2,56 @@
 Utilitários para detecção automática de colunas em CSVs e manipulação de dados.
 """
 
+import codecs
+import csv
+import hashlib
+import io
+import mmap
+import os
+
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+from core.database import ler_formato_em_cache, salvar_formato_em_cache
+from core.perfil import medir_etapa
+
+
+# Quantidade de bytes lida do início do arquivo para detectar o formato
+TAMANHO_AMOSTRA_CSV = 64 * 1024
+
+# Separadores testados na detecção, em ordem de preferência
+SEPARADORES_CSV = [';', ',', '\t', '|']
+
+# Linhas de dados lidas na sondagem do esquema (analisar_todos_csvs)
+LINHAS_AMOSTRA_ESQUEMA = 200
+
+# Bytes contados por vez na contagem de linhas
+TAMANHO_BLOCO_CONTAGEM = 16 * 1024 * 1024
+
+# Máximo de dígitos na parte inteira de um valor monetário: acima disso o valor é
+# tratado como inválido (em centavos, 10^15 reais ainda cabe com folga no int64)
+MAX_DIGITOS_INTEIROS = 15
+
+# Número decimal simples, já normalizado (sem notação científica, inf ou nan)
+PADRAO_NUMERO_DECIMAL = r'^(?P<sinal>[+-]?)(?P<inteiro>\d*)(?:\.(?P<fracao>\d*))?$'
+
+# Leitor de CSV do pyarrow (carregar_csv_com_arrow) disponível
+LEITOR_ARROW_DISPONIVEL = pacsv is not None
+
+# Tipo das colunas de texto lidas dos CSVs: string do pyarrow (um buffer contíguo
+# por coluna) em vez de um objeto Python por célula; sem o pyarrow, texto comum
+TIPO_TEXTO = pd.ArrowDtype(pa.string()) if pa is not None else str
+
+# Hashes já calculados nesta execução: (caminho, tamanho, mtime) -> sha256
+_HASHES_ARQUIVOS = {}
+
 
 def detectar_colunas_csv(df, sigla_estado):
     """
@@ -47,77 +95,347 @@ def detectar_colunas_csv(df, sigla_estado):
     }
 
 
-def obter_valor_coluna(row, nome_coluna):
+def _como_serie(valores):
     """
-    Obtém o valor de uma coluna, tratando diferentes tipos de dados e formatos.
+    Converte a entrada do conversor de valores em uma pandas Series.
+    Arrays do pyarrow são mantidos em formato Arrow para usar os kernels do pyarrow.
     """
-    if nome_coluna is None:
-        return None
+    if isinstance(valores, pd.Series):
+        return valores
+    if type(valores).__module__.startswith('pyarrow'):
+        return pd.Series(pd.arrays.ArrowExtensionArray(valores))
+    return pd.Series(valores, dtype=object)
+
+
+def _normalizar_texto_monetario(serie):
+    """
+    Normaliza valores monetários textuais para o formato numérico com ponto decimal.
+    Ex.: 'R$ 1.234.567,89' -> '1234567.89', '(1.234,56)' -> '-1234.56'.
+    """
+    if not isinstance(serie.dtype, pd.ArrowDtype):
+        serie = serie.astype(str)
+    
+    # Remover símbolos de moeda, aspas e espaços
+    texto = serie.str.replace(r'R\$|[$"\s]', '', regex=True)
+    
+    # Negativos em formato contábil: (1.234,56)
+    texto = texto.str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+    
+    # Tratar separadores decimais diferentes
+    tem_virgula = texto.str.contains(',', regex=False, na=False)
+    formato_americano = tem_virgula & texto.str.contains(r',.*\.[^,]*$', regex=True, na=False)
+    milhares_sem_decimal = ~tem_virgula & texto.str.contains(r'\..*\.', regex=True, na=False)
     
+    # Formato americano: 1,234,567.89
+    texto = texto.where(~formato_americano, texto.str.replace(',', '', regex=False))
+    # Formato brasileiro: 1.234.567,89 ou 1234567,89
+    brasileiro = tem_virgula & ~formato_americano
+    texto = texto.where(~brasileiro, texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    # Somente pontos de milhar: 1.234.567
+    texto = texto.where(~milhares_sem_decimal, texto.str.replace('.', '', regex=False))
+    
+    return texto
+
+
+def _partes_numericas(texto):
+    """
+    Separa sinal, parte inteira e fração do texto normalizado e indica os valores válidos:
+    números decimais simples com até MAX_DIGITOS_INTEIROS dígitos na parte inteira.
+    """
+    partes = texto.str.extract(PADRAO_NUMERO_DECIMAL)
+    sinal = partes['sinal'].fillna('')
+    inteiro = partes['inteiro'].fillna('').str.lstrip('0')
+    fracao = partes['fracao'].fillna('')
+    validos = (
+        partes['inteiro'].notna()
+        & ((partes['inteiro'].fillna('').str.len() + fracao.str.len()) > 0)
+        & (inteiro.str.len() <= MAX_DIGITOS_INTEIROS)
+    )
+    return sinal, inteiro, fracao, validos.astype(bool)
+
+
+def _texto_para_centavos(texto):
+    """
+    Converte texto numérico normalizado em centavos inteiros exatos (sem passar por float),
+    arredondando a terceira casa decimal para cima a partir de 5.
+    """
+    sinal, inteiro, fracao, validos = _partes_numericas(texto)
+    
+    reais = pd.to_numeric(inteiro.where(validos & (inteiro != ''), '0')).astype('int64')
+    milesimos = pd.to_numeric((fracao.where(validos, '') + '000').str[:3]).astype('int64')
+    centavos = reais * 100 + (milesimos + 5) // 10
+    centavos = centavos.where(sinal != '-', -centavos)
+    
+    return pd.Series(pd.arrays.IntegerArray(centavos.to_numpy(dtype='int64'), ~validos.to_numpy(dtype=bool)), index=texto.index)
+
+
+def converter_valores_brasileiros(valores, centavos=False):
+    """
+    Converte valores monetários para números de forma vetorizada.
+    Aceita uma pandas Series ou um array do pyarrow (Array/ChunkedArray) e trata
+    'R$', pontos de milhar, vírgula decimal, negativos e campos vazios.
+    Retorna uma Series float64 (nulos como NaN) ou, com centavos=True, os valores
+    exatos em centavos como Int64 (nulos como <NA>). Nos dois modos, notação
+    científica e valores acima de MAX_DIGITOS_INTEIROS dígitos são inválidos.
+    """
+    serie = _como_serie(valores)
+    
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = serie.astype('float64')
+        numeros = numeros.where(numeros.abs() < 10.0 ** MAX_DIGITOS_INTEIROS)
+        if centavos:
+            return (numeros * 100).round().astype('Int64')
+        return numeros
+    
+    texto = _normalizar_texto_monetario(serie)
+    if centavos:
+        return _texto_para_centavos(texto)
+    
+    # Remontar o número a partir das partes validadas (sem zeros à esquerda)
+    sinal, inteiro, fracao, validos = _partes_numericas(texto)
+    numero = sinal + inteiro.mask(inteiro == '', '0') + '.' + fracao.mask(fracao == '', '0')
+    return pd.to_numeric(numero.where(validos), errors='coerce').astype('float64')
+
+
+def obter_valores_coluna(df, nome_coluna):
+    """
+    Retorna a coluna inteira convertida para reais, com NaN onde o valor está
+    ausente, é inválido ou não é positivo.
+    """
+    if nome_coluna is None or nome_coluna not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype='float64')
+    
+    valores = converter_valores_brasileiros(df[nome_coluna])
+    return valores.where(valores > 0)
+
+
+def calcular_hash_arquivo(arquivo):
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo, lendo-o em blocos de 1 MB.
+    O resultado é memorizado por (caminho, tamanho, data de modificação), então o
+    mesmo arquivo não é lido de novo durante a execução.
+    """
+    info = os.stat(arquivo)
+    chave = (os.path.abspath(arquivo), info.st_size, info.st_mtime_ns)
+    
+    if chave not in _HASHES_ARQUIVOS:
+        sha256 = hashlib.sha256()
+        with medir_etapa('deteccao'), open(arquivo, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(bloco)
+        _HASHES_ARQUIVOS[chave] = sha256.hexdigest()
+    
+    return _HASHES_ARQUIVOS[chave]
+
+
+def registrar_arquivo_recebido(arquivo, sha256, nome_banco, encoding=None):
+    """
+    Registra o SHA-256 de um arquivo já calculado no recebimento (upload pela API),
+    para que calcular_hash_arquivo não releia o arquivo. Com 'encoding', o formato em
+    cache passa a usá-lo: a amostra inicial pode parecer UTF-8 mesmo quando o arquivo
+    inteiro não é, e o ETL teria de reler tudo com o encoding reserva.
+    """
+    info = os.stat(arquivo)
+    _HASHES_ARQUIVOS[(os.path.abspath(arquivo), info.st_size, info.st_mtime_ns)] = sha256
+    
+    if encoding:
+        formato = ler_formato_em_cache(nome_banco, sha256) or detectar_formato_csv(arquivo)
+        if formato['encoding'] != encoding:
+            salvar_formato_em_cache(nome_banco, sha256, dict(formato, encoding=encoding))
+
+
+def _contar_campos_por_registro(texto, separador, amostra_completa):
+    """
+    Retorna (linha_inicial, quantidade_de_campos) de cada registro não vazio do texto.
+    Usa o leitor de CSV para respeitar aspas; o último registro de uma amostra
+    truncada é descartado por poder estar incompleto.
+    """
+    leitor = csv.reader(io.StringIO(texto), delimiter=separador)
+    registros = []
+    
+    while True:
+        linha_inicial = leitor.line_num
+        try:
+            campos = next(leitor)
+        except (StopIteration, csv.Error):
+            break
+        if any(campo.strip() for campo in campos):
+            registros.append((linha_inicial, len(campos)))
+    
+    if not amostra_completa and registros:
+        registros.pop()
+    
+    return registros
+
+
+def detectar_formato_csv(arquivo):
+    """
+    Detecta encoding, separador e quantidade de linhas de preâmbulo (títulos e notas
+    antes do cabeçalho) lendo apenas os primeiros KB do arquivo.
+    O cabeçalho é a primeira linha com a mesma quantidade de campos da maioria dos
+    registros; o separador escolhido é o que torna essa quantidade mais frequente.
+    """
+    with open(arquivo, 'rb') as f:
+        amostra = f.read(TAMANHO_AMOSTRA_CSV)
+        amostra_completa = not f.read(1)
+    
+    # UTF-8 quando a amostra é válida (um caractere cortado no fim é tolerado), senão Latin-1
     try:
-        if nome_coluna not in row.index:
-            return None
-            
-        valor = row[nome_coluna]
-        if pd.isna(valor) or valor == 0 or valor == '':
-            return None
+        texto = codecs.getincrementaldecoder('utf-8')().decode(amostra, final=amostra_completa)
+        encoding = 'utf-8'
+    except UnicodeDecodeError:
+        texto = amostra.decode('latin-1')
+        encoding = 'latin-1'
+    texto = texto.lstrip('\ufeff')
+    
+    melhor = None
+    for separador in SEPARADORES_CSV:
+        registros = _contar_campos_por_registro(texto, separador, amostra_completa)
+        if not registros:
+            continue
+        
+        contagens = pd.Series([campos for _, campos in registros])
+        campos_cabecalho = contagens.mode().max()
+        if campos_cabecalho < 2:
+            continue
         
-        # Se for string, fazer limpeza
-        if isinstance(valor, str):
-            # Remover símbolos de moeda e espaços
-            valor = valor.strip().replace('R$', '').replace('$', '').replace(' ', '')
-            
-            # Tratar separadores decimais diferentes
-            if ',' in valor and '.' in valor:
-                # Formato brasileiro: 1.234.567,89
-                valor = valor.replace('.', '').replace(',', '.')
-            elif ',' in valor and '.' not in valor:
-                # Formato com vírgula decimal: 1234567,89
-                valor = valor.replace(',', '.')
-            
-            # Converter para float
-            try:
-                valor = float(valor)
-            except ValueError:
-                return None
+        frequencia = int((contagens == campos_cabecalho).sum())
+        linhas_preambulo = next(linha for linha, campos in registros if campos == campos_cabecalho)
+        
+        # Mais registros consistentes vence; no empate, o menor preâmbulo
+        if melhor is None or (frequencia, -linhas_preambulo) > (melhor[0], -melhor[1]['linhas_preambulo']):
+            melhor = (frequencia, {'separador': separador, 'linhas_preambulo': linhas_preambulo})
+    
+    formato = melhor[1] if melhor else {'separador': ',', 'linhas_preambulo': 0}
+    formato['encoding'] = encoding
+    return formato
+
+
+def obter_formato_csv(arquivo, nome_banco):
+    """
+    Retorna o formato do CSV (encoding, separador, linhas de preâmbulo) e o SHA-256
+    do conteúdo, que indexa os caches de formato e de registros extraídos.
+    O formato fica em cache no banco e execuções seguintes sobre o mesmo conteúdo
+    não repetem a detecção.
+    """
+    hash_arquivo = calcular_hash_arquivo(arquivo)
+    
+    with medir_etapa('deteccao'):
+        formato = ler_formato_em_cache(nome_banco, hash_arquivo)
+        if formato is not None:
+            origem = 'cache'
         else:
-            valor = float(valor)
-            
-        return valor if valor > 0 else None
-    except (KeyError, ValueError, TypeError):
-        return None
+            formato = detectar_formato_csv(arquivo)
+            salvar_formato_em_cache(nome_banco, hash_arquivo, formato)
+            origem = 'detectado'
+    
+    print(f"  🔎 Formato ({origem}): encoding={formato['encoding']}, "
+          f"separador={formato['separador']!r}, preâmbulo={formato['linhas_preambulo']} linha(s)")
+    return dict(formato, sha256=hash_arquivo)
 
 
-def carregar_csv_com_encoding(arquivo):
+def contar_linhas_arquivo(arquivo):
     """
-    Carrega um CSV tentando diferentes encodings e separadores.
+    Conta as linhas físicas de um arquivo pelas quebras de linha, sobre o arquivo
+    mapeado em memória e sem decodificar nem interpretar o CSV. Quebras de linha
+    dentro de campos entre aspas também são contadas.
     """
-    df = None
+    with open(arquivo, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            linhas = sum(
+                mapa[inicio:inicio + TAMANHO_BLOCO_CONTAGEM].count(b'\n')
+                for inicio in range(0, len(mapa), TAMANHO_BLOCO_CONTAGEM)
+            )
+            # Última linha sem quebra no final
+            if mapa[-1:] != b'\n':
+                linhas += 1
+    return linhas
+
+
+def sondar_esquema_csv(arquivo, formato=None, linhas_amostra=LINHAS_AMOSTRA_ESQUEMA):
+    """
+    Lê só o cabeçalho e as primeiras linhas de um CSV, o suficiente para conferir o
+    mapeamento de colunas (detectar_colunas_csv só olha o início de cada coluna).
+    Retorna (amostra, total_de_linhas), com o total estimado pela contagem de quebras
+    de linha do arquivo, descontados o preâmbulo e o cabeçalho.
+    """
+    if formato is None:
+        formato = detectar_formato_csv(arquivo)
+    
+    amostra = carregar_csv_com_encoding(arquivo, formato, nrows=linhas_amostra)
+    total_linhas = max(contar_linhas_arquivo(arquivo) - formato['linhas_preambulo'] - 1, 0)
+    return amostra, total_linhas
+
+
+def carregar_csv_com_encoding(arquivo, formato=None, chunksize=None, **opcoes):
+    """
+    Carrega um CSV em uma única leitura, com o encoding, separador e preâmbulo
+    detectados (ou os informados em 'formato'). Opções extras do pandas podem ser
+    passadas e têm prioridade sobre o formato detectado.
+    Com chunksize, retorna um iterador de DataFrames.
+    """
+    if formato is None:
+        formato = detectar_formato_csv(arquivo)
+    
+    opcoes_leitura = {
+        'sep': formato['separador'],
+        'skiprows': formato['linhas_preambulo'],
+        'on_bad_lines': 'skip',
+    }
+    opcoes_leitura.update(opcoes)
     
-    # Primeira tentativa: UTF-8
     try:
-        df = pd.read_csv(arquivo, encoding='utf-8', on_bad_lines='skip')
-        # Verificar se precisa de separador diferente
-        if len(df.columns) == 1 and ';' in df.columns[0]:
-            df = pd.read_csv(arquivo, encoding='utf-8', sep=';', on_bad_lines='skip')
+        return pd.read_csv(arquivo, encoding=formato['encoding'], chunksize=chunksize, **opcoes_leitura)
     except UnicodeDecodeError:
-        # Segunda tentativa: Latin-1
-        try:
-            df = pd.read_csv(arquivo, encoding='latin-1', on_bad_lines='skip')
-            # Verificar se precisa de separador diferente
-            if len(df.columns) == 1 and ';' in df.columns[0]:
-                df = pd.read_csv(arquivo, encoding='latin-1', sep=';', on_bad_lines='skip')
-        except:
-            # Terceira tentativa: forçar separador
-            try:
-                df = pd.read_csv(arquivo, encoding='utf-8', sep=';', on_bad_lines='skip')
-            except:
-                df = pd.read_csv(arquivo, encoding='latin-1', sep=';', on_bad_lines='skip')
-    except:
-        # Fallback: tentar com separador ponto e vírgula
-        try:
-            df = pd.read_csv(arquivo, encoding='utf-8', sep=';', on_bad_lines='skip')
-        except:
-            df = pd.read_csv(arquivo, encoding='latin-1', sep=';', on_bad_lines='skip')
+        # Byte inválido depois da amostra analisada: Latin-1 decodifica qualquer byte
+        if chunksize or formato['encoding'] == 'latin-1':
+            raise
+        print("  🔄 Byte inválido para UTF-8 após a amostra, relendo com latin-1...")
+        return pd.read_csv(arquivo, encoding='latin-1', **opcoes_leitura)
+
+
+def normalizar_nome_coluna(nome):
+    """
+    Nome da coluna sem BOM, aspas e espaços nas bordas, para comparar cabeçalhos.
+    """
+    return str(nome).replace('\ufeff', '').replace('"', '').strip()
+
+
+def carregar_csv_com_arrow(arquivo, formato=None, colunas=None):
+    """
+    Carrega um CSV inteiro com o leitor do pyarrow, que divide o arquivo em blocos
+    e os interpreta em várias threads, com o encoding, separador e preâmbulo do
+    formato. Todas as colunas são lidas como texto (TIPO_TEXTO, sem cópia para
+    objetos Python); com 'colunas', só as de mesmo nome (ignorando BOM, aspas e
+    espaços nas bordas) são convertidas.
+    Ao contrário do pandas, uma linha com quantidade de campos diferente da do
+    cabeçalho interrompe a leitura com ValueError (pyarrow.ArrowInvalid), assim como
+    um cabeçalho com nomes repetidos: quem chama decide se volta ao pandas.
+    """
+    if formato is None:
+        formato = detectar_formato_csv(arquivo)
+    
+    # O pyarrow decodifica UTF-8 nativamente; outros encodings passam pelos codecs do Python
+    encoding = 'utf8' if codecs.lookup(formato['encoding']).name.startswith('utf-8') else formato['encoding']
+    opcoes_leitura = pacsv.ReadOptions(skip_rows=formato['linhas_preambulo'], encoding=encoding, use_threads=True)
+    opcoes_parser = pacsv.ParseOptions(delimiter=formato['separador'])
+    
+    # O cabeçalho define a projeção e o tipo (texto) de cada coluna lida
+    with pacsv.open_csv(arquivo, read_options=opcoes_leitura, parse_options=opcoes_parser) as leitor:
+        nomes = leitor.schema.names
+    if len(set(nomes)) != len(nomes):
+        raise ValueError(f"Cabeçalho com colunas repetidas: {nomes}")
+    if colunas is not None:
+        desejadas = {normalizar_nome_coluna(nome) for nome in colunas if nome}
+        nomes = [nome for nome in nomes if normalizar_nome_coluna(nome) in desejadas]
     
-    return df
+    opcoes_conversao = pacsv.ConvertOptions(
+        column_types={nome: pa.string() for nome in nomes},
+        include_columns=nomes,
+        strings_can_be_null=True,
+    )
+    tabela = pacsv.read_csv(arquivo, read_options=opcoes_leitura, parse_options=opcoes_parser,
+                            convert_options=opcoes_conversao)
+    return tabela.to_pandas(types_mapper=pd.ArrowDtype)
@@ -1 +1 @@
-# Pacote de processadores especiais
+# Pacote de processadores dos CSVs
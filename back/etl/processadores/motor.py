@@ -0,0 +1,458 @@
+"""
+Motor de ingestão único para os CSVs de todos os estados.
+O layout de cada arquivo (separador, preâmbulo, rodapé, colunas de valor, filtros)
+vem da especificação 'formato' em config/mapeamento_estados.py.
+"""
+
+import numpy as np
+import pandas as pd
+import os
+import sys
+import warnings
+from datetime import datetime
+
+# Adicionar path para imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.mapeamento_estados import FORMATO_PADRAO
+from core.cache_registros import chave_cache, ler_registros_em_cache, gravar_registros_em_cache
+from core.categorizador import categorizar_serie
+from core.perfil import medir_etapa, medir_lotes
+from core.quarentena import iniciar_quarentena, rejeitar, rejeitar_linhas_malformadas, resumir_quarentena
+from core.utils import (detectar_colunas_csv, converter_valores_brasileiros, carregar_csv_com_encoding, carregar_csv_com_arrow,
+                        normalizar_nome_coluna, LEITOR_ARROW_DISPONIVEL, TIPO_TEXTO)
+
+
+# Leitores de CSV disponíveis (ver definir_leitor_csv)
+LEITORES_CSV = ('pandas', 'arrow')
+
+# Leitor em uso
+_LEITOR_CSV = {'nome': 'pandas'}
+
+
+def definir_leitor_csv(leitor):
+    """
+    Escolhe o leitor dos CSVs. Com 'arrow', os arquivos lidos inteiros passam pelo
+    leitor multithread do pyarrow, só com as colunas que o motor usa; os que ele não
+    consegue ler voltam ao pandas. A leitura em lotes continua com o pandas.
+    Sem o pyarrow instalado, apenas avisa.
+    """
+    if leitor == 'arrow' and not LEITOR_ARROW_DISPONIVEL:
+        print("⚠️  pyarrow não instalado: CSVs lidos com o pandas")
+        leitor = 'pandas'
+    _LEITOR_CSV['nome'] = leitor
+
+
+def leitor_csv():
+    """
+    Retorna o leitor de CSV em uso.
+    """
+    return _LEITOR_CSV['nome']
+
+
+def obter_especificacao(config):
+    """
+    Combina o 'formato' do estado com os valores de FORMATO_PADRAO.
+    """
+    return {**FORMATO_PADRAO, **config.get('formato', {})}
+
+
+def _aplicar_especificacao(formato, especificacao):
+    """
+    Usa o separador e o preâmbulo fixados na especificação no lugar dos detectados.
+    """
+    formato = dict(formato)
+    for chave in ('separador', 'linhas_preambulo'):
+        if especificacao[chave] is not None:
+            formato[chave] = especificacao[chave]
+    return formato
+
+
+def _limpar_cabecalho(colunas):
+    """
+    Remove BOM e aspas que sobram nos nomes das colunas.
+    """
+    return [str(coluna).replace('\ufeff', '').replace('"', '') for coluna in colunas]
+
+
+def _com_linhas_malformadas(leitura):
+    """
+    Executa uma leitura do CSV mandando para a quarentena as linhas que o parser
+    descartou por terem campos a mais. Os demais avisos são repassados.
+    """
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter('always', pd.errors.ParserWarning)
+        resultado = leitura()
+    
+    rejeitar_linhas_malformadas([aviso.message for aviso in avisos if issubclass(aviso.category, pd.errors.ParserWarning)])
+    for aviso in avisos:
+        if not issubclass(aviso.category, pd.errors.ParserWarning):
+            warnings.warn_explicit(aviso.message, aviso.category, aviso.filename, aviso.lineno)
+    return resultado
+
+
+def _colunas_usadas(config, especificacao):
+    """
+    Colunas do CSV que o motor usa, ou None quando a detecção automática precisa
+    ver todas as colunas.
+    """
+    if especificacao['detectar_colunas']:
+        return None
+    
+    colunas = config['colunas']
+    nomes = [colunas['orgao'], colunas['valor_empenhado'], colunas['valor_pago']]
+    if especificacao['filtrar_ano']:
+        nomes.append(colunas['ano'])
+    nomes += (especificacao['prioridade_valores'] or []) + especificacao['colunas_obrigatorias']
+    return [nome for nome in nomes if nome]
+
+
+def _manter_colunas(df, colunas):
+    """
+    Descarta do bloco lido as colunas que o motor não usa.
+    O usecols do pandas não é usado: com ele, o parser deixa de conferir a quantidade
+    de campos e linhas malformadas entrariam deslocadas em vez de ir para a quarentena.
+    """
+    if colunas is None:
+        return df
+    desejadas = {normalizar_nome_coluna(nome) for nome in colunas}
+    return df[[coluna for coluna in df.columns if normalizar_nome_coluna(coluna) in desejadas]]
+
+
+def _ler_blocos(arquivo, formato, linhas_rodape, chunksize=None, colunas=None):
+    """
+    Lê o CSV como texto (TIPO_TEXTO), inteiro ou em lotes, descartando as linhas de
+    rodapé e as colunas fora de 'colunas'. O leitor do pyarrow já lê só essas colunas.
+    Em lotes, as últimas linhas de cada lote ficam retidas até se saber se são o rodapé.
+    """
+    if not chunksize and _LEITOR_CSV['nome'] == 'arrow':
+        try:
+            df = carregar_csv_com_arrow(arquivo, formato, colunas)
+        except ValueError as e:
+            # Linhas malformadas, cabeçalho repetido ou byte inválido: o pandas trata cada caso
+            print(f"  🔄 pyarrow não conseguiu ler o arquivo ({str(e).splitlines()[0]}), usando o pandas...")
+        else:
+            yield df.iloc[:max(len(df) - linhas_rodape, 0)]
+            return
+    
+    opcoes = {'dtype': TIPO_TEXTO, 'on_bad_lines': 'warn'}
+    if not chunksize:
+        df = _com_linhas_malformadas(lambda: carregar_csv_com_encoding(arquivo, formato, **opcoes))
+        yield _manter_colunas(df, colunas).iloc[:max(len(df) - linhas_rodape, 0)]
+        return
+    
+    retidas = None
+    leitor = carregar_csv_com_encoding(arquivo, formato, chunksize=chunksize, **opcoes)
+    while True:
+        # O parser só avisa das linhas malformadas ao ler cada lote
+        bloco = _com_linhas_malformadas(lambda: next(leitor, None))
+        if bloco is None:
+            return
+        bloco = _manter_colunas(bloco, colunas)
+        if retidas is not None:
+            bloco = pd.concat([retidas, bloco])
+        if linhas_rodape:
+            retidas, bloco = bloco.iloc[-linhas_rodape:], bloco.iloc[:-linhas_rodape]
+        yield bloco
+
+
+def _texto(df, coluna):
+    """
+    Retorna a coluna como texto sem espaços nas bordas, com '' no lugar de nulos.
+    """
+    serie = df[coluna].fillna('')
+    if not isinstance(serie.dtype, pd.ArrowDtype):
+        serie = serie.astype(str)
+    return serie.str.strip()
+
+
+def _por_valor_distinto(serie, transformar):
+    """
+    Aplica 'transformar' (Series de texto -> Series de texto) uma única vez a cada
+    valor distinto da coluna, em vez de linha a linha, e retorna o resultado como
+    coluna 'category'. Nulos são tratados como ''.
+    """
+    codigos, distintos = pd.factorize(serie)
+    # O código -1 dos nulos aponta para o '' no final
+    transformados = transformar(pd.Series([str(valor) for valor in distintos] + [''], dtype=object))
+    codigos_finais, categorias = pd.factorize(transformados)
+    return pd.Series(pd.Categorical.from_codes(codigos_finais[codigos], categorias), index=serie.index)
+
+
+def _localizar_coluna(df, nome):
+    """
+    Retorna o nome real da coluna no DataFrame, tolerando espaços nas bordas.
+    """
+    if nome is None or nome in df.columns:
+        return nome
+    for coluna in df.columns:
+        if coluna.strip() == nome.strip():
+            return coluna
+    return nome
+
+
+def _configurar_colunas(df, colunas, sigla_estado):
+    """
+    Configura o mapeamento de colunas, detectando automaticamente quando necessário.
+    """
+    colunas_detectadas = False
+    
+    # Verificar coluna de órgão
+    if colunas['orgao'] and colunas['orgao'] not in df.columns:
+        print(f"  ⚠️  Coluna de órgão '{colunas['orgao']}' não encontrada. Detectando automaticamente...")
+        colunas_auto = detectar_colunas_csv(df, sigla_estado)
+        if colunas_auto['orgao']:
+            colunas['orgao'] = colunas_auto['orgao']
+            colunas_detectadas = True
+    
+    # Verificar coluna de valor empenhado
+    if colunas['valor_empenhado'] and colunas['valor_empenhado'] not in df.columns:
+        print(f"  ⚠️  Coluna valor empenhado '{colunas['valor_empenhado']}' não encontrada. Detectando automaticamente...")
+        if not colunas_detectadas:
+            colunas_auto = detectar_colunas_csv(df, sigla_estado)
+        if colunas_auto['valor_empenhado']:
+            colunas['valor_empenhado'] = colunas_auto['valor_empenhado']
+    
+    # Verificar coluna de valor pago
+    if colunas['valor_pago'] and colunas['valor_pago'] not in df.columns:
+        print(f"  ⚠️  Coluna valor pago '{colunas['valor_pago']}' não encontrada. Detectando automaticamente...")
+        if not colunas_detectadas:
+            colunas_auto = detectar_colunas_csv(df, sigla_estado)
+        if colunas_auto['valor_pago']:
+            colunas['valor_pago'] = colunas_auto['valor_pago']
+    
+    # Detecção completa se ainda não temos colunas válidas
+    if not colunas['orgao'] or (not colunas['valor_empenhado'] and not colunas['valor_pago']):
+        print(f"  🔍 Detectando todas as colunas automaticamente para {sigla_estado}...")
+        colunas_auto = detectar_colunas_csv(df, sigla_estado)
+        if colunas_auto['orgao']:
+            colunas['orgao'] = colunas_auto['orgao']
+        if colunas_auto['valor_empenhado']:
+            colunas['valor_empenhado'] = colunas_auto['valor_empenhado']
+        if colunas_auto['valor_pago']:
+            colunas['valor_pago'] = colunas_auto['valor_pago']
+    
+    return colunas
+
+
+def resolver_colunas(df, config, especificacao, sigla_estado):
+    """
+    Define as colunas reais de órgão, ano, valores (em ordem de prioridade) e
+    obrigatórias. Sem detecção automática, a falta de uma coluna é um erro.
+    """
+    colunas = {chave: _localizar_coluna(df, nome) for chave, nome in config['colunas'].items()}
+    
+    if especificacao['detectar_colunas']:
+        colunas = _configurar_colunas(df, colunas, sigla_estado)
+    
+    nomes_valores = especificacao['prioridade_valores'] or [colunas['valor_empenhado'], colunas['valor_pago']]
+    colunas['valores'] = [_localizar_coluna(df, nome) for nome in nomes_valores if nome]
+    colunas['obrigatorias'] = [_localizar_coluna(df, nome) for nome in especificacao['colunas_obrigatorias']]
+    
+    if especificacao['detectar_colunas']:
+        # Colunas não encontradas ficam sem valores, como na detecção automática
+        colunas['valores'] = [nome for nome in colunas['valores'] if nome in df.columns]
+    else:
+        esperadas = [colunas['orgao']] + colunas['valores'] + colunas['obrigatorias']
+        if especificacao['filtrar_ano']:
+            esperadas.append(colunas['ano'])
+        faltando = [nome for nome in esperadas if nome not in df.columns]
+        if faltando:
+            raise ValueError(f"Colunas esperadas não encontradas: {faltando}. Encontradas: {list(df.columns)}")
+    
+    print(f"  📊 Colunas que serão usadas:")
+    print(f"    - Órgão: '{colunas['orgao']}'")
+    print(f"    - Valores (em ordem de prioridade): {colunas['valores']}")
+    if especificacao['filtrar_ano']:
+        print(f"    - Ano: '{colunas['ano']}'")
+    
+    return colunas
+
+
+def _montar_registros(sigla_estado, ano, orgaos, valores_por_prioridade):
+    """
+    Converte as colunas de valores com o conversor vetorizado, direto para centavos
+    inteiros, e escolhe, para cada linha, o primeiro valor positivo seguindo a ordem
+    de prioridade informada.
+    'ano' é um inteiro ou, em arquivos com vários anos, uma Series com o ano de cada linha.
+    Retorna o DataFrame pronto para o banco, quantas linhas usaram cada coluna e a
+    máscara das linhas descartadas por ter algum valor que não pôde ser convertido.
+    """
+    with medir_etapa('valores', len(orgaos)) as medicao:
+        valor_final = pd.Series(pd.NA, index=orgaos.index, dtype='Int64')
+        contadores = []
+        invalidos = pd.Series(False, index=orgaos.index)
+        
+        for valores in valores_por_prioridade:
+            convertidos = converter_valores_brasileiros(valores, centavos=True)
+            usar = valor_final.isna() & (convertidos > 0).fillna(False)
+            valor_final = valor_final.where(~usar, convertidos)
+            contadores.append(int(usar.sum()))
+            
+            # Campo preenchido que o conversor não entendeu ('-' é o zero contábil)
+            falhou = convertidos.isna() & valores.notna()
+            if falhou.any():
+                texto = valores[falhou].astype(str).str.strip()
+                invalidos[texto[(texto != '') & (texto != '-')].index] = True
+        
+        validos = valor_final.notna()
+        invalidos &= ~validos
+        orgaos = orgaos[validos]
+        medicao['linhas_saida'] = len(orgaos)
+    
+    if isinstance(ano, pd.Series):
+        ano = ano[validos].astype(int)
+        data = ano.map({a: datetime(a, 1, 1).date() for a in ano.unique().tolist()})
+    else:
+        data = datetime(ano, 1, 1).date()
+    
+    with medir_etapa('categorizacao', len(orgaos)):
+        categorias = categorizar_serie(orgaos)
+    
+    df_final = pd.DataFrame({
+        'estado': pd.Categorical.from_codes(np.zeros(len(orgaos), dtype='int8'), [sigla_estado]),
+        'data': data,
+        'orgao': orgaos,
+        'categoria_padronizada': categorias,
+        'valor_centavos': valor_final[validos].astype('int64')
+    }, index=orgaos.index).reset_index(drop=True)
+    
+    return df_final, contadores, invalidos
+
+
+def transformar_bloco(df, colunas, especificacao, sigla_estado, ano, anos=None):
+    """
+    Aplica filtros, limpeza do órgão e escolha do valor a um bloco lido do CSV,
+    tudo de forma vetorizada. Retorna os registros prontos para o banco.
+    Com 'anos', um arquivo com coluna de ano mantém as linhas de todos esses anos,
+    cada uma com a data do seu próprio ano, em vez de só as linhas de 'ano'.
+    Linhas do ano selecionado descartadas por erro vão para a quarentena.
+    """
+    filtro = pd.Series(True, index=df.index)
+    
+    if especificacao['filtrar_ano']:
+        anos_linhas = pd.to_numeric(_texto(df, colunas['ano']), errors='coerce').astype('float64')
+        if anos is None:
+            filtro &= anos_linhas == ano
+        else:
+            filtro &= anos_linhas.isin(list(anos))
+            ano = anos_linhas
+    
+    def _rejeitar(mascara, motivo):
+        anos_rejeitados = ano[mascara].astype(int) if isinstance(ano, pd.Series) else None
+        rejeitar(df[mascara], motivo, anos_rejeitados)
+    
+    vazias = pd.Series(False, index=df.index)
+    for coluna in colunas['obrigatorias']:
+        vazias |= (_texto(df, coluna) == '').astype(bool)
+    _rejeitar(filtro & vazias, 'campo_obrigatorio_vazio')
+    filtro &= ~vazias
+    
+    # Extrair nome do órgão, limpando cada nome distinto uma única vez
+    if colunas['orgao'] in df.columns:
+        orgao = _por_valor_distinto(df[colunas['orgao']], lambda nomes: nomes.str.strip().str.replace('"', '', regex=False).str.strip())
+    else:
+        orgao = pd.Series(pd.Categorical.from_codes(np.zeros(len(df), dtype='int8'), ['']), index=df.index)
+    
+    preenchido = (orgao != '').to_numpy()
+    if especificacao['descartar_sem_orgao']:
+        _rejeitar(filtro & ~preenchido, 'sem_orgao')
+        filtro &= preenchido
+    else:
+        orgao = _por_valor_distinto(orgao, lambda nomes: nomes.where(nomes != '', 'Não informado'))
+    
+    if especificacao['remover_prefixo_codigo']:
+        # Remove o número e traço do início (ex: "01 - Legislativa" vira "Legislativa")
+        orgao = _por_valor_distinto(orgao, lambda nomes: nomes.str.split(' - ', n=1).str[-1].str.strip())
+    
+    df, orgao = df[filtro], orgao[filtro]
+    if isinstance(ano, pd.Series):
+        ano = ano[filtro]
+    registros, contadores, invalidos = _montar_registros(
+        sigla_estado, ano, orgao, [df[coluna] for coluna in colunas['valores']]
+    )
+    _rejeitar(invalidos, 'valor_invalido')
+    
+    detalhes = ', '.join(f"{coluna}: {quantidade}" for coluna, quantidade in zip(colunas['valores'], contadores))
+    print(f"  📊 Linhas selecionadas: {len(df)}, registros válidos: {len(registros)} ({detalhes})")
+    return registros
+
+
+def _registros_do_cache(extraidos):
+    """
+    Completa os registros lidos do cache com a data e a categoria atual do órgão.
+    Estado e órgão já chegam do cache como 'category'.
+    """
+    anos = extraidos['ano'].astype(int)
+    with medir_etapa('categorizacao', len(extraidos)):
+        categorias = categorizar_serie(extraidos['orgao'])
+    
+    return pd.DataFrame({
+        'estado': extraidos['estado'],
+        'data': anos.map({a: datetime(a, 1, 1).date() for a in anos.unique().tolist()}),
+        'orgao': extraidos['orgao'],
+        'categoria_padronizada': categorias,
+        'valor_centavos': extraidos['valor_centavos'],
+    })
+
+
+def gerar_registros(arquivo, sigla_estado, ano, config, formato, chunksize=None, anos=None):
+    """
+    Gera os registros (estado, data, orgao, categoria_padronizada, valor_centavos) de um
+    arquivo seguindo a especificação do estado. Sem chunksize, gera um único
+    DataFrame com o arquivo inteiro; com chunksize, um DataFrame por lote.
+    'anos' ativa a leitura de vários anos de uma vez (ver transformar_bloco).
+    Quando o formato traz o SHA-256 do arquivo, os registros extraídos ficam no cache
+    (core/cache_registros.py) e uma nova leitura do mesmo conteúdo, com a mesma
+    especificação, só refaz a categorização.
+    """
+    especificacao = obter_especificacao(config)
+    formato = _aplicar_especificacao(formato, especificacao)
+    
+    if not formato.get('sha256'):
+        yield from _extrair_registros(arquivo, sigla_estado, ano, config, especificacao, formato, chunksize, anos)
+        return
+    
+    chave = chave_cache(formato['sha256'], sigla_estado, anos or [ano], config['colunas'], especificacao, formato)
+    em_cache = ler_registros_em_cache(chave, chunksize)
+    if em_cache is not None:
+        # A quarentena gravada na extração continua valendo para o mesmo conteúdo
+        iniciar_quarentena()
+        print(f"  ♻️  Registros extraídos em cache, o CSV não será relido: {chave}")
+        for extraidos in medir_lotes('leitura', em_cache):
+            yield _registros_do_cache(extraidos)
+        return
+    
+    lotes = _extrair_registros(arquivo, sigla_estado, ano, config, especificacao, formato, chunksize, anos)
+    yield from gravar_registros_em_cache(lotes, chave)
+
+
+def _extrair_registros(arquivo, sigla_estado, ano, config, especificacao, formato, chunksize, anos):
+    """
+    Lê o CSV e gera os registros de cada bloco (ver gerar_registros).
+    O mapeamento de colunas é resolvido uma única vez, no primeiro bloco.
+    As linhas rejeitadas ficam pendentes na quarentena (core/quarentena.py) até a gravação.
+    """
+    colunas = None
+    linhas_lidas = 0
+    # Linhas antes do primeiro dado: preâmbulo e cabeçalho
+    iniciar_quarentena(os.path.abspath(arquivo), sigla_estado, ano, formato['linhas_preambulo'] + 1)
+    
+    blocos = medir_lotes('leitura', _ler_blocos(
+        arquivo, formato, especificacao['linhas_rodape'], chunksize, _colunas_usadas(config, especificacao)
+    ))
+    for numero_lote, df in enumerate(blocos, start=1):
+        df.columns = _limpar_cabecalho(df.columns)
+        linhas_lidas += len(df)
+        
+        if colunas is None:
+            if not chunksize:
+                print(f"  ✅ CSV carregado. Total de linhas: {len(df)}")
+            print(f"  📋 Colunas no CSV: {list(df.columns)}")
+            colunas = resolver_colunas(df, config, especificacao, sigla_estado)
+        
+        if chunksize:
+            print(f"  📦 Lote {numero_lote}: {len(df)} linhas (total lido: {linhas_lidas})")
+        yield transformar_bloco(df, colunas, especificacao, sigla_estado, ano, anos)
+    
+    resumir_quarentena()
@@ -4,25 +4,47 @@ Refatorado em módulos para melhor organização e manutenibilidade.
 """
 
 import pandas as pd
+import contextlib
 import glob
+import io
 import os
 import sys
 import re
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Adicionar o diretório atual ao path para imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Imports dos módulos criados
 from config.mapeamento_estados import MAPEAMENTO_COLUNAS
-from core.categorizador import mapear_categoria_padronizada, limpar_caracteres_especiais
-from core.utils import detectar_colunas_csv, obter_valor_coluna, carregar_csv_com_encoding
-from core.database import verificar_banco, salvar_dados
+from core.categorizador import categorizar_serie, estatisticas_cache_categorias
+from core.utils import detectar_colunas_csv, sondar_esquema_csv, obter_formato_csv, calcular_hash_arquivo
+from core.database import TABELA_FATO, definir_pasta_parquet, verificar_banco, salvar_dados, salvar_lotes, salvar_rejeitados, salvar_particoes, atualizar_estatisticas, ler_manifesto, atualizar_manifesto, listar_orgaos, atualizar_categorias
+from core.particoes import exportar_banco
+from core.perfil import iniciar_execucao, medir_arquivo, coletar_etapas
+from core.quarentena import coletar_rejeitados, acumular_rejeitados, estatisticas_quarentena
+from processadores.motor import gerar_registros, obter_especificacao, LEITORES_CSV, definir_leitor_csv, leitor_csv
 
 
 # Configurações globais
 NOME_BANCO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'database', 'despesas_brasil.db'))
-NOME_TABELA = 'despesas'
+# Pasta dos CSVs no padrão SIGLA_ANO.csv
+PASTA_CSVS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'csvs'))
+# MODELO_ARMAZENAMENTO=estrela grava na tabela fato com as dimensões de órgão e categoria
+MODELO_ARMAZENAMENTO = os.getenv('MODELO_ARMAZENAMENTO', 'plano')
+NOME_TABELA = TABELA_FATO if MODELO_ARMAZENAMENTO == 'estrela' else 'despesas'
+# BACKEND_CONSULTAS=parquet mantém atualizadas, a cada carga, as partições lidas pela API
+BACKEND_CONSULTAS = os.getenv('BACKEND_CONSULTAS', 'sqlite')
+PASTA_PARQUET = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'database', 'parquet'))
+
+# Relatórios do cProfile e do tracemalloc gerados com --perfil
+PASTA_PERFIS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'database', 'perfis'))
+if BACKEND_CONSULTAS == 'parquet':
+    definir_pasta_parquet(PASTA_PARQUET)
+# LEITOR_CSV=arrow lê os arquivos inteiros com o leitor multithread do pyarrow (ver motor.py)
+LEITOR_CSV = os.getenv('LEITOR_CSV', 'pandas')
+definir_leitor_csv(LEITOR_CSV)
 ANOS_SUPORTADOS = [2020, 2021, 2022, 2023, 2024, 2025]
 
 
@@ -43,18 +65,13 @@ def buscar_arquivos_estado(sigla_estado, ano=None):
     """
     Busca arquivos CSV para um estado específico e opcionalmente um ano específico.
     """
-    # Obter caminho absoluto da pasta csvs
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    pasta_csvs = os.path.join(script_dir, '..', 'csvs')
-    pasta_csvs = os.path.abspath(pasta_csvs)  # Resolver caminho absoluto
-    
     if ano:
         # Buscar arquivo específico: SIGLA_ANO.csv
-        padrao = os.path.join(pasta_csvs, f"{sigla_estado}_{ano}.csv")
+        padrao = os.path.join(PASTA_CSVS, f"{sigla_estado}_{ano}.csv")
         arquivos = glob.glob(padrao)
     else:
         # Buscar todos os arquivos do estado: SIGLA_*.csv
-        padrao = os.path.join(pasta_csvs, f"{sigla_estado}_*.csv")
+        padrao = os.path.join(PASTA_CSVS, f"{sigla_estado}_*.csv")
         arquivos = glob.glob(padrao)
         # Filtrar apenas arquivos com anos válidos
         arquivos = [arq for arq in arquivos if extrair_ano_do_arquivo(arq) is not None]
@@ -62,9 +79,51 @@ def buscar_arquivos_estado(sigla_estado, ano=None):
     return sorted(arquivos)
 
 
-def processar_estado(sigla_estado, ano=None):
+def _descrever_arquivo(arquivo, sigla_estado, ano):
+    """
+    Monta o registro de manifesto de um arquivo (sem o SHA-256) a partir do os.stat.
+    """
+    info = os.stat(arquivo)
+    return {
+        'estado': sigla_estado,
+        'ano': ano,
+        'caminho': os.path.abspath(arquivo),
+        'tamanho': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+    }
+
+
+def _preparar_manifesto(arquivo, sigla_estado, ano, forcar=False):
+    """
+    Compara o arquivo com o manifesto de ingestão do seu (estado, ano).
+    Retorna None quando o arquivo não mudou desde a última carga, ou o registro de
+    manifesto a ser gravado junto com os novos dados.
+    Caminho, tamanho e data de modificação iguais dispensam a leitura do arquivo;
+    o SHA-256 só é calculado quando algum deles mudou.
+    """
+    manifesto = _descrever_arquivo(arquivo, sigla_estado, ano)
+    
+    anterior = None if forcar else ler_manifesto(NOME_BANCO, sigla_estado, ano)
+    if anterior and all(anterior[campo] == manifesto[campo] for campo in ('caminho', 'tamanho', 'mtime_ns')):
+        return None
+    
+    manifesto['sha256'] = calcular_hash_arquivo(arquivo)
+    if anterior and anterior['sha256'] == manifesto['sha256']:
+        # Mesmo conteúdo (arquivo copiado ou apenas tocado): só o manifesto é atualizado
+        atualizar_manifesto(NOME_BANCO, dict(manifesto, registros=anterior['registros'], anos_cobertos=anterior['anos_cobertos']))
+        return None
+    
+    return manifesto
+
+
+def processar_estado(sigla_estado, ano=None, chunksize=None, workers=1, forcar=False, multiano=False):
     """
     Processa o CSV de um estado específico, opcionalmente para um ano específico.
+    Com chunksize, os arquivos são lidos e gravados em lotes (memória constante).
+    Com workers > 1, os arquivos de cada ano são transformados em paralelo.
+    Com multiano, estados cujos extratos trazem vários anos (coluna de ano) têm cada
+    conteúdo lido uma única vez (ver processar_estado_multiano).
+    Arquivos inalterados desde a última carga são pulados, a menos que forcar=True.
     """
     if sigla_estado not in MAPEAMENTO_COLUNAS:
         print(f"❌ Estado {sigla_estado} não configurado no mapeamento.")
@@ -82,6 +141,13 @@ def processar_estado(sigla_estado, ano=None):
             print(f"❌ Nenhum arquivo encontrado para {sigla_estado} (padrão: {sigla_estado}_YYYY.csv)")
         return 0
     
+    if multiano and ano is None and obter_especificacao(config)['filtrar_ano']:
+        return processar_estado_multiano(sigla_estado, arquivos, config, chunksize, forcar)
+    
+    if workers > 1 and len(arquivos) > 1:
+        tarefas = [(arquivo, sigla_estado, extrair_ano_do_arquivo(arquivo)) for arquivo in arquivos]
+        return processar_em_paralelo(tarefas, workers, forcar)['registros']
+    
     total_registros = 0
     
     # Processar cada arquivo encontrado
@@ -90,9 +156,15 @@ def processar_estado(sigla_estado, ano=None):
         if ano_arquivo is None:
             print(f"⚠️  Pulando arquivo {arquivo} - ano não identificado")
             continue
+        
+        with medir_arquivo(sigla_estado, ano_arquivo, arquivo):
+            manifesto = _preparar_manifesto(arquivo, sigla_estado, ano_arquivo, forcar)
+            if manifesto is None:
+                print(f"⏭️  {sigla_estado} ({ano_arquivo}) sem alterações desde a última carga: {arquivo}")
+                continue
             
-        print(f"📁 Processando {sigla_estado} ({ano_arquivo}): {arquivo}")
-        registros = _processar_arquivo_csv(arquivo, sigla_estado, ano_arquivo, config)
+            print(f"📁 Processando {sigla_estado} ({ano_arquivo}): {arquivo}")
+            registros = _processar_arquivo_csv(arquivo, sigla_estado, ano_arquivo, config, chunksize, manifesto=manifesto)
         total_registros += registros
         print(f"  ✅ {registros} registros inseridos para {sigla_estado} ({ano_arquivo})")
         print("-" * 40)
@@ -100,177 +172,263 @@ def processar_estado(sigla_estado, ano=None):
     return total_registros
 
 
-def _processar_arquivo_csv(arquivo, sigla_estado, ano, config):
+def processar_estado_multiano(sigla_estado, arquivos, config, chunksize=None, forcar=False):
     """
-    Processa um arquivo CSV específico.
+    Processa os extratos de um estado com coluna de ano lendo cada conteúdo distinto
+    uma única vez e distribuindo as linhas entre as fatias (estado, ano) de todos os
+    anos encontrados, em vez de reler o arquivo inteiro para cada ano.
+    Cópias idênticas do mesmo extrato (ex.: RS_2020.csv ... RS_2025.csv) formam um só
+    grupo; um ano cujo arquivo próprio tem outro conteúdo continua vindo desse arquivo.
+    Um ano sem arquivo próprio vem de um único grupo, o do arquivo de ano mais próximo
+    (o mais recente no empate), registrado como caminho no manifesto desse ano.
+    O manifesto de cada ano registra os anos cobertos pela leitura que o gravou.
     """
-    # Processadores especiais para estados específicos
-    if sigla_estado == 'RO':
-        from processadores.especiais import processar_rondonia_csv_reader
-        return processar_rondonia_csv_reader(arquivo, NOME_BANCO, NOME_TABELA, ano)
-    
-    if sigla_estado == 'RS':
-        from processadores.especiais import processar_rs_csv_reader
-        return processar_rs_csv_reader(arquivo, NOME_BANCO, NOME_TABELA, ano)
-    
-    if sigla_estado == 'DF':
-        from processadores.especiais import processar_df_csv_reader
-        return processar_df_csv_reader(arquivo, NOME_BANCO, NOME_TABELA, ano)
-    
-    if sigla_estado == 'MA':
-        from processadores.especiais import processar_ma_csv_reader
-        return processar_ma_csv_reader(arquivo, NOME_BANCO, NOME_TABELA, ano)
-    
-    if sigla_estado == 'GO':
-        from processadores.especiais import processar_goias_csv_reader
-        return processar_goias_csv_reader(arquivo, NOME_BANCO, NOME_TABELA, ano)
+    manifestos = {arquivo: _preparar_manifesto(arquivo, sigla_estado, extrair_ano_do_arquivo(arquivo), forcar)
+                  for arquivo in arquivos}
+    if all(manifesto is None for manifesto in manifestos.values()):
+        print(f"⏭️  {sigla_estado}: nenhum arquivo alterado desde a última carga")
+        return 0
     
-    if sigla_estado == 'MS':
-        from processadores.especiais import processar_ms_csv_especial
-        return processar_ms_csv_especial(arquivo, NOME_BANCO, NOME_TABELA, ano)
+    # Agrupar os arquivos por conteúdo, reaproveitando o SHA-256 do manifesto dos inalterados
+    grupos = {}
+    hash_do_arquivo = {}
+    for arquivo in arquivos:
+        manifesto = manifestos[arquivo] or ler_manifesto(NOME_BANCO, sigla_estado, extrair_ano_do_arquivo(arquivo))
+        hash_do_arquivo[arquivo] = manifesto['sha256']
+        grupos.setdefault(manifesto['sha256'], []).append(arquivo)
     
-    if sigla_estado == 'RJ':
-        from processadores.especiais import processar_rj_csv_especial
-        return processar_rj_csv_especial(arquivo, NOME_BANCO, NOME_TABELA, ano)
+    # Cada ano vem do seu próprio arquivo ou, sem ele, do arquivo de ano mais próximo
+    arquivo_do_ano = {extrair_ano_do_arquivo(arquivo): arquivo for arquivo in arquivos}
+    origem_do_ano = {ano: _arquivo_mais_proximo(arquivo_do_ano, ano) for ano in ANOS_SUPORTADOS}
     
-    if sigla_estado == 'SP':
-        from processadores.especiais import processar_sp_csv_especial
-        return processar_sp_csv_especial(arquivo, NOME_BANCO, NOME_TABELA, ano)
+    total_registros = 0
+    for sha256, grupo in grupos.items():
+        nomes = ', '.join(os.path.basename(arquivo) for arquivo in grupo)
+        if all(manifestos[arquivo] is None for arquivo in grupo):
+            print(f"⏭️  {sigla_estado} sem alterações desde a última carga: {nomes}")
+            continue
+        
+        arquivo = grupo[0]
+        anos = [ano for ano, origem in origem_do_ano.items() if hash_do_arquivo[origem] == sha256]
+        manifestos_por_ano = {
+            ano: dict(_descrever_arquivo(origem_do_ano[ano], sigla_estado, ano), sha256=sha256)
+            for ano in anos
+        }
+        
+        print(f"📁 Processando {sigla_estado} (anos {', '.join(map(str, anos))}) em uma única leitura: {nomes}")
+        with medir_arquivo(sigla_estado, None, arquivo):
+            registros_por_ano = _processar_arquivo_multiano(arquivo, sigla_estado, config, chunksize, manifestos_por_ano)
+        for ano, registros in sorted(registros_por_ano.items()):
+            print(f"  ✅ {registros} registros inseridos para {sigla_estado} ({ano})")
+        total_registros += sum(registros_por_ano.values())
+        print("-" * 40)
     
-    if sigla_estado == 'TO':
-        from processadores.especiais import processar_to_csv_especial
-        return processar_to_csv_especial(arquivo, NOME_BANCO, NOME_TABELA, ano)
+    return total_registros
 
-    try:
-        # Carregar CSV com tratamento de encoding
-        df = carregar_csv_com_encoding(arquivo)
-        print(f"  ✅ CSV carregado. Total de linhas: {len(df)}")
-        print(f"  📋 Colunas no CSV: {list(df.columns)}")
-        
-        # Configurar mapeamento de colunas
-        colunas = config['colunas'].copy()
-        colunas = _configurar_colunas(df, colunas, sigla_estado)
+
+def _arquivo_mais_proximo(arquivo_do_ano, ano):
+    """
+    Retorna o arquivo do próprio ano ou, sem ele, o de ano mais próximo (o mais recente no empate).
+    """
+    return arquivo_do_ano[min(arquivo_do_ano, key=lambda proprio: (abs(proprio - ano), -proprio))]
+
+
+def _processar_arquivo_multiano(arquivo, sigla_estado, config, chunksize, manifestos_por_ano):
+    """
+    Lê um arquivo uma única vez mantendo as linhas de todos os anos de manifestos_por_ano
+    e grava cada ano na sua fatia. Retorna {ano: registros gravados}.
+    """
+    formato = obter_formato_csv(arquivo, NOME_BANCO)
+    
+    # O encoding detectado cobre só o início do arquivo; Latin-1 fica como reserva
+    for encoding in dict.fromkeys([formato['encoding'], 'latin-1']):
+        try:
+            lotes = gerar_registros(arquivo, sigla_estado, None, config, dict(formato, encoding=encoding),
+                                    chunksize, anos=list(manifestos_por_ano))
+            registros_por_ano = salvar_particoes(lotes, NOME_BANCO, NOME_TABELA, manifestos_por_ano)
+            
+            if not registros_por_ano:
+                print(f"  ⚠️  Nenhum dado válido encontrado para {sigla_estado}")
+            return registros_por_ano
         
-        # Processar dados linha por linha
-        dados_processados = _processar_linhas_csv(df, colunas, sigla_estado, ano)
+        except UnicodeDecodeError:
+            # A transação foi desfeita: nenhum lote parcial fica no banco
+            print(f"  🔄 Falha de decodificação com {encoding}, tentando o próximo encoding...")
+        except Exception as e:
+            print(f"  ❌ Erro ao processar {sigla_estado}: {e}")
+            return {}
+    
+    print(f"  ❌ Não foi possível decodificar o arquivo {arquivo}")
+    return {}
+
+
+def _processar_arquivo_csv(arquivo, sigla_estado, ano, config, chunksize=None, gravar=None, manifesto=None, formato=None):
+    """
+    Processa um arquivo CSV específico com o motor de ingestão, seguindo a
+    especificação de formato do estado (config/mapeamento_estados.py).
+    Se 'gravar' for informado, os registros são entregues a ele em vez de salvos no banco.
+    Com 'manifesto', a gravação substitui a fatia (estado, ano) do arquivo.
+    'formato' dispensa a consulta ao cache de formatos (e, portanto, o acesso ao banco).
+    """
+    # Leitura em lotes só no modo serial: no pool os registros voltam ao processo principal
+    if chunksize and gravar is None:
+        return _processar_arquivo_em_lotes(arquivo, sigla_estado, ano, config, chunksize, manifesto)
+    
+    try:
+        # Detectar o formato pelo início do arquivo e carregar o CSV em uma única leitura
+        formato = formato or obter_formato_csv(arquivo, NOME_BANCO)
+        dados_processados = pd.concat(gerar_registros(arquivo, sigla_estado, ano, config, formato), ignore_index=True)
         
         # Salvar no banco
-        if dados_processados:
-            registros_inseridos = salvar_dados(dados_processados, NOME_BANCO, NOME_TABELA)
-            return registros_inseridos
-        else:
+        if dados_processados.empty:
             print(f"  ⚠️  Nenhum dado válido encontrado para {sigla_estado} ({ano})")
+            if gravar is None:
+                salvar_rejeitados(NOME_BANCO)
             return 0
-            
+        if gravar is not None:
+            return gravar(dados_processados)
+        return salvar_dados(dados_processados, NOME_BANCO, NOME_TABELA, manifesto)
+    
     except Exception as e:
         print(f"  ❌ Erro ao processar {sigla_estado} ({ano}): {e}")
         return 0
 
 
-def _configurar_colunas(df, colunas, sigla_estado):
+def _processar_arquivo_em_lotes(arquivo, sigla_estado, ano, config, chunksize, manifesto=None):
     """
-    Configura o mapeamento de colunas, detectando automaticamente quando necessário.
+    Processa um arquivo CSV em lotes de até 'chunksize' linhas.
+    Cada lote é transformado e inserido antes da leitura do próximo, todos na mesma
+    transação, de modo que o pico de memória não depende do tamanho do arquivo.
     """
-    colunas_detectadas = False
-    
-    # Verificar coluna de órgão
-    if colunas['orgao'] and colunas['orgao'] not in df.columns:
-        print(f"  ⚠️  Coluna de órgão '{colunas['orgao']}' não encontrada. Detectando automaticamente...")
-        colunas_auto = detectar_colunas_csv(df, sigla_estado)
-        if colunas_auto['orgao']:
-            colunas['orgao'] = colunas_auto['orgao']
-            colunas_detectadas = True
-    
-    # Verificar coluna de valor empenhado
-    if colunas['valor_empenhado'] and colunas['valor_empenhado'] not in df.columns:
-        print(f"  ⚠️  Coluna valor empenhado '{colunas['valor_empenhado']}' não encontrada. Detectando automaticamente...")
-        if not colunas_detectadas:
-            colunas_auto = detectar_colunas_csv(df, sigla_estado)
-        if colunas_auto['valor_empenhado']:
-            colunas['valor_empenhado'] = colunas_auto['valor_empenhado']
+    formato = obter_formato_csv(arquivo, NOME_BANCO)
+    
+    # O encoding detectado cobre só o início do arquivo; Latin-1 fica como reserva
+    for encoding in dict.fromkeys([formato['encoding'], 'latin-1']):
+        try:
+            print(f"  📦 Lendo em lotes de {chunksize} linhas (encoding: {encoding})")
+            lotes = gerar_registros(arquivo, sigla_estado, ano, config, dict(formato, encoding=encoding), chunksize)
+            registros_inseridos = salvar_lotes(lotes, NOME_BANCO, NOME_TABELA, manifesto)
+            
+            if registros_inseridos == 0:
+                print(f"  ⚠️  Nenhum dado válido encontrado para {sigla_estado} ({ano})")
+            return registros_inseridos
+        
+        except UnicodeDecodeError:
+            # A transação foi desfeita: nenhum lote parcial fica no banco
+            print(f"  🔄 Falha de decodificação com {encoding}, tentando o próximo encoding...")
+        except Exception as e:
+            print(f"  ❌ Erro ao processar {sigla_estado} ({ano}): {e}")
+            return 0
     
-    # Verificar coluna de valor pago
-    if colunas['valor_pago'] and colunas['valor_pago'] not in df.columns:
-        print(f"  ⚠️  Coluna valor pago '{colunas['valor_pago']}' não encontrada. Detectando automaticamente...")
-        if not colunas_detectadas:
-            colunas_auto = detectar_colunas_csv(df, sigla_estado)
-        if colunas_auto['valor_pago']:
-            colunas['valor_pago'] = colunas_auto['valor_pago']
+    print(f"  ❌ Não foi possível decodificar o arquivo {arquivo}")
+    return 0
+
+
+def _transformar_arquivo(arquivo, sigla_estado, ano, formato):
+    """
+    Executada nos processos auxiliares: lê e transforma um arquivo sem acessar o banco
+    (o formato já vem detectado pelo processo principal).
+    A saída do console é capturada para ser exibida em ordem pelo processo principal.
+    Retorna (DataFrame ou None, log, mensagem de erro ou None, medições das etapas,
+    linhas em quarentena).
+    """
+    coletar_etapas()
+    coletar_rejeitados()
+    lotes = []
     
-    # Detecção completa se ainda não temos colunas válidas
-    if not colunas['orgao'] or (not colunas['valor_empenhado'] and not colunas['valor_pago']):
-        print(f"  🔍 Detectando todas as colunas automaticamente para {sigla_estado}...")
-        colunas_auto = detectar_colunas_csv(df, sigla_estado)
-        if colunas_auto['orgao']:
-            colunas['orgao'] = colunas_auto['orgao']
-        if colunas_auto['valor_empenhado']:
-            colunas['valor_empenhado'] = colunas_auto['valor_empenhado']
-        if colunas_auto['valor_pago']:
-            colunas['valor_pago'] = colunas_auto['valor_pago']
+    def coletar(dados):
+        lotes.append(dados)
+        return len(dados)
     
-    # Mostrar configuração final
-    print(f"  📊 Colunas que serão usadas:")
-    print(f"    - Órgão: '{colunas['orgao']}'")
-    print(f"    - Valor empenhado: '{colunas['valor_empenhado']}'")
-    print(f"    - Valor pago: '{colunas['valor_pago']}'")
+    saida = io.StringIO()
+    erro = None
+    try:
+        with contextlib.redirect_stdout(saida):
+            _processar_arquivo_csv(arquivo, sigla_estado, ano, MAPEAMENTO_COLUNAS[sigla_estado], gravar=coletar, formato=formato)
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
     
-    return colunas
+    dados = pd.concat(lotes, ignore_index=True) if lotes else None
+    return dados, saida.getvalue(), erro, coletar_etapas(), coletar_rejeitados()
 
 
-def _processar_linhas_csv(df, colunas, sigla_estado, ano):
+def processar_em_paralelo(tarefas, workers, forcar=False):
     """
-    Processa as linhas do CSV e extrai os dados necessários.
+    Transforma os arquivos (arquivo, sigla, ano) em um pool de processos.
+    Apenas o processo principal acessa o banco, pois o SQLite aceita um único escritor:
+    até o cache de formatos é consultado e preenchido aqui, antes do envio ao pool.
+    Os resultados são gravados e exibidos na ordem das tarefas, e a falha de um
+    arquivo não interrompe os demais. Arquivos inalterados nem chegam ao pool.
     """
-    dados_processados = []
-    contador_empenhado = 0
-    contador_pago = 0
-    
-    for _, row in df.iterrows():
-        # Extrair nome do órgão
-        orgao_raw = row[colunas['orgao']] if colunas['orgao'] and colunas['orgao'] in row.index and pd.notna(row[colunas['orgao']]) else None
-        
-        if orgao_raw is not None:
-            orgao = limpar_caracteres_especiais(str(orgao_raw))
+    resumo = {'registros': 0, 'estados': set(), 'falhas': [], 'inalterados': 0}
+    
+    pendentes = []
+    for arquivo, sigla_estado, ano_arquivo in tarefas:
+        coletar_etapas()
+        manifesto = _preparar_manifesto(arquivo, sigla_estado, ano_arquivo, forcar)
+        if manifesto is None:
+            print(f"⏭️  {sigla_estado} ({ano_arquivo}) sem alterações desde a última carga: {arquivo}")
+            resumo['inalterados'] += 1
         else:
-            orgao = 'Não informado'
-        
-        # Extrair valores
-        valor_empenhado = obter_valor_coluna(row, colunas['valor_empenhado'])
-        valor_pago = obter_valor_coluna(row, colunas['valor_pago'])
-        
-        # Determinar valor final (prioridade para empenhado)
-        if valor_empenhado is not None:
-            valor_final = valor_empenhado
-            contador_empenhado += 1
-        elif valor_pago is not None:
-            valor_final = valor_pago
-            contador_pago += 1
-        else:
-            valor_final = None
+            formato = obter_formato_csv(arquivo, NOME_BANCO)
+            # A detecção é medida aqui e somada às etapas do processo auxiliar no registro do arquivo
+            pendentes.append((arquivo, sigla_estado, ano_arquivo, manifesto, formato, coletar_etapas()))
+    
+    print(f"⚙️  {len(pendentes)} arquivo(s) distribuídos entre {workers} processos")
+    
+    # O leitor de CSV escolhido vale também nos processos auxiliares
+    with ProcessPoolExecutor(max_workers=workers, initializer=definir_leitor_csv, initargs=(leitor_csv(),)) as executor:
+        futuros = deque(executor.submit(_transformar_arquivo, *tarefa[:3], tarefa[4]) for tarefa in pendentes)
         
-        # Processar apenas registros com valor válido
-        if valor_final is not None and valor_final > 0:
-            # Categorizar despesa
-            categoria = mapear_categoria_padronizada(orgao)
+        for posicao, (arquivo, sigla_estado, ano_arquivo, manifesto, _, deteccao) in enumerate(pendentes, start=1):
+            futuro = futuros.popleft()
+            print(f"[{posicao}/{len(pendentes)}] 📁 Processando {sigla_estado} ({ano_arquivo}): {arquivo}")
+            
+            try:
+                dados, log, erro, etapas, rejeitados = futuro.result()
+            except Exception as e:
+                # Processo auxiliar encerrado de forma inesperada
+                dados, log, erro, etapas, rejeitados = None, '', f"{type(e).__name__}: {e}", {}, None
+            print(log, end='')
             
-            # Criar data baseada no ano do arquivo
-            data = datetime(ano, 1, 1).date()
+            if erro:
+                print(f"  ❌ Falha em {sigla_estado} ({ano_arquivo}), seguindo com os demais arquivos: {erro}")
+                resumo['falhas'].append(f"{sigla_estado}_{ano_arquivo}")
+                print("-" * 40)
+                continue
             
-            dados_processados.append({
-                'estado': sigla_estado,
-                'data': data,
-                'orgao': orgao,
-                'categoria_padronizada': categoria,
-                'valor': valor_final
-            })
-    
-    print(f"  📊 Valores empenhados: {contador_empenhado}, Valores pagos: {contador_pago}")
-    return dados_processados
+            # As linhas em quarentena são gravadas junto com os registros do arquivo
+            acumular_rejeitados(rejeitados)
+            with medir_arquivo(sigla_estado, ano_arquivo, arquivo, etapas=[deteccao, etapas]):
+                registros = salvar_dados(dados, NOME_BANCO, NOME_TABELA, manifesto)
+            if registros > 0:
+                resumo['registros'] += registros
+                resumo['estados'].add(sigla_estado)
+            print(f"  ✅ {registros} registros inseridos para {sigla_estado} ({ano_arquivo})")
+            print("-" * 40)
+    
+    if resumo['falhas']:
+        print(f"⚠️  Arquivos com falha: {', '.join(resumo['falhas'])}")
+    
+    return resumo
 
 
-def processar_todos_estados(ano=None):
+def _informar_quarentena():
+    """
+    Mostra, no resumo final, quantas linhas foram para a quarentena por motivo.
+    """
+    rejeitados = estatisticas_quarentena()
+    if rejeitados:
+        detalhes = ', '.join(f"{motivo}: {total}" for motivo, total in sorted(rejeitados.items()))
+        print(f"   Linhas em quarentena (etl_rejeitados): {sum(rejeitados.values())} ({detalhes})")
+
+
+def processar_todos_estados(ano=None, chunksize=None, workers=1, forcar=False, multiano=False):
     """
     Processa todos os estados disponíveis, opcionalmente para um ano específico.
+    Com workers > 1, leitura e transformação rodam em paralelo (ver processar_em_paralelo).
+    Com multiano, os estados com extratos de vários anos são lidos uma vez por conteúdo.
+    Só os arquivos alterados desde a última carga são processados, a menos que forcar=True.
     """
     if ano:
         print(f"🚀 Iniciando processamento de todos os estados para o ano {ano}...")
@@ -278,11 +436,37 @@ def processar_todos_estados(ano=None):
         print("🚀 Iniciando processamento de todos os estados (todos os anos)...")
     print("="*60)
     
+    if workers > 1:
+        # Os estados lidos em modo multiano ficam fora do pool: cada conteúdo é lido uma vez
+        multiano_estados = [
+            sigla_estado for sigla_estado, config in MAPEAMENTO_COLUNAS.items()
+            if multiano and ano is None and obter_especificacao(config)['filtrar_ano']
+        ]
+        tarefas = [
+            (arquivo, sigla_estado, extrair_ano_do_arquivo(arquivo))
+            for sigla_estado in MAPEAMENTO_COLUNAS.keys() if sigla_estado not in multiano_estados
+            for arquivo in buscar_arquivos_estado(sigla_estado, ano)
+        ]
+        resumo = processar_em_paralelo(tarefas, workers, forcar)
+        for sigla_estado in multiano_estados:
+            registros = processar_estado(sigla_estado, chunksize=chunksize, forcar=forcar, multiano=True)
+            if registros > 0:
+                resumo['registros'] += registros
+                resumo['estados'].add(sigla_estado)
+        
+        print(f"\n🎉 RESUMO FINAL:")
+        print(f"   Estados processados: {len(resumo['estados'])}")
+        print(f"   Total de registros inseridos: {resumo['registros']}")
+        print(f"   Arquivos inalterados (pulados): {resumo['inalterados']}")
+        print(f"   Arquivos com falha: {len(resumo['falhas'])}")
+        _informar_quarentena()
+        return
+    
     total_registros = 0
     estados_processados = 0
     
     for sigla_estado in MAPEAMENTO_COLUNAS.keys():
-        registros = processar_estado(sigla_estado, ano)
+        registros = processar_estado(sigla_estado, ano, chunksize, forcar=forcar, multiano=multiano)
         if registros > 0:
             total_registros += registros
             estados_processados += 1
@@ -291,9 +475,13 @@ def processar_todos_estados(ano=None):
     print(f"\n🎉 RESUMO FINAL:")
     print(f"   Estados processados: {estados_processados}")
     print(f"   Total de registros inseridos: {total_registros}")
+    _informar_quarentena()
+    
+    cache = estatisticas_cache_categorias()
+    print(f"   Cache de categorias: {cache['acertos']} acertos, {cache['falhas']} falhas ({cache['tamanho']} órgãos distintos)")
 
 
-def processar_arquivo_especifico(sigla_estado, ano):
+def processar_arquivo_especifico(sigla_estado, ano, chunksize=None, workers=1, forcar=False):
     """
     Processa um arquivo específico baseado no estado e ano.
     Função útil para quando um novo arquivo é enviado pelo frontend.
@@ -305,7 +493,7 @@ def processar_arquivo_especifico(sigla_estado, ano):
         print(f"❌ Ano {ano} não é suportado. Anos válidos: {ANOS_SUPORTADOS}")
         return 0
     
-    registros = processar_estado(sigla_estado, ano)
+    registros = processar_estado(sigla_estado, ano, chunksize, workers, forcar)
     
     if registros > 0:
         print(f"\n🎉 Processamento concluído:")
@@ -318,9 +506,26 @@ def processar_arquivo_especifico(sigla_estado, ano):
     return registros
 
 
+def recategorizar():
+    """
+    Reaplica o categorizador atual aos órgãos já gravados no banco, sem reler os CSVs:
+    cada órgão distinto é categorizado uma vez e o banco é atualizado em um único UPDATE.
+    Retorna o número de registros que mudaram de categoria.
+    """
+    print("🏷️  Recategorizando os órgãos já carregados...")
+    orgaos = listar_orgaos(NOME_BANCO, NOME_TABELA)
+    if orgaos.empty:
+        print("⚠️  Nenhum órgão encontrado no banco.")
+        return 0
+    
+    return atualizar_categorias(NOME_BANCO, NOME_TABELA, orgaos, categorizar_serie(orgaos))
+
+
 def analisar_todos_csvs():
     """
     Analisa a estrutura de todos os CSVs disponíveis para verificar os mapeamentos.
+    Cada arquivo é sondado pelo cabeçalho e uma amostra das primeiras linhas, sem
+    ser carregado por inteiro.
     """
     print("🔍 ANALISANDO ESTRUTURA DE TODOS OS CSVs...")
     print("="*80)
@@ -342,11 +547,11 @@ def analisar_todos_csvs():
             print(f"  � {os.path.basename(arquivo)} (ano: {ano_arquivo})")
             
             try:
-                # Carregar CSV
-                df = carregar_csv_com_encoding(arquivo)
+                # Cabeçalho e amostra; o total vem da contagem de quebras de linha
+                df, total_linhas = sondar_esquema_csv(arquivo)
                 
                 print(f"    📋 Colunas disponíveis: {list(df.columns)}")
-                print(f"    📊 Total de linhas: {len(df)}")
+                print(f"    📊 Total de linhas: {total_linhas}")
                 
                 # Verificar mapeamento atual
                 colunas_config = config['colunas']
@@ -384,47 +589,80 @@ if __name__ == "__main__":
     parser.add_argument('--ano', type=int, help='Ano específico para processar')
     parser.add_argument('--todos', action='store_true', help='Processar todos os estados')
     parser.add_argument('--analisar', action='store_true', help='Analisar estrutura dos CSVs')
+    parser.add_argument('--chunksize', type=int, help='Ler e gravar os CSVs em lotes de N linhas (memória constante)')
+    parser.add_argument('--workers', type=int, default=1, help='Número de processos para ler e transformar os CSVs em paralelo')
+    parser.add_argument('--forcar', action='store_true', help='Reprocessar mesmo os arquivos inalterados desde a última carga')
+    parser.add_argument('--multiano', action='store_true', help='Ler uma única vez os extratos com vários anos (RS, GO) e gravar todos os anos encontrados')
+    parser.add_argument('--recategorizar', action='store_true', help='Reaplicar o categorizador aos dados já carregados, sem reler os CSVs')
+    parser.add_argument('--metricas-jsonl', type=str, help='Acrescentar as medições de cada etapa a este arquivo JSON Lines (além da tabela etl_runs)')
+    parser.add_argument('--perfil', '--profile', nargs='?', const=PASTA_PERFIS, help='Gravar um relatório do cProfile e do tracemalloc por arquivo (pasta opcional)')
+    parser.add_argument('--exportar-parquet', action='store_true', help='Exportar todo o banco para as partições Parquet do backend colunar da API')
+    parser.add_argument('--leitor', '--engine', choices=LEITORES_CSV, default=LEITOR_CSV, help='Leitor dos CSVs: pandas ou arrow (pyarrow multithread, só as colunas usadas; volta ao pandas se falhar)')
     
     args = parser.parse_args()
+    definir_leitor_csv(args.leitor)
+    
+    if args.workers > 1 and args.chunksize:
+        print("⚠️  --chunksize é ignorado com --workers: cada processo lê o arquivo inteiro.")
+    if args.workers > 1 and args.perfil:
+        print("⚠️  --perfil só perfila os arquivos processados no processo principal; use --workers 1.")
+    if args.leitor == 'arrow' and args.chunksize and args.workers == 1:
+        print("⚠️  --leitor arrow vale para arquivos lidos inteiros: com --chunksize os lotes são lidos pelo pandas.")
     
     print("🔍 Verificando banco de dados...")
     if not verificar_banco(NOME_BANCO, NOME_TABELA):
         print("❌ Erro ao acessar o banco de dados.")
         exit(1)
     
+    execucao = iniciar_execucao(NOME_BANCO, args.metricas_jsonl, args.perfil)
+    print(f"⏱️  Execução {execucao}: medições das etapas em etl_runs")
+    
     if args.analisar:
         analisar_todos_csvs()
+    elif args.recategorizar:
+        recategorizar()
+    elif args.exportar_parquet:
+        print(f"\n🧱 Exportando partições Parquet para {PASTA_PARQUET}...")
+        exportar_banco(NOME_BANCO, NOME_TABELA, PASTA_PARQUET)
     elif args.estado and args.ano:
         # Processar arquivo específico (útil quando chamado pelo backend após upload)
-        processar_arquivo_especifico(args.estado, args.ano)
+        processar_arquivo_especifico(args.estado, args.ano, args.chunksize, args.workers, args.forcar)
     elif args.estado:
         # Processar todos os anos de um estado específico
         print(f"\n🚀 Processando todos os arquivos do estado {args.estado}...")
-        processar_estado(args.estado)
+        processar_estado(args.estado, chunksize=args.chunksize, workers=args.workers, forcar=args.forcar, multiano=args.multiano)
     elif args.todos:
         # Processar todos os estados
         if args.ano:
-            processar_todos_estados(args.ano)
+            processar_todos_estados(args.ano, args.chunksize, args.workers, args.forcar)
         else:
-            processar_todos_estados()
+            processar_todos_estados(chunksize=args.chunksize, workers=args.workers, forcar=args.forcar, multiano=args.multiano)
     else:
         # Comportamento padrão: processar todos os estados
         print("\n🚀 Iniciando processamento padrão (todos os estados)...")
-        processar_todos_estados()
+        processar_todos_estados(chunksize=args.chunksize, workers=args.workers, forcar=args.forcar, multiano=args.multiano)
+    
+    if not args.analisar and not args.exportar_parquet:
+        atualizar_estatisticas(NOME_BANCO)
 
 
 # Função que pode ser chamada diretamente pelo backend
-def processar_novo_arquivo(sigla_estado, ano):
+def processar_novo_arquivo(sigla_estado, ano, chunksize=None):
     """
     Função para ser chamada pelo backend quando um novo arquivo é enviado.
+    Com chunksize, o arquivo é gravado em lotes (a fila de jobs usa isso para o progresso).
     Retorna True se o processamento foi bem-sucedido, False caso contrário.
     """
     try:
         if not verificar_banco(NOME_BANCO, NOME_TABELA):
             print("❌ Erro ao acessar o banco de dados.")
             return False
+        iniciar_execucao(NOME_BANCO)
         
-        registros = processar_arquivo_especifico(sigla_estado, ano)
+        # Um envio explícito sempre recarrega a fatia (estado, ano), mesmo com conteúdo igual
+        registros = processar_arquivo_especifico(sigla_estado, ano, chunksize, forcar=True)
+        if registros > 0:
+            atualizar_estatisticas(NOME_BANCO)
         return registros > 0
     
     except Exception as e:
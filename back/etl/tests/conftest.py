@@ -0,0 +1,29 @@
+"""
+Configuração dos testes do ETL: torna os pacotes de back/etl importáveis
+do mesmo jeito que o run_etl.py faz e fornece um run_etl isolado em pasta temporária.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def etl(tmp_path, monkeypatch):
+    """
+    Módulo run_etl apontando para um banco, uma pasta de CSVs e um cache de
+    registros temporários.
+    """
+    import run_etl
+    import core.cache_registros as cache_registros
+    
+    pasta_csvs = tmp_path / 'csvs'
+    pasta_csvs.mkdir()
+    monkeypatch.setattr(run_etl, 'PASTA_CSVS', str(pasta_csvs))
+    monkeypatch.setattr(run_etl, 'NOME_BANCO', str(tmp_path / 'database' / 'despesas_brasil.db'))
+    monkeypatch.setattr(cache_registros, 'PASTA_CACHE_REGISTROS', str(tmp_path / 'cache_registros'))
+    run_etl.verificar_banco(run_etl.NOME_BANCO, run_etl.NOME_TABELA)
+    return run_etl
@@ -0,0 +1,70 @@
+"""
+Testes do conversor vetorizado de valores monetários (core.utils).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.utils import converter_valores_brasileiros
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def _converter(valores, centavos=False):
+    return converter_valores_brasileiros(pd.Series(valores, dtype=object), centavos=centavos).tolist()
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('1.234,56', 123456),
+    ('R$ 1.234.567,89', 123456789),
+    ('1,234,567.89', 123456789),
+    ('1.234.567', 123456700),
+    ('(1.234,56)', -123456),
+    ('-5,005', -501),
+    ('0,004', 0),
+    ('.5', 50),
+    ('000000000000000000012,3', 1230),
+    ('999999999999999,99', 99999999999999999),
+])
+def test_centavos_exatos(texto, esperado):
+    assert _converter([texto], centavos=True) == [esperado]
+
+
+@pytest.mark.parametrize('texto', [
+    '', '-', 'abc', '1e3', 'inf', 'nan', None,
+    '9999999999999999,00',
+    '999999999999999999,00',
+    '123456789012345678901234,00',
+])
+def test_invalidos_viram_nulo_nos_dois_modos(texto):
+    assert _converter([texto], centavos=True) == [pd.NA]
+    assert np.isnan(_converter([texto])[0])
+
+
+def test_float_e_centavos_concordam():
+    valores = ['1.234,56', '1e3', '(10,00)', '', '999999999999999999,00', 'R$ 0,50', '12.']
+    reais = pd.Series(_converter(valores))
+    centavos = pd.Series(_converter(valores, centavos=True), dtype='Int64')
+    
+    assert (reais.isna() == centavos.isna()).all()
+    assert ((reais * 100).round()[reais.notna()] == centavos[centavos.notna()].astype('float64')).all()
+
+
+def test_entrada_numerica():
+    valores = pd.Series([1.5, -2.25, np.nan, np.inf, 1e20])
+    
+    assert converter_valores_brasileiros(valores, centavos=True).tolist() == [150, -225, pd.NA, pd.NA, pd.NA]
+    assert converter_valores_brasileiros(valores).tolist()[:2] == [1.5, -2.25]
+    assert converter_valores_brasileiros(valores).isna().tolist() == [False, False, True, True, True]
+
+
+@pytest.mark.skipif(pa is None, reason='pyarrow não instalado')
+def test_array_arrow_igual_a_series():
+    valores = ['1.234,56', None, '1e3', '(7,01)', '999999999999999999,00']
+    
+    assert converter_valores_brasileiros(pa.array(valores), centavos=True).tolist() == _converter(valores, centavos=True)
+    np.testing.assert_array_equal(converter_valores_brasileiros(pa.array(valores)).to_numpy(), np.array(_converter(valores)))
@@ -0,0 +1,102 @@
+"""
+Testes de regressão dos layouts especiais de CSV (config/mapeamento_estados.py),
+com um extrato pequeno de cada estado em tests/fixtures.
+"""
+
+import os
+import shutil
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from processadores import motor
+
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Por estado: registros gravados, quantidade de cada valor em centavos,
+# órgãos distintos e linhas rejeitadas por motivo
+ESPERADO = {
+    'DF': (38, {50: 14, 9900: 5, 123456: 10, 123456789: 9},
+           {'Casa Civil', 'Fundo X', 'Não informado', 'Polícia Militar', 'SEC. EDUCAÇÃO', 'Secretaria de Estado da Saúde'}, {}),
+    'GO': (16, {50: 3, 9900: 3, 123456: 4, 123456789: 6},
+           {'Casa Civil', 'Fundo X', 'Polícia Militar', 'SEC. EDUCAÇÃO', 'Secretaria de Estado da Saúde'}, {}),
+    'MA': (7, {50: 1, 9900: 2, 123456: 3, 123456789: 1},
+           {'Casa Civil', 'Fundo X', 'Polícia Militar'}, {'campo_obrigatorio_vazio': 11, 'sem_orgao': 3}),
+    'MS': (39, {50: 9, 9900: 9, 123456: 10, 123456789: 11},
+           {'Casa Civil', 'Fundo X', 'Não informado', 'Polícia Militar', 'SEC. EDUCAÇÃO', 'Secretaria de Estado da Saúde'}, {}),
+    'RJ': (25, {50: 10, 9900: 3, 123456: 4, 123456789: 8},
+           {'Educação', 'Legislativa', 'Saúde'}, {'sem_orgao': 9}),
+    'RO': (46, {50: 16, 9900: 8, 123456: 15, 123456789: 7},
+           {'Casa Civil', 'Fundo X', 'Não informado', 'Polícia Militar', 'SEC. EDUCAÇÃO', 'Secretaria de Estado da Saúde'}, {}),
+    'RS': (16, {50: 7, 9900: 6, 123456: 2, 123456789: 1},
+           {'Casa Civil', 'Fundo X', 'Não informado', 'Polícia Militar', 'SEC. EDUCAÇÃO', 'Secretaria de Estado da Saúde'}, {}),
+    'SP': (16, {50: 2, 9900: 4, 123456: 2, 123456789: 8},
+           {'Casa Civil', 'Fundo X', 'Polícia Militar', 'SEC. EDUCAÇÃO', 'Secretaria de Estado da Saúde'}, {'sem_orgao': 8}),
+    'TO': (26, {50: 8, 9900: 6, 123456: 7, 123456789: 5},
+           {'LEGISLATIVA', 'SAÚDE'}, {'sem_orgao': 11}),
+}
+
+
+@pytest.fixture(params=motor.LEITORES_CSV)
+def leitor(request):
+    """
+    Roda o teste com cada leitor de CSV, restaurando o anterior no fim.
+    """
+    if request.param == 'arrow' and not motor.LEITOR_ARROW_DISPONIVEL:
+        pytest.skip('pyarrow não instalado')
+    anterior = motor.leitor_csv()
+    motor.definir_leitor_csv(request.param)
+    yield request.param
+    motor.definir_leitor_csv(anterior)
+
+
+def _registros(etl, estado):
+    """
+    (data, órgão, valor em centavos) gravados para o estado, em qualquer modelo de armazenamento.
+    """
+    if etl.NOME_TABELA == 'despesas':
+        sql = "SELECT data, orgao, valor_centavos FROM despesas WHERE estado = ?"
+    else:
+        sql = ("SELECT f.ano || '-01-01', o.nome, f.valor_centavos FROM fato_despesas f "
+               "JOIN dim_orgao o ON o.id = f.orgao_id WHERE f.estado = ?")
+    conn = sqlite3.connect(etl.NOME_BANCO)
+    try:
+        return conn.execute(sql, (estado,)).fetchall()
+    finally:
+        conn.close()
+
+
+def _rejeitados(etl, estado):
+    conn = sqlite3.connect(etl.NOME_BANCO)
+    try:
+        return dict(conn.execute(
+            "SELECT motivo, COUNT(*) FROM etl_rejeitados WHERE estado = ? GROUP BY motivo", (estado,)
+        ).fetchall())
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('estado', sorted(ESPERADO))
+def test_layout_especial(etl, leitor, tmp_path, estado):
+    registros, centavos, orgaos, rejeitados = ESPERADO[estado]
+    shutil.copy(os.path.join(PASTA_FIXTURES, f'{estado}_2023.csv'), tmp_path / 'csvs')
+    
+    assert etl.processar_estado(estado) == registros
+    
+    gravados = _registros(etl, estado)
+    assert len(gravados) == registros
+    assert {data for data, _, _ in gravados} == {'2023-01-01'}
+    assert Counter(valor for _, _, valor in gravados) == centavos
+    assert {orgao for _, orgao, _ in gravados} == orgaos
+    assert _rejeitados(etl, estado) == rejeitados
+
+
+@pytest.mark.parametrize('estado', ['MS', 'RJ', 'TO'])
+def test_leitura_em_lotes_igual_a_completa(etl, tmp_path, estado):
+    registros, centavos, orgaos, rejeitados = ESPERADO[estado]
+    shutil.copy(os.path.join(PASTA_FIXTURES, f'{estado}_2023.csv'), tmp_path / 'csvs')
+    
+    assert etl.processar_estado(estado, chunksize=7) == registros
+    assert Counter(valor for _, _, valor in _registros(etl, estado)) == centavos
+    assert _rejeitados(etl, estado) == rejeitados
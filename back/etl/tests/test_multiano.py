@@ -0,0 +1,61 @@
+"""
+Testes da carga multiano (processar_estado_multiano) com extratos do RS.
+"""
+
+import sqlite3
+
+
+def _extrato(valor, anos):
+    linhas = ['Ano,Órgão,Valor,Fase Gasto']
+    linhas += [f'{ano},"Secretaria de Saúde","{valor}",Pago' for ano in anos]
+    return '\n'.join(linhas) + '\n'
+
+
+def _consultar(etl, sql):
+    conn = sqlite3.connect(etl.NOME_BANCO)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_ano_sem_arquivo_vem_de_um_unico_conteudo(etl, tmp_path):
+    # Dois conteúdos diferentes, ambos com linhas de todos os anos
+    anos = etl.ANOS_SUPORTADOS
+    (tmp_path / 'csvs' / 'RS_2020.csv').write_text(_extrato('1.000,00', anos), encoding='utf-8')
+    (tmp_path / 'csvs' / 'RS_2024.csv').write_text(_extrato('2.000,00', anos), encoding='utf-8')
+    
+    etl.processar_estado('RS', multiano=True)
+    
+    por_ano = dict(_consultar(etl, f"SELECT ano, GROUP_CONCAT(valor_centavos) FROM {etl.NOME_TABELA} GROUP BY ano"))
+    assert por_ano == {
+        2020: '100000',
+        2021: '100000',
+        2022: '200000',  # empate: o arquivo mais recente
+        2023: '200000',
+        2024: '200000',
+        2025: '200000',
+    }
+    
+    caminhos = dict(_consultar(etl, "SELECT ano, caminho FROM manifesto_ingestao WHERE estado = 'RS'"))
+    assert {ano: caminho.rsplit('_', 1)[-1] for ano, caminho in caminhos.items()} == {
+        2020: '2020.csv', 2021: '2020.csv', 2022: '2024.csv',
+        2023: '2024.csv', 2024: '2024.csv', 2025: '2024.csv',
+    }
+
+
+def test_arquivo_inalterado_nao_e_relido(etl, tmp_path, monkeypatch):
+    anos = etl.ANOS_SUPORTADOS
+    (tmp_path / 'csvs' / 'RS_2020.csv').write_text(_extrato('1.000,00', anos), encoding='utf-8')
+    (tmp_path / 'csvs' / 'RS_2024.csv').write_text(_extrato('2.000,00', anos), encoding='utf-8')
+    etl.processar_estado('RS', multiano=True)
+    
+    lidos = []
+    calcular = etl.calcular_hash_arquivo
+    monkeypatch.setattr(etl, 'calcular_hash_arquivo', lambda arquivo: lidos.append(arquivo) or calcular(arquivo))
+    (tmp_path / 'csvs' / 'RS_2024.csv').write_text(_extrato('3.000,00', anos), encoding='utf-8')
+    etl.processar_estado('RS', multiano=True)
+    
+    assert [arquivo.rsplit('_', 1)[-1] for arquivo in lidos] == ['2024.csv']
+    assert _consultar(etl, f"SELECT valor_centavos FROM {etl.NOME_TABELA} WHERE ano = 2021") == [(100000,)]
+    assert _consultar(etl, f"SELECT valor_centavos FROM {etl.NOME_TABELA} WHERE ano = 2025") == [(300000,)]
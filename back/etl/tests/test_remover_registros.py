@@ -0,0 +1,63 @@
+"""
+Testes do script back/remover_registros.py sobre um banco carregado pelo ETL.
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import remover_registros
+from core import database
+
+
+def _extrato(ano):
+    return f'Ano,Órgão,Valor,Fase Gasto\n{ano},"Secretaria de Saúde","1.000,00",Pago\n'
+
+
+@pytest.fixture
+def banco_carregado(etl, tmp_path, monkeypatch):
+    """
+    Banco com RS de 2022 e 2023 carregado, partições Parquet exportadas e o
+    remover_registros apontando para ele, com a confirmação já respondida.
+    """
+    monkeypatch.setattr(database, '_PASTA_PARQUET', str(tmp_path / 'database' / 'parquet'))
+    monkeypatch.setattr(remover_registros, '__file__', str(tmp_path / 'remover_registros.py'))
+    monkeypatch.setattr('builtins.input', lambda mensagem: 's')
+    
+    for ano in (2022, 2023):
+        (tmp_path / 'csvs' / f'RS_{ano}.csv').write_text(_extrato(ano), encoding='utf-8')
+    etl.processar_estado('RS')
+    return etl
+
+
+def _consultar(etl, sql):
+    conn = sqlite3.connect(etl.NOME_BANCO)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_remove_registros_manifesto_e_particao(banco_carregado, tmp_path):
+    etl = banco_carregado
+    particao = tmp_path / 'database' / 'parquet' / 'estado=RS' / 'ano=2023' / 'dados.parquet'
+    assert particao.exists()
+    
+    assert remover_registros.remover_registros_estado('RS', 2023)
+    
+    assert _consultar(etl, f"SELECT DISTINCT ano FROM {etl.NOME_TABELA}") == [(2022,)]
+    assert _consultar(etl, "SELECT ano FROM manifesto_ingestao") == [(2022,)]
+    assert not particao.exists()
+    assert (tmp_path / 'database' / 'parquet' / 'estado=RS' / 'ano=2022' / 'dados.parquet').exists()
+
+
+def test_estado_removido_volta_na_proxima_carga(banco_carregado):
+    etl = banco_carregado
+    remover_registros.remover_registros_estado('RS')
+    
+    assert etl.processar_estado('RS') == 2
+    assert _consultar(etl, f"SELECT ano, COUNT(*) FROM {etl.NOME_TABELA} GROUP BY ano") == [(2022, 1), (2023, 1)]
@@ -3,11 +3,70 @@
 Script para remover registros de estados específicos do banco de dados.
 """
 
+import glob
 import sqlite3
 import os
 import sys
 from datetime import datetime
 
+# Módulos do ETL (back/etl): nome da tabela fato e layout das partições Parquet
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'etl'))
+from core.database import TABELA_FATO
+from core.particoes import ARQUIVO_PARTICAO
+
+# Mesmo modelo de armazenamento do ETL e da API: estrela grava na tabela fato
+MODELO_ARMAZENAMENTO = os.getenv('MODELO_ARMAZENAMENTO', 'plano')
+NOME_TABELA = TABELA_FATO if MODELO_ARMAZENAMENTO == 'estrela' else 'despesas'
+# Tabelas que podem guardar registros de despesas, dos dois modelos
+TABELAS_DESPESAS = ['despesas', TABELA_FATO]
+
+def banco_tem_coluna_ano(cursor, tabela='despesas'):
+    """
+    Indica se a tabela já tem a coluna 'ano' (gerada pela migração do ETL em despesas).
+    """
+    colunas = [coluna[1] for coluna in cursor.execute(f"PRAGMA table_xinfo({tabela})")]
+    return 'ano' in colunas
+
+def filtro_ano(ano, coluna_ano):
+    """
+    Condição de filtro por ano que o SQLite consegue resolver por índice, como em
+    app/routes.py: a coluna 'ano' quando existe; senão, um intervalo de datas.
+    """
+    ano = int(ano)
+    if coluna_ano:
+        return "ano = ?", [ano]
+    return "data >= ? AND data < ?", [f"{ano}-01-01", f"{ano + 1}-01-01"]
+
+def filtro_registros(cursor, tabela, estado=None, ano=None):
+    """
+    Monta a cláusula WHERE e os parâmetros que selecionam o estado e/ou ano na tabela.
+    """
+    where_conditions = []
+    params = []
+    
+    if estado:
+        where_conditions.append("estado = ?")
+        params.append(estado.upper())
+    
+    if ano:
+        condicao, params_ano = filtro_ano(ano, banco_tem_coluna_ano(cursor, tabela))
+        where_conditions.append(condicao)
+        params.extend(params_ano)
+    
+    return " AND ".join(where_conditions), params
+
+def remover_particoes(pasta, estado=None, ano=None):
+    """
+    Remove as partições Parquet (estado=XX/ano=AAAA) das fatias removidas do banco.
+    Retorna quantas partições foram removidas.
+    """
+    padrao = os.path.join(pasta, f"estado={estado.upper() if estado else '*'}",
+                          f"ano={int(ano) if ano else '*'}", ARQUIVO_PARTICAO)
+    particoes = glob.glob(padrao)
+    for particao in particoes:
+        os.remove(particao)
+    return len(particoes)
+
 def remover_registros_estado(estado=None, ano=None):
     """
     Remove registros do banco de dados baseado no estado e/ou ano especificado.
@@ -18,36 +77,29 @@ def remover_registros_estado(estado=None, ano=None):
     """
     # Caminho para o banco de dados
     banco_path = os.path.join(os.path.dirname(__file__), 'database', 'despesas_brasil.db')
+    # Partições exportadas pelo ETL para o backend Parquet da API
+    pasta_parquet = os.path.join(os.path.dirname(__file__), 'database', 'parquet')
     
     if not os.path.exists(banco_path):
         print(f"❌ Banco de dados não encontrado: {banco_path}")
         return False
     
-    # Construir a query e parâmetros baseado nos filtros
-    where_conditions = []
-    params = []
-    
-    if estado:
-        where_conditions.append("estado = ?")
-        params.append(estado.upper())
-    
-    if ano:
-        where_conditions.append("strftime('%Y', data) = ?")
-        params.append(str(ano))
-    
-    if not where_conditions:
+    if not estado and not ano:
         print("❌ Nenhum filtro especificado. Informe pelo menos um estado ou ano.")
         return False
     
-    where_clause = " AND ".join(where_conditions)
-    
     try:
         # Conectar ao banco
         conn = sqlite3.connect(banco_path)
         cursor = conn.cursor()
+        coluna_ano = banco_tem_coluna_ano(cursor, NOME_TABELA)
+        tabelas = {linha[0] for linha in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        
+        # Construir a query e parâmetros baseado nos filtros
+        where_clause, params = filtro_registros(cursor, NOME_TABELA, estado, ano)
         
         # Verificar quantos registros existem antes da remoção
-        query_count = f'SELECT COUNT(*) FROM despesas WHERE {where_clause}'
+        query_count = f'SELECT COUNT(*) FROM {NOME_TABELA} WHERE {where_clause}'
         cursor.execute(query_count, params)
         count_antes = cursor.fetchone()[0]
         
@@ -72,14 +124,15 @@ def remover_registros_estado(estado=None, ano=None):
         
         # Mostrar breakdown por estado e ano se aplicável
         if estado and not ano:
-            cursor.execute(f'SELECT strftime("%Y", data) as ano, COUNT(*) FROM despesas WHERE estado = ? GROUP BY ano ORDER BY ano', (estado.upper(),))
+            expressao_ano = 'ano' if coluna_ano else 'strftime("%Y", data)'
+            cursor.execute(f'SELECT {expressao_ano} as ano_db, COUNT(*) FROM {NOME_TABELA} WHERE estado = ? GROUP BY ano_db ORDER BY ano_db', (estado.upper(),))
             breakdown = cursor.fetchall()
             if len(breakdown) > 1:
                 print("📊 Breakdown por ano:")
                 for ano_db, count in breakdown:
                     print(f"  {ano_db}: {count:,}")
         elif ano and not estado:
-            cursor.execute(f'SELECT estado, COUNT(*) FROM despesas WHERE strftime("%Y", data) = ? GROUP BY estado ORDER BY estado', (str(ano),))
+            cursor.execute(f'SELECT estado, COUNT(*) FROM {NOME_TABELA} WHERE {where_clause} GROUP BY estado ORDER BY estado', params)
             breakdown = cursor.fetchall()
             if len(breakdown) > 1:
                 print("📊 Breakdown por estado:")
@@ -94,23 +147,33 @@ def remover_registros_estado(estado=None, ano=None):
             conn.close()
             return False
         
-        # Remover registros
-        query_delete = f'DELETE FROM despesas WHERE {where_clause}'
-        cursor.execute(query_delete, params)
-        registros_removidos = cursor.rowcount
-        
-        # Confirmar as mudanças
-        conn.commit()
+        # Remover registros das duas tabelas de despesas e o manifesto de ingestão das
+        # fatias removidas (senão o ETL pularia os arquivos na próxima carga), em uma
+        # única transação
+        registros_removidos = 0
+        with conn:
+            for tabela in TABELAS_DESPESAS + ['manifesto_ingestao']:
+                if tabela not in tabelas:
+                    continue
+                condicao, params_tabela = filtro_registros(cursor, tabela, estado, ano)
+                cursor.execute(f'DELETE FROM {tabela} WHERE {condicao}', params_tabela)
+                if tabela == NOME_TABELA:
+                    registros_removidos = cursor.rowcount
         
         print(f"✅ Removidos {registros_removidos:,} registros com sucesso!")
         
+        # Remover as partições Parquet das mesmas fatias, se houver
+        particoes_removidas = remover_particoes(pasta_parquet, estado, ano)
+        if particoes_removidas:
+            print(f"🧱 {particoes_removidas} partição(ões) Parquet removida(s)")
+        
         # Verificar o estado final do banco
-        cursor.execute('SELECT COUNT(*) FROM despesas')
+        cursor.execute(f'SELECT COUNT(*) FROM {NOME_TABELA}')
         total_final = cursor.fetchone()[0]
         print(f"📊 Total de registros restantes no banco: {total_final:,}")
         
         # Mostrar registros por estado após remoção
-        cursor.execute('SELECT estado, COUNT(*) FROM despesas GROUP BY estado ORDER BY estado')
+        cursor.execute(f'SELECT estado, COUNT(*) FROM {NOME_TABELA} GROUP BY estado ORDER BY estado')
         registros_por_estado = cursor.fetchall()
         
         if registros_por_estado: